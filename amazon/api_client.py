@@ -1,18 +1,321 @@
 """
 Client per Amazon Product Advertising API 5.0
 """
-from amazon_paapi import AmazonApi
-from amazon.product_parser import parse_product
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed, wait
+import amazon_paapi
+from amazon_paapi.models.regions import DOMAINS
+from amazon.cache import make_search_key
+from amazon.microbatch import MicroBatcher
+from amazon.models import Product
+from amazon.paapi_request import (
+    build_get_items_payload,
+    build_search_payload,
+    check_response,
+    host_for_marketplace,
+    sign_request,
+)
+from amazon.product_parser import parse_product, parse_product_raw
+from amazon.product_table import ProductTable
+from amazon.ranking import get_scorer, merge_ranked
+from amazon.rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RateLimitExceeded,
+)
+from amazon.singleflight import SingleFlight
+from amazon.transport import PooledTransport
+import json
 import logging
 import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Numero massimo di item_ids per singola chiamata GetItems
+GET_ITEMS_MAX_IDS = 10
+
+# Pagine massime (ItemPage) restituite da SearchItems
+SEARCH_MAX_PAGES = 10
+
+# Resources richieste a PA-API per ogni prodotto
+ITEM_RESOURCES = [
+    'Images.Primary.Large',
+    'ItemInfo.Title',
+    'ItemInfo.Features',
+    'ItemInfo.ByLineInfo',
+    'Offers.Listings.Price',
+    'Offers.Listings.SavingBasis',
+    'Offers.Listings.ProgramEligibility.IsPrimeExclusive',
+    'CustomerReviews.StarRating',
+    'CustomerReviews.Count',
+]
+
+# Profili di resources: ogni vista chiede a PA-API solo i campi che usa
+RESOURCE_PROFILES = {
+    # Card risultati senza features (es: client di /api/search)
+    'card': [resource for resource in ITEM_RESOURCES if resource != 'ItemInfo.Features'],
+    # Tutti i campi letti da parse_product
+    'detail': ITEM_RESOURCES,
+    # Solo prezzi, per aggiornare prodotti già noti
+    'price-refresh': [
+        'Offers.Listings.Price',
+        'Offers.Listings.SavingBasis',
+    ],
+}
+
+DEFAULT_PROFILE = 'detail'
+
+# Resource che contiene il prezzo corrente (registrato nello storico prezzi)
+PRICE_RESOURCE = 'Offers.Listings.Price'
+
+# Resource minima per indicizzare un prodotto nella ricerca locale
+INDEX_RESOURCE = 'ItemInfo.Title'
+
+
+def get_resources(profile):
+    """
+    Risolve un profilo di resources PA-API
+
+    Args:
+        profile: Nome in RESOURCE_PROFILES (None = DEFAULT_PROFILE)
+
+    Returns:
+        list: Resources da richiedere
+
+    Raises:
+        ValueError: Profilo sconosciuto
+    """
+    try:
+        return RESOURCE_PROFILES[profile or DEFAULT_PROFILE]
+    except KeyError:
+        raise ValueError(f"Profilo resources non supportato: {profile}")
+
+
+def country_from_marketplace(marketplace):
+    """
+    Ricava il codice paese PA-API dal dominio marketplace
+
+    Args:
+        marketplace: Dominio marketplace (es: www.amazon.it)
+
+    Returns:
+        str: Codice paese (es: IT), IT se non riconosciuto
+    """
+    domain = (marketplace or '').lower().split('amazon.', 1)[-1]
+    for country, country_domain in DOMAINS.items():
+        if country_domain == domain:
+            return country
+    return 'IT'
+
+
+def merge_pages(page_results, prime_only=False, discount_only=False):
+    """
+    Unisce le pagine di una ricerca in ordine di ranking, senza ASIN duplicati
+
+    Args:
+        page_results: Lista di pagine (lista prodotti, None se senza risultati)
+        prime_only: Solo prodotti Prime
+        discount_only: Solo prodotti in sconto
+
+    Returns:
+        dict: {'products': [...], 'count': int, 'error': str | None}
+    """
+    if all(page is None for page in page_results):
+        return {
+            'products': [],
+            'count': 0,
+            'error': 'Nessun risultato trovato'
+        }
+
+    products = []
+    seen = set()
+    for page in page_results:
+        for product in page or []:
+            if product['asin'] in seen:
+                continue
+            seen.add(product['asin'])
+            products.append(product)
+
+    # Applica filtri custom
+    if prime_only or discount_only:
+        products = ProductTable(products).filter(
+            prime_only=prime_only,
+            discount_only=discount_only
+        )
+
+    return {
+        'products': products,
+        'count': len(products),
+        'error': None
+    }
+
+
+def get_mock_products(associate_tag, keywords, max_price=None, prime_only=False, discount_only=False, item_count=10):
+    """Ritorna prodotti mock per demo mode"""
+    mock_products = [
+        {
+            'asin': 'B08N5WRWNW',
+            'title': f'Apple AirPods Pro (2nd Gen) - Risultato per "{keywords}"',
+            'url': f'https://www.amazon.it/dp/B08N5WRWNW?tag={associate_tag}',
+            'image_url': 'https://m.media-amazon.com/images/I/61f1YfTkTDL._AC_SL1500_.jpg',
+            'brand': 'Apple',
+            'price': {
+                'current': 279.0,
+                'current_formatted': '€ 279,00',
+                'original': 329.0,
+                'original_formatted': '€ 329,00',
+                'discount_percent': 15
+            },
+            'is_prime': True,
+            'rating': {
+                'stars': 4.6,
+                'count': 23456
+            },
+            'features': [
+                'Cancellazione attiva del rumore fino a 2 volte superiore',
+                'Audio spaziale personalizzato',
+                'Modalità Trasparenza adattiva',
+                'Fino a 6 ore di ascolto con ANC attivo'
+            ]
+        },
+        {
+            'asin': 'B0BSHF7WHW',
+            'title': f'Logitech MX Master 3S - Mouse Wireless - "{keywords}"',
+            'url': f'https://www.amazon.it/dp/B0BSHF7WHW?tag={associate_tag}',
+            'image_url': 'https://m.media-amazon.com/images/I/61ni3t1ryQL._AC_SL1500_.jpg',
+            'brand': 'Logitech',
+            'price': {
+                'current': 89.99,
+                'current_formatted': '€ 89,99',
+                'original': 119.99,
+                'original_formatted': '€ 119,99',
+                'discount_percent': 25
+            },
+            'is_prime': True,
+            'rating': {
+                'stars': 4.7,
+                'count': 12890
+            },
+            'features': [
+                'Sensore da 8K DPI',
+                'Ricarica rapida USB-C',
+                'Connessione Multi-device',
+                'Scorrimento silenzioso'
+            ]
+        },
+        {
+            'asin': 'B09X6GQ8X4',
+            'title': f'Samsung Galaxy Buds2 Pro - "{keywords}"',
+            'url': f'https://www.amazon.it/dp/B09X6GQ8X4?tag={associate_tag}',
+            'image_url': 'https://m.media-amazon.com/images/I/51DT7r3JnIL._AC_SL1500_.jpg',
+            'brand': 'Samsung',
+            'price': {
+                'current': 149.0,
+                'current_formatted': '€ 149,00',
+                'original': None,
+                'original_formatted': None,
+                'discount_percent': None
+            },
+            'is_prime': True,
+            'rating': {
+                'stars': 4.4,
+                'count': 8934
+            },
+            'features': [
+                'Hi-Fi 24bit',
+                'Cancellazione rumore intelligente',
+                'Resistente all\'acqua IPX7',
+                'Batteria fino a 8 ore'
+            ]
+        },
+        {
+            'asin': 'B0C1J96NT1',
+            'title': f'Anker PowerBank 20000mAh - Power Bank per "{keywords}"',
+            'url': f'https://www.amazon.it/dp/B0C1J96NT1?tag={associate_tag}',
+            'image_url': 'https://m.media-amazon.com/images/I/61N1ZqC+vsL._AC_SL1500_.jpg',
+            'brand': 'Anker',
+            'price': {
+                'current': 39.99,
+                'current_formatted': '€ 39,99',
+                'original': 59.99,
+                'original_formatted': '€ 59,99',
+                'discount_percent': 33
+            },
+            'is_prime': True,
+            'rating': {
+                'stars': 4.5,
+                'count': 15678
+            },
+            'features': [
+                'Capacità 20000mAh',
+                'Ricarica rapida 20W',
+                'USB-C bidirezionale',
+                '2 porte di uscita'
+            ]
+        },
+        {
+            'asin': 'B0BDJ7R4PG',
+            'title': f'Kindle Paperwhite (16 GB) - "{keywords}"',
+            'url': f'https://www.amazon.it/dp/B0BDJ7R4PG?tag={associate_tag}',
+            'image_url': 'https://m.media-amazon.com/images/I/51QCk82iGcL._AC_SL1000_.jpg',
+            'brand': 'Amazon',
+            'price': {
+                'current': 119.99,
+                'current_formatted': '€ 119,99',
+                'original': 159.99,
+                'original_formatted': '€ 159,99',
+                'discount_percent': 25
+            },
+            'is_prime': False,
+            'rating': {
+                'stars': 4.8,
+                'count': 34521
+            },
+            'features': [
+                'Display 6.8" ad alta risoluzione',
+                'Regolazione automatica luce',
+                'Impermeabile IPX8',
+                'Batteria settimane di durata'
+            ]
+        }
+    ]
+
+    filtered = ProductTable(mock_products).filter(
+        max_price=max_price,
+        prime_only=prime_only,
+        discount_only=discount_only,
+        limit=item_count
+    )
+    products = [Product.from_dict(product) for product in filtered]
+    return {
+        'products': products,
+        'count': len(products),
+        'error': None
+    }
+
 
 class AmazonClient:
     """Wrapper per Amazon Product Advertising API"""
 
-    def __init__(self, access_key, secret_key, associate_tag, region, marketplace):
+    def __init__(
+        self,
+        access_key,
+        secret_key,
+        associate_tag,
+        region,
+        marketplace,
+        cache=None,
+        max_workers=4,
+        batch_window=None,
+        batch_max_size=GET_ITEMS_MAX_IDS,
+        limiter=None,
+        transport=None,
+        raw_json=False,
+        catalog=None,
+        price_history=None,
+        search_index=None
+    ):
         """
         Inizializza client Amazon API
 
@@ -22,8 +325,48 @@ class AmazonClient:
             associate_tag: Amazon Associate Tag
             region: AWS Region (es: eu-west-1)
             marketplace: Amazon Marketplace (es: www.amazon.it)
+            cache: SearchCache per i risultati di ricerca (opzionale)
+            max_workers: Chiamate PA-API concorrenti per le richieste batch
+            batch_window: Secondi di attesa per raggruppare get_item_details
+                concorrenti in una sola GetItems (None/0 = disattivato)
+            batch_max_size: ASIN massimi per batch raggruppato (max 10)
+            limiter: TokenBucket per TPS/TPD PA-API (opzionale)
+            transport: PooledTransport keep-alive per le chiamate dell'SDK
+                (opzionale, default: pool interno dell'SDK)
+            raw_json: Firma le richieste localmente e legge il JSON grezzo con
+                parse_product_raw, senza passare dai modelli dell'SDK
+            catalog: ProductCatalog in cui salvare ogni risposta e da cui
+                servire i lookup ancora freschi (opzionale)
+            price_history: PriceHistory in cui registrare ogni prezzo osservato (opzionale)
+            search_index: SearchIndex aggiornato con i prodotti di ogni risposta (opzionale)
         """
         self.associate_tag = associate_tag
+        self.marketplace = marketplace
+        self.region = region
+        self.host = host_for_marketplace(marketplace)
+        self.raw_json = raw_json
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self.cache = cache
+        self.limiter = limiter
+        self.transport = transport
+        self.catalog = catalog
+        self.price_history = price_history
+        self.search_index = search_index
+        self._search_flight = SingleFlight()
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # Segna i thread del pool che eseguono una ricerca del fan-out per categoria
+        self._fanout = threading.local()
+
+        self._item_batcher = None
+        if batch_window:
+            self._item_batcher = MicroBatcher(
+                self.get_items_batch,
+                window=batch_window,
+                max_batch=min(batch_max_size, GET_ITEMS_MAX_IDS)
+            )
         self.demo_mode = os.getenv('DEMO_MODE', 'False').lower() == 'true'
 
         # Se credenziali vuote, attiva demo mode
@@ -32,13 +375,18 @@ class AmazonClient:
             logger.warning("⚠️  Credenziali Amazon mancanti - DEMO MODE attiva con dati mock")
             self.api = None
         else:
-            self.api = AmazonApi(
+            # Il throttling dell'SDK è disattivato: i limiti sono gestiti da self.limiter
+            self.api = amazon_paapi.AmazonApi(
                 access_key,
                 secret_key,
                 associate_tag,
-                region,
-                marketplace
+                country_from_marketplace(marketplace),
+                throttling=0
             )
+            if raw_json and transport is None:
+                self.transport = transport = PooledTransport()
+            if transport is not None:
+                transport.install(self.api)
             logger.info("✅ Client Amazon API inizializzato")
 
     def search_items(
@@ -48,7 +396,11 @@ class AmazonClient:
         category='All',
         item_count=10,
         prime_only=False,
-        discount_only=False
+        discount_only=False,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        pages=1,
+        profile=DEFAULT_PROFILE
     ):
         """
         Cerca prodotti su Amazon
@@ -57,270 +409,743 @@ class AmazonClient:
             keywords: Parole chiave di ricerca
             max_price: Prezzo massimo (opzionale)
             category: Categoria Amazon (default: All)
-            item_count: Numero massimo di risultati (max 10)
+            item_count: Numero massimo di risultati per pagina (max 10)
             prime_only: Solo prodotti Prime
             discount_only: Solo prodotti in sconto
+            priority: Priorità nel rate limiter (PRIORITY_*)
+            max_wait: Attesa massima per un token PA-API in secondi
+                (0 = fail fast, None = default del limiter). Se il limite
+                è raggiunto viene servito l'eventuale risultato in cache
+            pages: Pagine di risultati (ItemPage 1..N, max 10) richieste
+                in parallelo e unite in ordine di ranking senza duplicati;
+                l'attesa dei token è estesa alla spaziatura delle N pagine
+            profile: Profilo di resources (vedi RESOURCE_PROFILES); i campi
+                non richiesti hanno i valori di default di parse_product
 
         Returns:
             dict: {
                 'products': [...],
                 'count': int,
-                'error': str | None
+                'error': str | None,
+                'partial': True (solo se alcune pagine sono fallite; non in cache)
             }
         """
         # DEMO MODE - Ritorna dati mock
+        pages = max(1, min(int(pages or 1), SEARCH_MAX_PAGES))
+        resources = get_resources(profile)
+
         if self.demo_mode:
-            return self._get_mock_products(keywords, max_price, prime_only, discount_only, item_count)
+            return self._get_mock_products(
+                keywords, max_price, prime_only, discount_only, item_count * pages
+            )
+
+        key = make_search_key(
+            keywords,
+            category=category,
+            max_price=max_price,
+            prime_only=prime_only,
+            discount_only=discount_only,
+            item_count=item_count,
+            marketplace=self.marketplace,
+            pages=pages,
+            profile=profile or DEFAULT_PROFILE
+        )
+
+        # Ricerche identiche concorrenti condividono una sola chiamata upstream
+        def fetch(fetch_priority=priority, fetch_wait=max_wait):
+            return self._search_flight.do(key, lambda: self._search_upstream(
+                keywords, max_price, category, item_count, prime_only, discount_only,
+                fetch_priority, fetch_wait, pages, resources
+            ))
+
+        def refresh():
+            return fetch(PRIORITY_BACKGROUND, None)
 
         try:
-            # Parametri di ricerca
-            search_params = {
-                'keywords': keywords,
-                'search_index': category if category != 'All' else 'All',
-                'item_count': min(item_count, 10),  # Max 10 per API limit
-                'resources': [
-                    'Images.Primary.Large',
-                    'ItemInfo.Title',
-                    'ItemInfo.Features',
-                    'ItemInfo.ByLineInfo',
-                    'Offers.Listings.Price',
-                    'Offers.Listings.SavingBasis',
-                    'Offers.Listings.ProgramEligibility.IsPrimeExclusive',
-                    'CustomerReviews.StarRating',
-                    'CustomerReviews.Count',
-                ],
+            if self.cache is None:
+                return fetch()
+
+            return self.cache.get_or_fetch(key, fetch, refresh=refresh)
+
+        except RateLimitExceeded as e:
+            cached = self.cache.peek(key) if self.cache else None
+            if cached is not None:
+                logger.info(f"Rate limit PA-API, servito risultato in cache per {keywords!r}")
+                return cached
+
+            logger.warning(f"Rate limit PA-API per {keywords!r}: {str(e)}")
+            return {
+                'products': [],
+                'count': 0,
+                'error': 'Troppe richieste ad Amazon, riprova tra qualche secondo'
             }
 
-            # Aggiungi filtro prezzo
-            if max_price:
-                search_params['max_price'] = int(max_price * 100)  # Converti in centesimi
+    def search_categories(
+        self,
+        keywords,
+        categories,
+        max_price=None,
+        item_count=10,
+        prime_only=False,
+        discount_only=False,
+        pages=1,
+        timeout=None,
+        scoring='rank',
+        weights=None,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        profile=DEFAULT_PROFILE
+    ):
+        """
+        Cerca le stesse keywords su più categorie in parallelo
 
-            # Esegui ricerca
-            response = self.api.search_items(**search_params)
+        Ogni categoria passa da search_items (cache, coalescing, rate limit)
+        sul pool del client; le categorie che non rispondono entro timeout
+        vengono escluse.
 
-            # Parse risultati
-            if not response or not hasattr(response, 'search_result'):
-                return {
-                    'products': [],
-                    'count': 0,
-                    'error': 'Nessun risultato trovato'
-                }
+        Args:
+            keywords: Parole chiave di ricerca
+            categories: Lista di search index (es: ['Electronics', 'Computers'])
+            max_price: Prezzo massimo (opzionale)
+            item_count: Numero massimo di risultati per pagina (max 10)
+            prime_only: Solo prodotti Prime
+            discount_only: Solo prodotti in sconto
+            pages: Pagine per categoria
+            timeout: Secondi massimi per l'intera ricerca (None = illimitato);
+                limita anche l'attesa dei token delle categorie ancora in coda
+            scoring: Strategia di merge ('rank', 'discount', 'rating' o callable)
+            weights: {categoria: peso} per lo scoring (opzionale)
+            priority: Priorità nel rate limiter (PRIORITY_*)
+            max_wait: Attesa massima per un token PA-API in secondi
+            profile: Profilo di resources (vedi RESOURCE_PROFILES)
 
-            products = []
-            for item in response.search_result.items:
-                product = parse_product(item, self.associate_tag)
+        Returns:
+            dict: {
+                'products': [...],
+                'count': int,
+                'error': str | None,
+                'categories': {categoria: {'count': int, 'error': str | None}}
+            }
+        """
+        # Valida scoring e profilo prima di avviare le chiamate
+        get_scorer(scoring)
+        get_resources(profile)
+        categories = list(dict.fromkeys(categories))
 
-                if product:
-                    # Applica filtri custom
-                    if prime_only and not product.get('is_prime', False):
-                        continue
+        deadline = None if timeout is None else time.monotonic() + timeout
 
-                    if discount_only and not product.get('price', {}).get('discount_percent'):
-                        continue
+        def search_category(category):
+            wait_limit = max_wait
+            if deadline is not None:
+                # Le categorie partite in ritardo non prendono token oltre la scadenza
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return {'products': [], 'count': 0, 'error': 'Timeout'}
+                wait_limit = remaining if max_wait is None else min(max_wait, remaining)
 
-                    products.append(product)
+            self._fanout.active = True
+            try:
+                return self.search_items(
+                    keywords,
+                    max_price=max_price,
+                    category=category,
+                    item_count=item_count,
+                    prime_only=prime_only,
+                    discount_only=discount_only,
+                    priority=priority,
+                    max_wait=wait_limit,
+                    pages=pages,
+                    profile=profile
+                )
+            finally:
+                self._fanout.active = False
 
-            return {
-                'products': products,
-                'count': len(products),
-                'error': None
-            }
+        # Pool condiviso del client: le categorie oltre max_workers restano in
+        # coda e quelle non ancora partite alla scadenza vengono annullate
+        executor = self._get_executor()
+        futures = {executor.submit(search_category, category): category for category in categories}
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
 
-        except Exception as e:
-            logger.error(f"Errore nella ricerca Amazon: {str(e)}")
+        products_by_category = {}
+        summary = {}
+        for future, category in futures.items():
+            if future not in done:
+                logger.warning(f"Categoria {category} esclusa per timeout ({keywords!r})")
+                summary[category] = {'count': 0, 'error': 'Timeout'}
+                continue
+
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'products': [], 'count': 0, 'error': str(e)}
+
+            summary[category] = {'count': result['count'], 'error': result['error']}
+            if not result['error']:
+                products_by_category[category] = result['products']
+
+        if not products_by_category:
+            errors = [info['error'] for info in summary.values() if info['error']]
             return {
                 'products': [],
                 'count': 0,
-                'error': f"Errore API: {str(e)}"
+                'error': errors[0] if errors else 'Nessun risultato trovato',
+                'categories': summary
             }
 
-    def _get_mock_products(self, keywords, max_price=None, prime_only=False, discount_only=False, item_count=10):
-        """Ritorna prodotti mock per demo mode"""
-        mock_products = [
-            {
-                'asin': 'B08N5WRWNW',
-                'title': f'Apple AirPods Pro (2nd Gen) - Risultato per "{keywords}"',
-                'url': f'https://www.amazon.it/dp/B08N5WRWNW?tag={self.associate_tag}',
-                'image_url': 'https://m.media-amazon.com/images/I/61f1YfTkTDL._AC_SL1500_.jpg',
-                'brand': 'Apple',
-                'price': {
-                    'current': 279.0,
-                    'current_formatted': '€ 279,00',
-                    'original': 329.0,
-                    'original_formatted': '€ 329,00',
-                    'discount_percent': 15
-                },
-                'is_prime': True,
-                'rating': {
-                    'stars': 4.6,
-                    'count': 23456
-                },
-                'features': [
-                    'Cancellazione attiva del rumore fino a 2 volte superiore',
-                    'Audio spaziale personalizzato',
-                    'Modalità Trasparenza adattiva',
-                    'Fino a 6 ore di ascolto con ANC attivo'
-                ]
-            },
-            {
-                'asin': 'B0BSHF7WHW',
-                'title': f'Logitech MX Master 3S - Mouse Wireless - "{keywords}"',
-                'url': f'https://www.amazon.it/dp/B0BSHF7WHW?tag={self.associate_tag}',
-                'image_url': 'https://m.media-amazon.com/images/I/61ni3t1ryQL._AC_SL1500_.jpg',
-                'brand': 'Logitech',
-                'price': {
-                    'current': 89.99,
-                    'current_formatted': '€ 89,99',
-                    'original': 119.99,
-                    'original_formatted': '€ 119,99',
-                    'discount_percent': 25
-                },
-                'is_prime': True,
-                'rating': {
-                    'stars': 4.7,
-                    'count': 12890
-                },
-                'features': [
-                    'Sensore da 8K DPI',
-                    'Ricarica rapida USB-C',
-                    'Connessione Multi-device',
-                    'Scorrimento silenzioso'
-                ]
-            },
-            {
-                'asin': 'B09X6GQ8X4',
-                'title': f'Samsung Galaxy Buds2 Pro - "{keywords}"',
-                'url': f'https://www.amazon.it/dp/B09X6GQ8X4?tag={self.associate_tag}',
-                'image_url': 'https://m.media-amazon.com/images/I/51DT7r3JnIL._AC_SL1500_.jpg',
-                'brand': 'Samsung',
-                'price': {
-                    'current': 149.0,
-                    'current_formatted': '€ 149,00',
-                    'original': None,
-                    'original_formatted': None,
-                    'discount_percent': None
-                },
-                'is_prime': True,
-                'rating': {
-                    'stars': 4.4,
-                    'count': 8934
-                },
-                'features': [
-                    'Hi-Fi 24bit',
-                    'Cancellazione rumore intelligente',
-                    'Resistente all\'acqua IPX7',
-                    'Batteria fino a 8 ore'
-                ]
-            },
-            {
-                'asin': 'B0C1J96NT1',
-                'title': f'Anker PowerBank 20000mAh - Power Bank per "{keywords}"',
-                'url': f'https://www.amazon.it/dp/B0C1J96NT1?tag={self.associate_tag}',
-                'image_url': 'https://m.media-amazon.com/images/I/61N1ZqC+vsL._AC_SL1500_.jpg',
-                'brand': 'Anker',
-                'price': {
-                    'current': 39.99,
-                    'current_formatted': '€ 39,99',
-                    'original': 59.99,
-                    'original_formatted': '€ 59,99',
-                    'discount_percent': 33
-                },
-                'is_prime': True,
-                'rating': {
-                    'stars': 4.5,
-                    'count': 15678
-                },
-                'features': [
-                    'Capacità 20000mAh',
-                    'Ricarica rapida 20W',
-                    'USB-C bidirezionale',
-                    '2 porte di uscita'
-                ]
-            },
-            {
-                'asin': 'B0BDJ7R4PG',
-                'title': f'Kindle Paperwhite (16 GB) - "{keywords}"',
-                'url': f'https://www.amazon.it/dp/B0BDJ7R4PG?tag={self.associate_tag}',
-                'image_url': 'https://m.media-amazon.com/images/I/51QCk82iGcL._AC_SL1000_.jpg',
-                'brand': 'Amazon',
-                'price': {
-                    'current': 119.99,
-                    'current_formatted': '€ 119,99',
-                    'original': 159.99,
-                    'original_formatted': '€ 159,99',
-                    'discount_percent': 25
-                },
-                'is_prime': False,
-                'rating': {
-                    'stars': 4.8,
-                    'count': 34521
-                },
-                'features': [
-                    'Display 6.8" ad alta risoluzione',
-                    'Regolazione automatica luce',
-                    'Impermeabile IPX8',
-                    'Batteria settimane di durata'
-                ]
+        products = merge_ranked(products_by_category, scoring=scoring, weights=weights)
+        return {
+            'products': products,
+            'count': len(products),
+            'error': None,
+            'categories': summary
+        }
+
+    def stream_search(
+        self,
+        keywords,
+        categories=None,
+        category='All',
+        max_price=None,
+        item_count=10,
+        prime_only=False,
+        discount_only=False,
+        pages=1,
+        timeout=None,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        profile=DEFAULT_PROFILE
+    ):
+        """
+        Ricerca in streaming: un evento per pagina appena parsata
+
+        Le pagine (di una o più categorie) sono richieste in parallelo ed
+        emesse nell'ordine in cui arrivano, senza ASIN già emessi. A fine
+        ricerca i risultati completi sono salvati in cache come search_items;
+        senza cache né indice le pagine non restano in memoria dopo l'evento.
+
+        Args:
+            keywords: Parole chiave di ricerca
+            categories: Lista di search index (None = solo category)
+            category: Categoria Amazon se categories non è indicato
+            max_price: Prezzo massimo (opzionale)
+            item_count: Numero massimo di risultati per pagina (max 10)
+            prime_only: Solo prodotti Prime
+            discount_only: Solo prodotti in sconto
+            pages: Pagine per categoria
+            timeout: Secondi massimi per l'intera ricerca (None = illimitato)
+            priority: Priorità nel rate limiter (PRIORITY_*)
+            max_wait: Attesa massima per un token PA-API in secondi
+            profile: Profilo di resources (vedi RESOURCE_PROFILES)
+
+        Yields:
+            dict: {'event': 'page', 'category', 'page', 'products', 'cached', 'elapsed_ms'}
+                per pagina, poi {'event': 'summary', 'count', 'errors', 'timings'}
+        """
+        start = time.perf_counter()
+        pages = max(1, min(int(pages or 1), SEARCH_MAX_PAGES))
+        resources = get_resources(profile)
+        targets = list(dict.fromkeys(categories or [category]))
+
+        def elapsed_ms():
+            return round((time.perf_counter() - start) * 1000, 1)
+
+        seen = set()
+        count = 0
+        errors = []
+        timings = []
+
+        def page_event(target, page, products, cached=False):
+            nonlocal count
+            fresh = []
+            for product in products:
+                if product['asin'] not in seen:
+                    seen.add(product['asin'])
+                    fresh.append(product)
+            count += len(fresh)
+            timings.append({'category': target, 'page': page, 'ms': elapsed_ms()})
+            return {
+                'event': 'page',
+                'category': target,
+                'page': page,
+                'products': fresh,
+                'cached': cached,
+                'elapsed_ms': timings[-1]['ms']
             }
-        ]
 
-        # Applica filtri
-        filtered = []
-        for product in mock_products:
-            # Filtro prezzo
-            if max_price and product['price']['current'] and product['price']['current'] > max_price:
-                continue
+        def summary_event():
+            return {
+                'event': 'summary',
+                'count': count,
+                'errors': errors,
+                'timings': {
+                    'first_result_ms': timings[0]['ms'] if timings else None,
+                    'total_ms': elapsed_ms(),
+                    'pages': timings
+                }
+            }
 
-            # Filtro Prime
-            if prime_only and not product['is_prime']:
+        if self.demo_mode:
+            result = self._get_mock_products(
+                keywords, max_price, prime_only, discount_only, item_count * pages
+            )
+            yield page_event(targets[0], 1, result['products'])
+            yield summary_event()
+            return
+
+        keys = {}
+        pending = {}
+        for target in targets:
+            keys[target] = make_search_key(
+                keywords,
+                category=target,
+                max_price=max_price,
+                prime_only=prime_only,
+                discount_only=discount_only,
+                item_count=item_count,
+                marketplace=self.marketplace,
+                pages=pages,
+                profile=profile or DEFAULT_PROFILE
+            )
+            cached = self.cache.get(keys[target]) if self.cache else None
+            if cached is not None:
+                yield page_event(target, None, cached['products'], cached=True)
                 continue
 
-            # Filtro sconto
-            if discount_only and not product['price']['discount_percent']:
+            for page in range(1, pages + 1):
+                future = self._get_executor().submit(
+                    self._search_page,
+                    keywords, max_price, target, item_count, page, priority, max_wait, resources
+                )
+                pending[future] = (target, page)
+
+        # Pagine conservate solo se finiranno in cache o nell'indice
+        keep_pages = self.cache is not None or (
+            self.search_index is not None and INDEX_RESOURCE in resources
+        )
+        page_results = {}
+        failed = set()
+        try:
+            for future in as_completed(pending, timeout=timeout):
+                target, page = pending[future]
+                try:
+                    products = future.result()
+                except Exception as e:
+                    logger.warning(f"Pagina {page} di {target} non disponibile per {keywords!r}: {str(e)}")
+                    errors.append({'category': target, 'page': page, 'error': str(e)})
+                    failed.add(target)
+                    continue
+
+                if keep_pages:
+                    page_results.setdefault(target, {})[page] = products
+                if products:
+                    products = ProductTable(products).filter(
+                        prime_only=prime_only,
+                        discount_only=discount_only
+                    )
+                yield page_event(target, page, products or [])
+
+        except TimeoutError:
+            for future, (target, page) in pending.items():
+                if not future.done():
+                    errors.append({'category': target, 'page': page, 'error': 'Timeout'})
+                    failed.add(target)
+
+        # Categorie complete: stesso risultato di search_items, in cache e indice
+        for target, results in page_results.items():
+            if target in failed:
                 continue
+            result = merge_pages([results[page] for page in sorted(results)], prime_only, discount_only)
+            if result['error']:
+                continue
+            if self.cache is not None:
+                self.cache.set(keys[target], result)
+            if self.search_index is not None and INDEX_RESOURCE in resources:
+                self.search_index.mark_covered(keywords, target, max_price)
+
+        yield summary_event()
+
+    def _search_upstream(
+        self,
+        keywords,
+        max_price,
+        category,
+        item_count,
+        prime_only,
+        discount_only,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        pages=1,
+        resources=ITEM_RESOURCES
+    ):
+        """
+        Esegue la ricerca su PA-API (senza cache), una pagina per chiamata
+
+        Le pagine condividono una sola scadenza per i token, dimensionata
+        sul numero di pagine. Se solo alcune pagine falliscono il risultato
+        ha 'partial': True e non va salvato in cache.
+        """
+        deadline = self._token_deadline(priority, max_wait, pages) if pages > 1 else None
+
+        def fetch_page(page):
+            wait_limit = max_wait
+            if deadline is not None:
+                wait_limit = max(0.0, deadline - time.monotonic())
+            return self._search_page(
+                keywords, max_price, category, item_count, page, priority, wait_limit, resources
+            )
+
+        errors = []
+        if pages == 1:
+            try:
+                page_results = [fetch_page(1)]
+            except RateLimitExceeded:
+                # Propagata per permettere il fallback sulla cache
+                raise
+            except Exception as e:
+                logger.error(f"Errore nella ricerca Amazon: {str(e)}")
+                return {
+                    'products': [],
+                    'count': 0,
+                    'error': f"Errore API: {str(e)}"
+                }
+        else:
+            page_results = []
+            if getattr(self._fanout, 'active', False):
+                # Già su un thread del pool (fan-out per categoria): attendere
+                # altri task dello stesso pool potrebbe esaurirlo
+                for page in range(1, pages + 1):
+                    try:
+                        page_results.append(fetch_page(page))
+                    except Exception as e:
+                        errors.append(e)
+            else:
+                # Pagine in parallelo: la latenza è quella di una pagina più la
+                # spaziatura imposta dal rate limiter
+                futures = [
+                    self._get_executor().submit(fetch_page, page)
+                    for page in range(1, pages + 1)
+                ]
+                for future in futures:
+                    try:
+                        page_results.append(future.result())
+                    except Exception as e:
+                        errors.append(e)
+
+            if errors and not any(page_results):
+                for error in errors:
+                    if isinstance(error, RateLimitExceeded):
+                        raise error
+                logger.error(f"Errore nella ricerca Amazon: {str(errors[0])}")
+                return {
+                    'products': [],
+                    'count': 0,
+                    'error': f"Errore API: {str(errors[0])}"
+                }
+
+            for error in errors:
+                logger.warning(f"Pagina di ricerca non disponibile per {keywords!r}: {str(error)}")
+
+        result = merge_pages(page_results, prime_only, discount_only)
+        if pages > 1 and errors and not result['error']:
+            # Risultato troncato: segnalato al chiamante, non salvato in cache
+            result['partial'] = True
+        elif self.search_index is not None and not result['error'] and INDEX_RESOURCE in resources:
+            # I prodotti sono già indicizzati da _store: la query è ora coperta
+            self.search_index.mark_covered(keywords, category, max_price)
+        return result
+
+    def _search_page(
+        self,
+        keywords,
+        max_price,
+        category,
+        item_count,
+        page,
+        priority,
+        max_wait,
+        resources=ITEM_RESOURCES
+    ):
+        """
+        Esegue una singola chiamata SearchItems
+
+        Returns:
+            list | None: Prodotti della pagina in ordine di ranking,
+                None se la risposta non contiene risultati
+        """
+        self._acquire(priority, max_wait)
+
+        if self.raw_json:
+            payload = build_search_payload(
+                keywords,
+                self.associate_tag,
+                self.marketplace,
+                resources,
+                category=category,
+                item_count=item_count,
+                item_page=page,
+                max_price=max_price
+            )
+            search_result = self._post_raw('SearchItems', payload).get('SearchResult')
+            if not search_result:
+                return None
+
+            products = []
+            for item in search_result.get('Items') or []:
+                product = parse_product_raw(item, self.associate_tag)
+                if product:
+                    products.append(product)
+
+            self._store(products, resources, category)
+            return products
+
+        # Parametri di ricerca
+        search_params = {
+            'keywords': keywords,
+            'search_index': category if category != 'All' else 'All',
+            'item_count': min(item_count, 10),  # Max 10 per API limit
+            'resources': resources,
+        }
+
+        if page > 1:
+            search_params['item_page'] = page
+
+        # Aggiungi filtro prezzo
+        if max_price:
+            search_params['max_price'] = int(max_price * 100)  # Converti in centesimi
+
+        # Esegui ricerca
+        response = self.api.search_items(**search_params)
 
-            filtered.append(product)
+        if not response or not hasattr(response, 'search_result'):
+            return None
+
+        products = []
+        for item in response.search_result.items:
+            product = parse_product(item, self.associate_tag)
+            if product:
+                products.append(product)
+
+        self._store(products, resources, category)
+        return products
+
+    def get_stats(self):
+        """
+        Statistiche del client (cache, coalescing, batching, rate limit, connessioni)
 
+        Returns:
+            dict: Statistiche per componente
+        """
         return {
-            'products': filtered[:item_count],
-            'count': len(filtered[:item_count]),
-            'error': None
+            'demo_mode': self.demo_mode,
+            'search_cache': self.cache.stats() if self.cache else None,
+            'search_coalescing': self._search_flight.stats(),
+            'item_batching': self._item_batcher.stats() if self._item_batcher else None,
+            'rate_limiter': self.limiter.stats() if self.limiter else None,
+            'transport': self.transport.stats() if self.transport else None,
+            'catalog': self.catalog.stats() if self.catalog else None,
+            'price_history': self.price_history.stats() if self.price_history else None,
+            'search_index': self.search_index.stats() if self.search_index else None
         }
 
-    def get_item_details(self, asin):
+    def _get_mock_products(self, keywords, max_price=None, prime_only=False, discount_only=False, item_count=10):
+        """Ritorna prodotti mock per demo mode"""
+        return get_mock_products(
+            self.associate_tag, keywords, max_price, prime_only, discount_only, item_count
+        )
+
+    def get_item_details(self, asin, profile=DEFAULT_PROFILE):
         """
         Ottieni dettagli di un singolo prodotto
 
         Args:
             asin: Amazon Standard Identification Number
+            profile: Profilo di resources (vedi RESOURCE_PROFILES)
 
         Returns:
-            dict: Dettagli prodotto o None
+            Product: Dettagli prodotto o None
+
+        Raises:
+            RateLimitExceeded: Nessun token PA-API disponibile
         """
-        if self.demo_mode:
-            return None
+        resources = get_resources(profile)
+        if self.catalog is not None and not self.demo_mode:
+            product = self._catalog_lookup([asin], resources).get(asin)
+            if product is not None:
+                return product
+
+        if self._item_batcher is not None and not self.demo_mode and profile == DEFAULT_PROFILE:
+            # Lookup concorrenti di altre richieste condividono la stessa GetItems
+            return self._item_batcher.get(asin)
+
+        return self.get_items_batch([asin], profile=profile).get(asin)
+
+    def get_items_batch(
+        self,
+        asins,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        profile=DEFAULT_PROFILE
+    ):
+        """
+        Ottieni dettagli di più prodotti con il minimo numero di chiamate GetItems
+
+        Gli ASIN sono divisi in blocchi da 10 (limite PA-API) eseguiti
+        in parallelo sul pool del client.
+
+        Args:
+            asins: Lista di ASIN (duplicati ignorati)
+            priority: Priorità nel rate limiter (PRIORITY_*)
+            max_wait: Attesa massima per token PA-API per blocco (secondi)
+            profile: Profilo di resources (es: 'price-refresh' per i soli prezzi)
+
+        Returns:
+            dict: {asin: Product | None}, una chiave per ogni ASIN
+                richiesto; None indica un prodotto non trovato o in errore
+
+        Raises:
+            RateLimitExceeded: Nessun token PA-API entro max_wait per un blocco
+        """
+        resources = get_resources(profile)
+        unique_asins = list(dict.fromkeys(asin for asin in asins if asin))
+        results = dict.fromkeys(unique_asins)
+
+        if self.demo_mode or not unique_asins:
+            return results
+
+        # Righe fresche dal catalogo, PA-API solo per le altre
+        if self.catalog is not None:
+            results.update(self._catalog_lookup(unique_asins, resources))
+            unique_asins = [asin for asin in unique_asins if results[asin] is None]
+            if not unique_asins:
+                return results
+
+        chunks = [
+            unique_asins[i:i + GET_ITEMS_MAX_IDS]
+            for i in range(0, len(unique_asins), GET_ITEMS_MAX_IDS)
+        ]
 
+        def fetch_chunk(chunk):
+            return self._get_items_chunk(chunk, priority, max_wait, resources)
+
+        if len(chunks) == 1:
+            found_chunks = [fetch_chunk(chunks[0])]
+        else:
+            found_chunks = self._get_executor().map(fetch_chunk, chunks)
+
+        for found in found_chunks:
+            for asin, product in found.items():
+                if asin in results:
+                    results[asin] = product
+
+        return results
+
+    def _get_items_chunk(
+        self,
+        asins,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        resources=ITEM_RESOURCES
+    ):
+        """Esegue una chiamata GetItems per al massimo 10 ASIN"""
         try:
+            self._acquire(priority, max_wait)
+
+            if self.raw_json:
+                payload = build_get_items_payload(
+                    asins, self.associate_tag, self.marketplace, resources
+                )
+                items_result = self._post_raw('GetItems', payload).get('ItemsResult') or {}
+
+                found = {}
+                for item in items_result.get('Items') or []:
+                    product = parse_product_raw(item, self.associate_tag)
+                    if product:
+                        found[product['asin']] = product
+
+                self._store(found.values(), resources)
+                return found
+
             response = self.api.get_items(
-                item_ids=[asin],
-                resources=[
-                    'Images.Primary.Large',
-                    'ItemInfo.Title',
-                    'ItemInfo.Features',
-                    'ItemInfo.ByLineInfo',
-                    'Offers.Listings.Price',
-                    'Offers.Listings.SavingBasis',
-                    'Offers.Listings.ProgramEligibility.IsPrimeExclusive',
-                    'CustomerReviews.StarRating',
-                    'CustomerReviews.Count',
-                ]
+                item_ids=asins,
+                resources=resources
             )
 
+            found = {}
             if response and hasattr(response, 'items_result') and response.items_result.items:
-                return parse_product(response.items_result.items[0], self.associate_tag)
+                for item in response.items_result.items:
+                    product = parse_product(item, self.associate_tag)
+                    if product:
+                        found[product['asin']] = product
 
-            return None
+            self._store(found.values(), resources)
+            return found
+
+        except RateLimitExceeded:
+            # Un blocco limitato non equivale ad ASIN mancanti: lo decide il chiamante
+            raise
+        except Exception as e:
+            logger.error(f"Errore nel recupero dettagli prodotti {', '.join(asins)}: {str(e)}")
+            return {}
 
+    def _store(self, products, resources, category=None):
+        """Salva i prodotti di una risposta in storico, indice e catalogo (errori non bloccanti)"""
+        if self.price_history is not None and PRICE_RESOURCE in resources:
+            self.price_history.record_products(products)
+
+        if self.search_index is not None and INDEX_RESOURCE in resources:
+            self.search_index.add(products, category)
+
+        if self.catalog is None:
+            return
+
+        try:
+            self.catalog.upsert(products, resources, category=category)
         except Exception as e:
-            logger.error(f"Errore nel recupero dettagli prodotto {asin}: {str(e)}")
+            self.catalog.record_write_error()
+            logger.error(f"Errore nel salvataggio nel catalogo: {str(e)}")
+
+    def _catalog_lookup(self, asins, resources):
+        """Prodotti freschi dal catalogo ({} in caso di errore)"""
+        try:
+            return self.catalog.get_many(asins, resources)
+        except Exception as e:
+            logger.error(f"Errore nella lettura dal catalogo: {str(e)}")
+            return {}
+
+    def _post_raw(self, operation, payload):
+        """Firma e invia una richiesta PA-API sul transport, ritorna il JSON della risposta"""
+        url, headers, body = sign_request(
+            operation, payload, self._access_key, self._secret_key, self.region, self.host
+        )
+        response = self.transport.request('POST', url, body=body, headers=headers)
+        return check_response(json.loads(response.data or b'{}'), response.status)
+
+    def _acquire(self, priority, max_wait):
+        """Attende un token PA-API dal limiter (se configurato)"""
+        if self.limiter is not None:
+            self.limiter.acquire(priority, timeout=max_wait)
+
+    def _token_deadline(self, priority, max_wait, count):
+        """
+        Scadenza unica per i token delle count chiamate di una richiesta
+
+        Returns:
+            float | None: Scadenza su time.monotonic() (None = nessun limite)
+        """
+        if self.limiter is None:
             return None
+        budget = self.limiter.wait_budget(count, priority, max_wait)
+        return None if budget is None else time.monotonic() + budget
+
+    def _get_executor(self):
+        """Pool di thread per le chiamate PA-API parallele (creato al primo uso)"""
+        # Il lock evita che due prime richieste concorrenti creino due pool
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='paapi'
+                )
+            return self._executor
@@ -0,0 +1,507 @@
+"""
+Client asyncio per Amazon Product Advertising API 5.0
+"""
+import asyncio
+import logging
+import os
+import threading
+
+import httpx
+
+from amazon.api_client import (
+    DEFAULT_PROFILE,
+    GET_ITEMS_MAX_IDS,
+    INDEX_RESOURCE,
+    ITEM_RESOURCES,
+    PRICE_RESOURCE,
+    SEARCH_MAX_PAGES,
+    get_mock_products,
+    get_resources,
+    merge_pages,
+)
+from amazon.cache import make_search_key
+from amazon.paapi_request import (
+    build_get_items_payload,
+    build_search_payload,
+    check_response,
+    host_for_marketplace,
+    sign_request,
+)
+from amazon.product_parser import parse_product_raw
+from amazon.ranking import get_scorer, merge_ranked
+from amazon.rate_limiter import PRIORITY_INTERACTIVE, RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAmazonClient:
+    """
+    Versione asyncio di AmazonClient
+
+    Stesso contratto di search_items / get_item_details / get_items_batch,
+    con richieste firmate localmente e inviate su httpx.AsyncClient
+    (connessioni keep-alive riusate) e risposte lette da parse_product_raw.
+    Cache e limiter possono essere condivisi con il client sincrono.
+    """
+
+    def __init__(
+        self,
+        access_key,
+        secret_key,
+        associate_tag,
+        region,
+        marketplace,
+        cache=None,
+        limiter=None,
+        timeout=10.0,
+        max_connections=100,
+        transport=None,
+        catalog=None,
+        price_history=None,
+        search_index=None
+    ):
+        """
+        Inizializza client Amazon API asincrono
+
+        Args:
+            access_key: AWS Access Key
+            secret_key: AWS Secret Key
+            associate_tag: Amazon Associate Tag
+            region: AWS Region (es: eu-west-1)
+            marketplace: Amazon Marketplace (es: www.amazon.it)
+            cache: SearchCache per i risultati di ricerca (opzionale)
+            limiter: TokenBucket per TPS/TPD PA-API (opzionale)
+            timeout: Timeout HTTP in secondi
+            max_connections: Connessioni HTTP massime verso PA-API
+            transport: Transport httpx alternativo (es: MockTransport nei test)
+            catalog: ProductCatalog condiviso con il client sincrono (opzionale)
+            price_history: PriceHistory condiviso con il client sincrono (opzionale)
+            search_index: SearchIndex condiviso con il client sincrono (opzionale)
+        """
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.associate_tag = associate_tag
+        self.region = region
+        self.marketplace = marketplace
+        self.host = host_for_marketplace(marketplace)
+        self.cache = cache
+        self.limiter = limiter
+        self.catalog = catalog
+        self.price_history = price_history
+        self.search_index = search_index
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._transport = transport
+        self._http = None
+        self._http_loop = None
+
+        self.demo_mode = os.getenv('DEMO_MODE', 'False').lower() == 'true'
+        if not access_key or not secret_key:
+            self.demo_mode = True
+            logger.warning("⚠️  Credenziali Amazon mancanti - DEMO MODE attiva con dati mock")
+
+    async def search_items(
+        self,
+        keywords,
+        max_price=None,
+        category='All',
+        item_count=10,
+        prime_only=False,
+        discount_only=False,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        pages=1,
+        profile=DEFAULT_PROFILE
+    ):
+        """
+        Cerca prodotti su Amazon (vedi AmazonClient.search_items)
+
+        Le pagine sono richieste in parallelo sullo stesso event loop.
+
+        Returns:
+            dict: {
+                'products': [...],
+                'count': int,
+                'error': str | None,
+                'partial': True (solo se alcune pagine sono fallite; non in cache)
+            }
+        """
+        pages = max(1, min(int(pages or 1), SEARCH_MAX_PAGES))
+        resources = get_resources(profile)
+
+        if self.demo_mode:
+            return get_mock_products(
+                self.associate_tag, keywords, max_price, prime_only, discount_only, item_count * pages
+            )
+
+        key = make_search_key(
+            keywords,
+            category=category,
+            max_price=max_price,
+            prime_only=prime_only,
+            discount_only=discount_only,
+            item_count=item_count,
+            marketplace=self.marketplace,
+            pages=pages,
+            profile=profile or DEFAULT_PROFILE
+        )
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        # Le pagine condividono la scadenza dei token (vedi TokenBucket.wait_budget)
+        page_wait = max_wait
+        if pages > 1 and self.limiter is not None:
+            page_wait = self.limiter.wait_budget(pages, priority, max_wait)
+
+        page_results = await asyncio.gather(*(
+            self._search_page(
+                keywords, max_price, category, item_count, page, priority, page_wait, resources
+            )
+            for page in range(1, pages + 1)
+        ), return_exceptions=True)
+
+        errors = [page for page in page_results if isinstance(page, BaseException)]
+        page_results = [page for page in page_results if not isinstance(page, BaseException)]
+
+        if errors and not any(page_results):
+            if any(isinstance(error, RateLimitExceeded) for error in errors):
+                cached = self.cache.peek(key) if self.cache else None
+                if cached is not None:
+                    logger.info(f"Rate limit PA-API, servito risultato in cache per {keywords!r}")
+                    return cached
+
+                logger.warning(f"Rate limit PA-API per {keywords!r}: {str(errors[0])}")
+                return {
+                    'products': [],
+                    'count': 0,
+                    'error': 'Troppe richieste ad Amazon, riprova tra qualche secondo'
+                }
+
+            logger.error(f"Errore nella ricerca Amazon: {str(errors[0])}")
+            return {
+                'products': [],
+                'count': 0,
+                'error': f"Errore API: {str(errors[0])}"
+            }
+
+        for error in errors:
+            logger.warning(f"Pagina di ricerca non disponibile per {keywords!r}: {str(error)}")
+
+        result = merge_pages(page_results, prime_only, discount_only)
+        if errors and not result['error']:
+            # Risultato troncato: segnalato al chiamante, non salvato in cache
+            result['partial'] = True
+            return result
+        if self.search_index is not None and not result['error'] and INDEX_RESOURCE in resources:
+            self.search_index.mark_covered(keywords, category, max_price)
+        if self.cache is not None:
+            self.cache.set(key, result)
+        return result
+
+    async def search_categories(
+        self,
+        keywords,
+        categories,
+        max_price=None,
+        item_count=10,
+        prime_only=False,
+        discount_only=False,
+        pages=1,
+        timeout=None,
+        scoring='rank',
+        weights=None,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        profile=DEFAULT_PROFILE
+    ):
+        """
+        Cerca le stesse keywords su più categorie in parallelo
+        (vedi AmazonClient.search_categories)
+
+        Returns:
+            dict: {
+                'products': [...],
+                'count': int,
+                'error': str | None,
+                'categories': {categoria: {'count': int, 'error': str | None}}
+            }
+        """
+        get_scorer(scoring)
+        get_resources(profile)
+        categories = list(dict.fromkeys(categories))
+
+        async def search(category):
+            return await asyncio.wait_for(self.search_items(
+                keywords,
+                max_price=max_price,
+                category=category,
+                item_count=item_count,
+                prime_only=prime_only,
+                discount_only=discount_only,
+                priority=priority,
+                max_wait=max_wait,
+                pages=pages,
+                profile=profile
+            ), timeout)
+
+        results = await asyncio.gather(
+            *(search(category) for category in categories),
+            return_exceptions=True
+        )
+
+        products_by_category = {}
+        summary = {}
+        for category, result in zip(categories, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning(f"Categoria {category} esclusa per timeout ({keywords!r})")
+                summary[category] = {'count': 0, 'error': 'Timeout'}
+                continue
+            if isinstance(result, BaseException):
+                result = {'products': [], 'count': 0, 'error': str(result)}
+
+            summary[category] = {'count': result['count'], 'error': result['error']}
+            if not result['error']:
+                products_by_category[category] = result['products']
+
+        if not products_by_category:
+            errors = [info['error'] for info in summary.values() if info['error']]
+            return {
+                'products': [],
+                'count': 0,
+                'error': errors[0] if errors else 'Nessun risultato trovato',
+                'categories': summary
+            }
+
+        products = merge_ranked(products_by_category, scoring=scoring, weights=weights)
+        return {
+            'products': products,
+            'count': len(products),
+            'error': None,
+            'categories': summary
+        }
+
+    async def get_item_details(self, asin, profile=DEFAULT_PROFILE):
+        """
+        Ottieni dettagli di un singolo prodotto
+
+        Args:
+            asin: Amazon Standard Identification Number
+            profile: Profilo di resources (vedi RESOURCE_PROFILES)
+
+        Returns:
+            Product: Dettagli prodotto o None
+        """
+        return (await self.get_items_batch([asin], profile=profile)).get(asin)
+
+    async def get_items_batch(
+        self,
+        asins,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        profile=DEFAULT_PROFILE
+    ):
+        """
+        Ottieni dettagli di più prodotti (blocchi da 10 in parallelo)
+
+        Returns:
+            dict: {asin: Product | None}, una chiave per ogni ASIN richiesto
+
+        Raises:
+            RateLimitExceeded: Nessun token PA-API entro max_wait per un blocco
+        """
+        resources = get_resources(profile)
+        unique_asins = list(dict.fromkeys(asin for asin in asins if asin))
+        results = dict.fromkeys(unique_asins)
+
+        if self.demo_mode or not unique_asins:
+            return results
+
+        # Righe fresche dal catalogo, PA-API solo per le altre
+        if self.catalog is not None:
+            results.update(await self._catalog_lookup(unique_asins, resources))
+            unique_asins = [asin for asin in unique_asins if results[asin] is None]
+            if not unique_asins:
+                return results
+
+        chunks = [
+            unique_asins[i:i + GET_ITEMS_MAX_IDS]
+            for i in range(0, len(unique_asins), GET_ITEMS_MAX_IDS)
+        ]
+        found_chunks = await asyncio.gather(*(
+            self._get_items_chunk(chunk, priority, max_wait, resources) for chunk in chunks
+        ))
+
+        for found in found_chunks:
+            for asin, product in found.items():
+                if asin in results:
+                    results[asin] = product
+
+        return results
+
+    async def aclose(self):
+        """Chiude le connessioni HTTP aperte"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._http_loop = None
+
+    async def _search_page(
+        self,
+        keywords,
+        max_price,
+        category,
+        item_count,
+        page,
+        priority,
+        max_wait,
+        resources=ITEM_RESOURCES
+    ):
+        """Esegue una singola chiamata SearchItems (None se senza risultati)"""
+        await self._acquire(priority, max_wait)
+
+        payload = build_search_payload(
+            keywords,
+            self.associate_tag,
+            self.marketplace,
+            resources,
+            category=category,
+            item_count=item_count,
+            item_page=page,
+            max_price=max_price
+        )
+        data = await self._post('SearchItems', payload)
+
+        search_result = data.get('SearchResult')
+        if not search_result:
+            return None
+
+        products = []
+        for item in search_result.get('Items') or []:
+            product = parse_product_raw(item, self.associate_tag)
+            if product:
+                products.append(product)
+
+        await self._store(products, resources, category)
+        return products
+
+    async def _get_items_chunk(
+        self,
+        asins,
+        priority=PRIORITY_INTERACTIVE,
+        max_wait=None,
+        resources=ITEM_RESOURCES
+    ):
+        """Esegue una chiamata GetItems per al massimo 10 ASIN"""
+        try:
+            await self._acquire(priority, max_wait)
+            payload = build_get_items_payload(
+                asins, self.associate_tag, self.marketplace, resources
+            )
+            data = await self._post('GetItems', payload)
+
+            found = {}
+            for item in (data.get('ItemsResult') or {}).get('Items') or []:
+                product = parse_product_raw(item, self.associate_tag)
+                if product:
+                    found[product['asin']] = product
+
+            await self._store(found.values(), resources)
+            return found
+
+        except RateLimitExceeded:
+            # Come AmazonClient: un blocco limitato non equivale ad ASIN mancanti
+            raise
+        except Exception as e:
+            logger.error(f"Errore nel recupero dettagli prodotti {', '.join(asins)}: {str(e)}")
+            return {}
+
+    async def _post(self, operation, payload):
+        """Firma e invia una richiesta PA-API, ritorna il JSON della risposta"""
+        url, headers, body = sign_request(
+            operation, payload, self.access_key, self.secret_key, self.region, self.host
+        )
+        response = await self._get_http().post(url, content=body, headers=headers)
+        return check_response(response.json(), response.status_code)
+
+    async def _store(self, products, resources, category=None):
+        """Salva i prodotti di una risposta in storico, indice e catalogo (fuori dal loop)"""
+        if self.price_history is None and self.search_index is None and self.catalog is None:
+            return
+        # Storico e indice prendono lock di thread condivisi con il client sincrono
+        await asyncio.to_thread(self._store_sync, list(products), resources, category)
+
+    def _store_sync(self, products, resources, category):
+        """Parte bloccante di _store, eseguita in un thread"""
+        if self.price_history is not None and PRICE_RESOURCE in resources:
+            self.price_history.record_products(products)
+
+        if self.search_index is not None and INDEX_RESOURCE in resources:
+            self.search_index.add(products, category)
+
+        if self.catalog is None:
+            return
+
+        try:
+            self.catalog.upsert(products, resources, category=category)
+        except Exception as e:
+            self.catalog.record_write_error()
+            logger.error(f"Errore nel salvataggio nel catalogo: {str(e)}")
+
+    async def _catalog_lookup(self, asins, resources):
+        """Prodotti freschi dal catalogo ({} in caso di errore)"""
+        try:
+            return await asyncio.to_thread(self.catalog.get_many, asins, resources)
+        except Exception as e:
+            logger.error(f"Errore nella lettura dal catalogo: {str(e)}")
+            return {}
+
+    async def _acquire(self, priority, max_wait):
+        """Attende un token PA-API senza bloccare l'event loop"""
+        if self.limiter is not None:
+            await self.limiter.acquire_async(priority, max_wait)
+
+    def _get_http(self):
+        """httpx.AsyncClient legato all'event loop corrente (creato al primo uso)"""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self._transport
+            )
+            self._http_loop = loop
+        return self._http
+
+
+class EventLoopThread:
+    """
+    Event loop asyncio in un thread dedicato
+
+    Permette ai worker WSGI di condividere un solo loop (e quindi le
+    connessioni keep-alive di AsyncAmazonClient) invece di crearne uno
+    per richiesta.
+    """
+
+    def __init__(self, name='paapi-async'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        """
+        Esegue una coroutine sul loop condiviso
+
+        Returns:
+            concurrent.futures.Future: Risultato della coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run(self, coro):
+        """Attende da un altro event loop una coroutine eseguita sul loop condiviso"""
+        return await asyncio.wrap_future(self.submit(coro))
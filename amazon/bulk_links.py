@@ -0,0 +1,232 @@
+"""
+Riscrittura in blocco di link affiliati
+
+Pipeline di generatori: le righe in ingresso (CSV o una URL per riga)
+sono lette, classificate e riscritte una alla volta, con memoria costante
+a prescindere dalla dimensione dell'input.
+"""
+import csv
+import io
+from itertools import islice
+import json
+import logging
+import time
+
+from amazon.link_generator import add_affiliate_tag_to_url, classify_url, extract_asin_from_url
+
+logger = logging.getLogger(__name__)
+
+# Colonne dei risultati (output CSV)
+RESULT_FIELDS = ('line', 'input', 'url', 'asin', 'domain', 'kind')
+
+# Nomi di colonna riconosciuti come URL negli input CSV con intestazione
+URL_COLUMNS = ('url', 'link', 'href')
+
+
+def read_urls(lines, input_format='lines', column=None):
+    """
+    Legge le URL da un input testuale
+
+    Args:
+        lines: Iterabile di righe di testo (file aperto, request stream decodificato, lista)
+        input_format: 'lines' (una URL per riga) o 'csv'
+        column: Colonna CSV con le URL (nome o indice); default: colonna
+            'url'/'link'/'href' dell'intestazione, altrimenti la prima cella http(s)
+
+    Yields:
+        tuple: (numero di riga, URL)
+
+    Raises:
+        ValueError: Formato non supportato
+    """
+    if input_format == 'lines':
+        for number, line in enumerate(lines, 1):
+            url = line.strip()
+            if url:
+                yield number, url
+        return
+
+    if input_format != 'csv':
+        raise ValueError(f"Formato non supportato: {input_format}")
+
+    index = column if isinstance(column, int) else None
+    for number, row in enumerate(csv.reader(lines), 1):
+        if not row:
+            continue
+
+        if number == 1 and index is None:
+            header = [cell.strip().lower() for cell in row]
+            names = [str(column).lower()] if column is not None else URL_COLUMNS
+            found = next((header.index(name) for name in names if name in header), None)
+            if found is not None:
+                index = found
+                continue
+
+        if index is not None:
+            url = row[index].strip() if index < len(row) else ''
+        else:
+            url = next((cell.strip() for cell in row if cell.strip().startswith(('http://', 'https://'))), '')
+
+        if url:
+            yield number, url
+
+
+def rewrite_links(urls, associate_tag, stats=None, resolver=None, window=64):
+    """
+    Classifica le URL, estrae gli ASIN e riscrive il tag affiliato
+
+    Solo le URL Amazon ricevono il tag; le altre sono restituite
+    invariate. I link brevi (amzn.to, ...) sono taggati solo se risolti:
+    il redirect non conserva la query string, quindi un tag aggiunto al
+    link breve andrebbe perso. Con un resolver sono sostituiti dall'URL
+    del marketplace (risolti in parallelo, `window` righe alla volta),
+    così anche da questi si estrae l'ASIN.
+
+    Args:
+        urls: Iterabile di (numero di riga, URL) da read_urls
+        associate_tag: Tag affiliato da impostare
+        stats: BulkStats da aggiornare (opzionale)
+        resolver: ShortLinkResolver per i link brevi (opzionale)
+        window: Righe lette per ogni giro di risoluzione in parallelo
+
+    Yields:
+        dict: {'line', 'input', 'url', 'asin', 'domain', 'kind'}; con un
+            resolver anche 'resolved' (URL risolto, None se il link è morto)
+    """
+    urls = iter(urls)
+    while True:
+        batch = [(number, url, classify_url(url)) for number, url in islice(urls, window)]
+        if not batch:
+            return
+
+        resolved = {}
+        if resolver is not None:
+            resolved = resolver.resolve_many(
+                url for _, url, (_, kind) in batch if kind == 'short'
+            )
+
+        for number, url, (domain, kind) in batch:
+            asin = None
+            rewritten = url
+            tagged = False
+            if kind == 'short' and resolved.get(url):
+                rewritten = add_affiliate_tag_to_url(resolved[url], associate_tag)
+                asin = extract_asin_from_url(resolved[url])
+                tagged = True
+            elif kind == 'amazon':
+                rewritten = add_affiliate_tag_to_url(url, associate_tag)
+                asin = extract_asin_from_url(url)
+                tagged = True
+
+            if stats is not None:
+                stats.add(kind, asin, tagged)
+
+            result = {
+                'line': number,
+                'input': url,
+                'url': rewritten,
+                'asin': asin,
+                'domain': domain,
+                'kind': kind
+            }
+            if resolver is not None:
+                result['resolved'] = resolved.get(url) if kind == 'short' else None
+            yield result
+
+
+class BulkStats:
+    """Contatori di un job di riscrittura, con throughput in URL/secondo"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.urls = 0
+        self.tagged = 0
+        self.unresolved = 0
+        self.asins = 0
+        self.kinds = {'amazon': 0, 'short': 0, 'other': 0, 'invalid': 0}
+
+    def add(self, kind, asin, tagged):
+        """Conta una URL processata (tagged: il tag affiliato è stato applicato)"""
+        self.urls += 1
+        self.kinds[kind] += 1
+        if tagged:
+            self.tagged += 1
+        elif kind == 'short':
+            self.unresolved += 1
+        if asin:
+            self.asins += 1
+
+    def summary(self):
+        """
+        Riepilogo del job
+
+        Returns:
+            dict: URL processate, taggate, link brevi lasciati invariati
+                (non risolti), ASIN estratti, conteggi per tipo, secondi
+                trascorsi e URL/secondo
+        """
+        elapsed = self._clock() - self.started
+        return {
+            'urls': self.urls,
+            'tagged': self.tagged,
+            'unresolved': self.unresolved,
+            'asins': self.asins,
+            'kinds': dict(self.kinds),
+            'elapsed_seconds': round(elapsed, 3),
+            'urls_per_second': round(self.urls / elapsed) if elapsed > 0 else None
+        }
+
+
+def to_ndjson(results, stats=None):
+    """
+    Serializza i risultati come JSON Lines
+
+    Yields:
+        str: Una riga per risultato, poi {'summary': ...} se stats è indicato
+    """
+    for result in results:
+        yield json.dumps(result, separators=(',', ':')) + '\n'
+    if stats is not None:
+        yield json.dumps({'summary': stats.summary()}, separators=(',', ':')) + '\n'
+
+
+def to_csv(results):
+    """
+    Serializza i risultati come CSV (intestazione RESULT_FIELDS)
+
+    Yields:
+        str: Intestazione e una riga CSV per risultato
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RESULT_FIELDS)
+    for result in results:
+        writer.writerow([result[field] or '' for field in RESULT_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def chunked(texts, size=65536):
+    """
+    Raggruppa stringhe brevi in blocchi di circa `size` caratteri
+
+    Evita un chunk HTTP per ogni riga nelle risposte in streaming.
+
+    Yields:
+        str: Blocchi di testo
+    """
+    parts = []
+    length = 0
+    for text in texts:
+        parts.append(text)
+        length += len(text)
+        if length >= size:
+            yield ''.join(parts)
+            parts = []
+            length = 0
+    if parts:
+        yield ''.join(parts)
@@ -0,0 +1,234 @@
+"""
+Cache in-process dei risultati di ricerca Amazon
+"""
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def make_search_key(
+    keywords,
+    category='All',
+    max_price=None,
+    prime_only=False,
+    discount_only=False,
+    item_count=10,
+    marketplace='',
+    pages=1,
+    profile='detail'
+):
+    """
+    Costruisce la chiave normalizzata di una ricerca
+
+    Args:
+        keywords: Parole chiave di ricerca
+        category: Categoria Amazon
+        max_price: Prezzo massimo (opzionale)
+        prime_only: Solo prodotti Prime
+        discount_only: Solo prodotti in sconto
+        item_count: Numero massimo di risultati
+        marketplace: Marketplace Amazon (es: www.amazon.it)
+        pages: Numero di pagine di risultati richieste
+        profile: Profilo di resources PA-API
+
+    Returns:
+        tuple: Chiave hashable, uguale per ricerche equivalenti
+    """
+    normalized_keywords = ' '.join((keywords or '').lower().split())
+    normalized_price = round(float(max_price), 2) if max_price else None
+
+    return (
+        normalized_keywords,
+        category or 'All',
+        normalized_price,
+        bool(prime_only),
+        bool(discount_only),
+        int(item_count),
+        (marketplace or '').lower(),
+        int(pages or 1),
+        profile or 'detail'
+    )
+
+
+class SearchCache:
+    """Cache TTL con stale-while-revalidate per i risultati di search_items"""
+
+    def __init__(self, ttl=300, stale_ttl=600, max_entries=1000, clock=time.monotonic):
+        """
+        Inizializza cache risultati
+
+        Args:
+            ttl: Secondi in cui un risultato è considerato fresco
+            stale_ttl: Secondi oltre il TTL in cui il risultato è servito
+                mentre viene aggiornato in background
+            max_entries: Numero massimo di ricerche in cache (LRU)
+            clock: Funzione orologio (iniettabile nei test)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get_or_fetch(self, key, fetch, refresh=None):
+        """
+        Ritorna il risultato in cache o lo recupera con fetch()
+
+        Un risultato scaduto ma ancora entro stale_ttl viene servito subito
+        e aggiornato da un solo refresh in background.
+
+        Args:
+            key: Chiave da make_search_key()
+            fetch: Callable senza argomenti che esegue la ricerca upstream
+            refresh: Callable usato per il refresh in background (default: fetch)
+
+        Returns:
+            dict: Risultato della ricerca
+        """
+        start_refresh = False
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, stored_at = entry
+                age = self._clock() - stored_at
+
+                if age < self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return result
+
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        start_refresh = True
+                else:
+                    # Troppo vecchio per essere servito, resta solo come fallback (peek)
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+
+        if entry is not None:
+            if start_refresh:
+                threading.Thread(
+                    target=self._refresh,
+                    args=(key, refresh or fetch),
+                    daemon=True
+                ).start()
+            return result
+
+        result = fetch()
+        self.set(key, result)
+        return result
+
+    def get(self, key):
+        """
+        Ritorna il risultato solo se fresco, senza fetch né refresh
+
+        Usato dai chiamanti asincroni, che eseguono il fetch upstream
+        da sé e salvano il risultato con set().
+
+        Args:
+            key: Chiave da make_search_key()
+
+        Returns:
+            dict | None: Risultato fresco, None altrimenti (conteggiato come miss)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, result):
+        """Salva un risultato (solo se completo e senza errori)"""
+        if not result or result.get('error') or result.get('partial'):
+            return
+
+        with self._lock:
+            self._entries[key] = (result, self._clock())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def peek(self, key):
+        """
+        Ritorna il risultato in cache a prescindere dall'età, senza contare hit/miss
+
+        Args:
+            key: Chiave da make_search_key()
+
+        Returns:
+            dict | None: Ultimo risultato salvato
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def clear(self):
+        """Svuota la cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Statistiche della cache
+
+        Returns:
+            dict: Contatori hit/miss e dimensione
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0
+            }
+
+    def _refresh(self, key, fetch):
+        """Aggiorna in background una entry scaduta"""
+        try:
+            result = fetch()
+            if result.get('error') or result.get('partial'):
+                with self._lock:
+                    self.refresh_errors += 1
+                logger.warning(
+                    f"Refresh cache fallito per {key[0]!r}: {result.get('error') or 'pagine mancanti'}"
+                )
+                return
+
+            self.set(key, result)
+            with self._lock:
+                self.refreshes += 1
+
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+            logger.error(f"Errore nel refresh cache per {key[0]!r}: {str(e)}")
+
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
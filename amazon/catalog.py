@@ -0,0 +1,329 @@
+"""
+Catalogo locale dei prodotti Amazon (SQLite in WAL mode)
+
+Ogni risposta PA-API viene salvata con un upsert in blocco; dettagli e
+lookup ripetuti possono essere serviti dal catalogo finché la riga è
+più recente di max_age.
+"""
+import json
+import logging
+import threading
+import time
+
+from amazon.models import NO_PRICE, NO_RATING, Price, Product, Rating
+from amazon.sqlite_pool import SQLitePool
+
+logger = logging.getLogger(__name__)
+
+# Gruppi di colonne: resource PA-API che li popola e colonne aggiornate.
+# Una risposta aggiorna solo i gruppi richiesti (es: 'price-refresh' non
+# sovrascrive titolo e features con i valori di default).
+COLUMN_GROUPS = {
+    'info': (
+        'ItemInfo.Title',
+        ('title', 'url', 'image_url', 'brand', 'is_prime', 'stars', 'reviews')
+    ),
+    'price': (
+        'Offers.Listings.Price',
+        ('price', 'price_formatted', 'original', 'original_formatted', 'discount_percent')
+    ),
+    'features': (
+        'ItemInfo.Features',
+        ('features',)
+    ),
+}
+
+COLUMNS = ('asin', 'category') + tuple(
+    column for _, columns in COLUMN_GROUPS.values() for column in columns
+) + tuple(f"{group}_updated" for group in COLUMN_GROUPS)
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS products ('
+    'asin TEXT PRIMARY KEY, category TEXT, '
+    'title TEXT, url TEXT, image_url TEXT, brand TEXT, '
+    'is_prime INTEGER, stars REAL, reviews INTEGER, '
+    'price REAL, price_formatted TEXT, original REAL, original_formatted TEXT, '
+    'discount_percent INTEGER, features TEXT, '
+    'info_updated REAL, price_updated REAL, features_updated REAL)',
+    'CREATE INDEX IF NOT EXISTS products_category ON products (category)',
+    'CREATE INDEX IF NOT EXISTS products_price ON products (price)',
+    'CREATE INDEX IF NOT EXISTS products_discount ON products (discount_percent)',
+]
+
+# Parametri massimi per singola query IN (...)
+LOOKUP_CHUNK = 500
+
+
+def groups_for(resources):
+    """
+    Gruppi di colonne popolati da una lista di resources PA-API
+
+    Args:
+        resources: Resources richieste (es: RESOURCE_PROFILES['card'])
+
+    Returns:
+        tuple: Nomi dei gruppi in COLUMN_GROUPS
+    """
+    resources = set(resources)
+    return tuple(
+        group for group, (resource, _) in COLUMN_GROUPS.items() if resource in resources
+    )
+
+
+def product_row(product, category, groups, now):
+    """Valori di una riga products (ordine di COLUMNS) per un Product"""
+    price = product.price
+    return (
+        product.asin,
+        category,
+        product.title,
+        product.url,
+        product.image_url,
+        product.brand,
+        int(product.is_prime),
+        product.rating.stars,
+        product.rating.count,
+        price.current,
+        price.current_formatted,
+        price.original,
+        price.original_formatted,
+        price.discount_percent,
+        json.dumps(list(product.features)),
+    ) + tuple(now if group in groups else None for group in COLUMN_GROUPS)
+
+
+def row_product(row):
+    """Product da una riga products (ordine di COLUMNS)"""
+    (asin, _, title, url, image_url, brand, is_prime, stars, reviews,
+     current, current_formatted, original, original_formatted, discount_percent,
+     features) = row[:15]
+
+    price = Price(current, current_formatted, original, original_formatted, discount_percent)
+    rating = Rating(stars, reviews)
+
+    return Product(
+        asin=asin,
+        title=title,
+        url=url,
+        image_url=image_url,
+        brand=brand,
+        price=NO_PRICE if price == NO_PRICE else price,
+        is_prime=bool(is_prime),
+        rating=NO_RATING if rating == NO_RATING else rating,
+        features=tuple(json.loads(features)) if features else ()
+    )
+
+
+class ProductCatalog:
+    """Catalogo prodotti su file SQLite, condiviso tra thread e processi"""
+
+    def __init__(self, path, max_age=3600, busy_timeout=5.0, pool_size=4, clock=time.time):
+        """
+        Args:
+            path: Percorso del file SQLite
+            max_age: Età massima (secondi) di una riga servita dal catalogo
+            busy_timeout: Attesa massima per il lock in scrittura (secondi)
+            pool_size: Connessioni SQLite aperte al massimo, condivise tra i thread
+            clock: Orologio di sistema, condiviso tra i processi
+        """
+        self.path = path
+        self.max_age = max_age
+        self.busy_timeout = busy_timeout
+        self._clock = clock
+
+        # I lettori WAL non si bloccano; thread di breve durata non lasciano connessioni
+        self._pool = SQLitePool(path, size=pool_size, busy_timeout=busy_timeout, schema=SCHEMA)
+        self._lock = threading.Lock()
+        self._upsert_sql = {}
+
+        self.transactions = 0
+        self.upserts = 0
+        self.lookups = 0
+        self.hits = 0
+        self.write_errors = 0
+
+    def upsert(self, products, resources, category=None):
+        """
+        Salva i prodotti di una risposta PA-API in una sola transazione
+
+        Args:
+            products: Product parsati dalla risposta
+            resources: Resources richieste (decidono quali colonne aggiornare)
+            category: Categoria di ricerca (None/'All' = mantiene quella salvata)
+
+        Returns:
+            int: Prodotti salvati
+        """
+        groups = groups_for(resources)
+        category = None if category == 'All' else category
+        now = self._clock()
+        rows = [product_row(product, category, groups, now) for product in products]
+        if not rows or not groups:
+            return 0
+
+        with self._pool.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(self._upsert_statement(groups), rows)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+        with self._lock:
+            self.transactions += 1
+            self.upserts += len(rows)
+        return len(rows)
+
+    def get(self, asin, resources, max_age=None):
+        """
+        Prodotto dal catalogo, se i campi richiesti sono abbastanza recenti
+
+        Args:
+            asin: ASIN del prodotto
+            resources: Resources che la risposta avrebbe dovuto contenere
+            max_age: Età massima in secondi (default: self.max_age)
+
+        Returns:
+            Product | None
+        """
+        return self.get_many([asin], resources, max_age).get(asin)
+
+    def get_many(self, asins, resources, max_age=None):
+        """
+        Prodotti freschi dal catalogo per una lista di ASIN
+
+        Args:
+            asins: ASIN da cercare
+            resources: Resources che la risposta avrebbe dovuto contenere
+            max_age: Età massima in secondi (default: self.max_age)
+
+        Returns:
+            dict: {asin: Product} solo per le righe fresche
+        """
+        asins = list(dict.fromkeys(asins))
+        groups = groups_for(resources)
+        found = {}
+
+        if asins and groups:
+            freshness = self._freshness(groups, max_age)
+            with self._pool.connection() as conn:
+                for i in range(0, len(asins), LOOKUP_CHUNK):
+                    chunk = asins[i:i + LOOKUP_CHUNK]
+                    placeholders = ', '.join('?' * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT {', '.join(COLUMNS)} FROM products "
+                        f"WHERE asin IN ({placeholders}) AND {freshness[0]}",
+                        chunk + freshness[1]
+                    ).fetchall()
+                    for row in rows:
+                        found[row[0]] = row_product(row)
+
+        with self._lock:
+            self.lookups += len(asins)
+            self.hits += len(found)
+        return found
+
+    def find(
+        self,
+        category=None,
+        max_price=None,
+        min_discount=None,
+        prime_only=False,
+        limit=50,
+        max_age=None
+    ):
+        """
+        Prodotti freschi filtrati per categoria, prezzo e sconto
+
+        Args:
+            category: Categoria di ricerca (None/'All' = tutte)
+            max_price: Prezzo massimo
+            min_discount: Sconto minimo in percentuale
+            prime_only: Solo prodotti Prime
+            limit: Numero massimo di risultati
+            max_age: Età massima in secondi (default: self.max_age)
+
+        Returns:
+            list: Product ordinati per sconto decrescente
+        """
+        where, params = self._freshness(('info', 'price'), max_age)
+        clauses = [where]
+
+        if category and category != 'All':
+            clauses.append('category = ?')
+            params.append(category)
+        if max_price:
+            clauses.append('price <= ?')
+            params.append(max_price)
+        if min_discount:
+            clauses.append('discount_percent >= ?')
+            params.append(min_discount)
+        if prime_only:
+            clauses.append('is_prime = 1')
+
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM products WHERE {' AND '.join(clauses)} "
+                'ORDER BY discount_percent DESC, asin LIMIT ?',
+                params + [int(limit)]
+            ).fetchall()
+        return [row_product(row) for row in rows]
+
+    def count(self):
+        """Numero di prodotti nel catalogo"""
+        with self._pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+
+    def close(self):
+        """Chiude le connessioni SQLite del pool"""
+        self._pool.close()
+
+    def stats(self):
+        """
+        Statistiche del catalogo
+
+        Returns:
+            dict: Scritture, lookup, hit rate e connessioni del pool
+        """
+        with self._lock:
+            return {
+                'transactions': self.transactions,
+                'upserts': self.upserts,
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'write_errors': self.write_errors,
+                'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+                'connections': self._pool.stats()
+            }
+
+    def record_write_error(self):
+        """Conta una scrittura fallita (il chiamante prosegue senza catalogo)"""
+        with self._lock:
+            self.write_errors += 1
+
+    def _freshness(self, groups, max_age):
+        """Condizione SQL (e parametri) per righe con i gruppi aggiornati di recente"""
+        max_age = self.max_age if max_age is None else max_age
+        cutoff = self._clock() - max_age
+        where = ' AND '.join(f"{group}_updated >= ?" for group in groups)
+        return where, [cutoff] * len(groups)
+
+    def _upsert_statement(self, groups):
+        """INSERT ... ON CONFLICT che aggiorna solo le colonne dei gruppi ricevuti"""
+        statement = self._upsert_sql.get(groups)
+        if statement is None:
+            updates = ['category = COALESCE(excluded.category, products.category)']
+            for group in groups:
+                updates.extend(
+                    f"{column} = excluded.{column}" for column in COLUMN_GROUPS[group][1]
+                )
+                updates.append(f"{group}_updated = excluded.{group}_updated")
+
+            statement = (
+                f"INSERT INTO products ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))}) "
+                f"ON CONFLICT (asin) DO UPDATE SET {', '.join(updates)}"
+            )
+            self._upsert_sql[groups] = statement
+        return statement
@@ -0,0 +1,113 @@
+"""
+Esportazione dei risultati di ricerca in CSV / JSON Lines
+
+I prodotti arrivano a pagine (es: da AmazonClient.stream_search) e ogni
+pagina è serializzata e inviata subito: l'esportazione non tiene mai in
+memoria l'intero risultato. Le pagine non esportate (errori upstream)
+sono segnalate in coda al file: righe '#error' nel CSV, record con chiave
+'error' nel JSON Lines.
+"""
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Formati supportati -> (mimetype, estensione)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+# Colonne CSV (stesse di exportToCSV in static/js/app.js)
+CSV_COLUMNS = (
+    'ASIN', 'Title', 'Brand', 'Price', 'Original Price', 'Discount %',
+    'Prime', 'Rating', 'Reviews', 'URL'
+)
+
+# Prima colonna delle righe di errore in coda al CSV
+CSV_ERROR_MARKER = '#error'
+
+
+def csv_row(product):
+    """Riga CSV di un prodotto (Product o dict di parse_product)"""
+    price = product['price']
+    rating = product['rating']
+    return (
+        product['asin'],
+        product['title'],
+        product['brand'],
+        price['current'] if price['current'] is not None else 'N/A',
+        price['original'] if price['original'] is not None else 'N/A',
+        price['discount_percent'] or 0,
+        'Yes' if product['is_prime'] else 'No',
+        rating['stars'] or 0,
+        rating['count'] or 0,
+        product['url']
+    )
+
+
+def iter_csv(pages, errors=()):
+    """
+    CSV con intestazione, un blocco di testo per pagina di prodotti
+
+    Args:
+        pages: Iterabile di liste di prodotti
+        errors: Lista di errori {'error', 'category', 'page'}, letta dopo
+            l'ultima pagina (può essere riempita durante l'iterazione)
+
+    Yields:
+        str: Intestazione, le righe di ogni pagina, poi una riga
+            ('#error', categoria, pagina, errore) per errore
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue()
+
+    for products in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(csv_row(product) for product in products)
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    if errors:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (CSV_ERROR_MARKER, error.get('category', ''), error.get('page', ''), error['error'])
+            for error in errors
+        )
+        yield buffer.getvalue()
+
+
+def iter_jsonl(pages, errors=()):
+    """
+    JSON Lines, un blocco di testo per pagina di prodotti
+
+    Args:
+        pages: Iterabile di liste di prodotti
+        errors: Lista di errori {'error', 'category', 'page'}, letta dopo
+            l'ultima pagina (può essere riempita durante l'iterazione)
+
+    Yields:
+        str: Un oggetto JSON per riga, poi un record {'error', ...} per errore
+    """
+    for products in pages:
+        if products:
+            yield ''.join(
+                json.dumps(
+                    product.to_dict() if hasattr(product, 'to_dict') else product,
+                    ensure_ascii=False,
+                    separators=(',', ':')
+                ) + '\n'
+                for product in products
+            )
+
+    if errors:
+        yield ''.join(
+            json.dumps(error, ensure_ascii=False, separators=(',', ':')) + '\n'
+            for error in errors
+        )
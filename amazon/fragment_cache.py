@@ -0,0 +1,106 @@
+"""
+Cache dei frammenti HTML renderizzati (card prodotto di results.html)
+
+Una card dipende solo dai campi mostrati del prodotto: finché non
+cambiano, l'HTML già renderizzato viene riusato senza passare da Jinja
+(né dai filtri format_price e stars).
+"""
+from collections import OrderedDict
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def card_key(product):
+    """
+    Chiave della card di un prodotto: ASIN e campi mostrati
+
+    Args:
+        product: Product o dict di parse_product
+
+    Returns:
+        tuple: Chiave hashable, diversa se cambia un campo visibile
+    """
+    price = product['price']
+    rating = product['rating']
+    return (
+        product['asin'],
+        product['title'],
+        product['url'],
+        product['image_url'],
+        product['brand'],
+        product['is_prime'],
+        price['current'],
+        price['original'],
+        price['discount_percent'],
+        rating['stars'],
+        rating['count'],
+        tuple(product['features'][:3]) if product['features'] else ()
+    )
+
+
+class FragmentCache:
+    """Cache LRU di frammenti HTML con contatori hit/miss"""
+
+    def __init__(self, max_entries=5000):
+        """
+        Args:
+            max_entries: Frammenti massimi in cache (i meno usati sono rimossi)
+        """
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        """
+        Ritorna il frammento in cache o lo renderizza con render()
+
+        Args:
+            key: Chiave del frammento (es: card_key(product))
+            render: Callable senza argomenti che produce l'HTML
+
+        Returns:
+            str: HTML del frammento
+        """
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return html
+            self.misses += 1
+
+        html = render()
+
+        with self._lock:
+            self._entries[key] = html
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return html
+
+    def clear(self):
+        """Svuota la cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Statistiche della cache
+
+        Returns:
+            dict: Dimensione e contatori hit/miss
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -2,6 +2,34 @@
 Generatore link affiliati Amazon
 """
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import re
+
+# Domini di tutti i marketplace Amazon (confronto per suffisso esatto)
+AMAZON_DOMAINS = frozenset((
+    'amazon.com', 'amazon.ca', 'amazon.com.mx', 'amazon.com.br',
+    'amazon.co.uk', 'amazon.ie', 'amazon.de', 'amazon.fr', 'amazon.it',
+    'amazon.es', 'amazon.nl', 'amazon.se', 'amazon.pl', 'amazon.com.be',
+    'amazon.com.tr', 'amazon.ae', 'amazon.sa', 'amazon.eg', 'amazon.in',
+    'amazon.co.jp', 'amazon.sg', 'amazon.com.au', 'amazon.cn',
+))
+
+# Link brevi: l'ASIN compare solo dopo il redirect
+SHORT_LINK_DOMAINS = frozenset(('amzn.to', 'amzn.eu', 'amzn.asia', 'a.co'))
+
+_DOMAIN_KINDS = {
+    **{domain: 'amazon' for domain in AMAZON_DOMAINS},
+    **{domain: 'short' for domain in SHORT_LINK_DOMAINS},
+}
+
+# Host di una URL http(s): schema, credenziali opzionali, host fino a porta/path
+_HOST_RE = re.compile(r'https?://(?:[^@/?#]*@)?([^:/?#]+)', re.IGNORECASE)
+
+# ASIN (10 caratteri alfanumerici) nei path prodotto o nel parametro asin=
+_ASIN_RE = re.compile(
+    r'/(?:dp|gp/product|gp/aw/d|exec/obidos/ASIN|product)/([A-Z0-9]{10})(?![A-Z0-9])'
+    r'|[?&]asin=([A-Z0-9]{10})(?![A-Z0-9])',
+    re.IGNORECASE
+)
 
 
 def generate_affiliate_link(asin, associate_tag, marketplace='www.amazon.it'):
@@ -74,6 +102,9 @@ def extract_asin_from_url(url):
     """
     Estrae ASIN da URL Amazon
 
+    Riconosce /dp/, /gp/product/, /gp/aw/d/, /exec/obidos/ASIN/, /product/
+    e il parametro ?asin= con un solo pattern compilato.
+
     Args:
         url: URL prodotto Amazon
 
@@ -83,32 +114,58 @@ def extract_asin_from_url(url):
     if not url:
         return None
 
-    # Parse URL
-    parsed = urlparse(url)
-    path_parts = parsed.path.split('/')
-
-    # ASIN è solitamente dopo /dp/ o /product/
-    try:
-        if 'dp' in path_parts:
-            idx = path_parts.index('dp')
-            return path_parts[idx + 1]
-        elif 'product' in path_parts:
-            idx = path_parts.index('product')
-            return path_parts[idx + 1]
-    except (IndexError, ValueError):
-        pass
-
-    # Prova a estrarre da query params
-    params = parse_qs(parsed.query)
-    if 'asin' in params:
-        return params['asin'][0]
+    match = _ASIN_RE.search(url)
+    if match is None:
+        return None
+    return (match.group(1) or match.group(2)).upper()
+
+
+def url_host(url):
+    """
+    Host di una URL in minuscolo, senza credenziali né porta
+
+    Returns:
+        str: Host o '' se la URL non ha schema http(s) / host
+    """
+    if not url:
+        return ''
+    match = _HOST_RE.match(url)
+    return match.group(1).lower().rstrip('.') if match else ''
+
 
-    return None
+def classify_url(url):
+    """
+    Dominio e tipo di una URL
+
+    Il dominio è confrontato per suffisso esatto (etichette intere) con
+    AMAZON_DOMAINS e SHORT_LINK_DOMAINS: amazon.it.example.com e
+    evil-amazon.it non sono Amazon.
+
+    Args:
+        url: URL da classificare
+
+    Returns:
+        tuple: (host, tipo) con tipo 'amazon', 'short' (link brevi),
+            'other' o 'invalid' (non http/https)
+    """
+    host = url_host(url)
+    if not host:
+        return '', 'invalid'
+
+    suffix = host
+    while True:
+        kind = _DOMAIN_KINDS.get(suffix)
+        if kind is not None:
+            return host, kind
+        dot = suffix.find('.')
+        if dot < 0:
+            return host, 'other'
+        suffix = suffix[dot + 1:]
 
 
 def is_amazon_url(url):
     """
-    Verifica se URL è di Amazon
+    Verifica se URL è di Amazon (marketplace o link breve)
 
     Args:
         url: URL da verificare
@@ -116,19 +173,4 @@ def is_amazon_url(url):
     Returns:
         bool: True se è URL Amazon
     """
-    if not url:
-        return False
-
-    parsed = urlparse(url)
-    amazon_domains = [
-        'amazon.it',
-        'amazon.com',
-        'amazon.co.uk',
-        'amazon.de',
-        'amazon.fr',
-        'amazon.es',
-        'amzn.to',
-        'amzn.eu'
-    ]
-
-    return any(domain in parsed.netloc for domain in amazon_domains)
+    return classify_url(url)[1] in ('amazon', 'short')
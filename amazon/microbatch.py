@@ -0,0 +1,152 @@
+"""
+Micro-batching di richieste singole verso chiamate batch
+"""
+from concurrent.futures import Future
+import threading
+import time
+
+
+class _Batch:
+    """Gruppo di richieste raccolte nella stessa finestra"""
+
+    __slots__ = ('entries', 'closed')
+
+    def __init__(self):
+        self.entries = []
+        self.closed = False
+
+
+class MicroBatcher:
+    """
+    Raccoglie richieste per singola chiave e le invia come un'unica chiamata batch
+
+    Il primo chiamante di una finestra attende fino a `window` secondi (o finché
+    il batch non raggiunge `max_batch` chiavi), poi esegue fetch_batch per tutti.
+    """
+
+    def __init__(self, fetch_batch, window=0.005, max_batch=10):
+        """
+        Inizializza il collettore
+
+        Args:
+            fetch_batch: Callable(list[chiave]) -> dict {chiave: risultato}
+            window: Attesa massima in secondi prima di inviare il batch
+            max_batch: Numero massimo di chiavi per batch
+        """
+        self._fetch_batch = fetch_batch
+        self.window = window
+        self.max_batch = max_batch
+
+        self._lock = threading.Lock()
+        self._closed = threading.Condition(self._lock)
+        self._batch = None
+
+        self.requests = 0
+        self.batches = 0
+        self.batched_keys = 0
+
+    def get(self, key, timeout=None):
+        """
+        Richiede una singola chiave e attende il risultato del batch
+
+        Args:
+            key: Chiave da richiedere (es: ASIN)
+            timeout: Attesa massima per il risultato (secondi)
+
+        Returns:
+            Risultato di fetch_batch per la chiave (None se assente)
+        """
+        return self.submit(key).result(timeout)
+
+    def submit(self, key):
+        """
+        Accoda una chiave nel batch corrente
+
+        Args:
+            key: Chiave da richiedere
+
+        Returns:
+            Future: Completato quando il batch è stato eseguito
+        """
+        future = Future()
+        run_now = None
+
+        with self._lock:
+            self.requests += 1
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = _Batch()
+
+            batch.entries.append((key, future))
+
+            if len(batch.entries) >= self.max_batch:
+                self._close(batch)
+                run_now = batch
+
+        if run_now is not None:
+            self._run(run_now)
+        elif leader:
+            self._wait_and_run(batch)
+
+        return future
+
+    def stats(self):
+        """
+        Statistiche di riempimento dei batch
+
+        Returns:
+            dict: Richieste, batch inviati e riempimento medio
+        """
+        with self._lock:
+            avg_fill = self.batched_keys / self.batches if self.batches else 0.0
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'avg_batch_fill': avg_fill,
+                'avg_fill_ratio': avg_fill / self.max_batch if self.max_batch else 0.0,
+                'window_ms': self.window * 1000,
+                'max_batch': self.max_batch
+            }
+
+    def _wait_and_run(self, batch):
+        """Il leader attende la finestra e invia il batch se nessuno l'ha già chiuso"""
+        deadline = time.monotonic() + self.window
+
+        with self._lock:
+            while not batch.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._close(batch)
+                    break
+                self._closed.wait(remaining)
+            else:
+                # Chiuso da chi lo ha riempito: lo esegue quel chiamante
+                return
+
+        self._run(batch)
+
+    def _close(self, batch):
+        """Chiude il batch alle nuove richieste (da chiamare con il lock)"""
+        batch.closed = True
+        if self._batch is batch:
+            self._batch = None
+        self._closed.notify_all()
+
+    def _run(self, batch):
+        """Esegue fetch_batch e distribuisce i risultati ai future"""
+        keys = list(dict.fromkeys(key for key, _ in batch.entries))
+
+        with self._lock:
+            self.batches += 1
+            self.batched_keys += len(keys)
+
+        try:
+            results = self._fetch_batch(keys)
+        except Exception as e:
+            for _, future in batch.entries:
+                future.set_exception(e)
+            return
+
+        for key, future in batch.entries:
+            future.set_result(results.get(key))
@@ -0,0 +1,143 @@
+"""
+Tipi compatti (slotted) per i prodotti Amazon
+"""
+from dataclasses import dataclass, field
+
+
+class _Record:
+    """
+    Accesso in lettura stile dict ai campi di un record
+
+    Permette al codice esistente di continuare a usare product['price'],
+    product.get('is_prime') e product['price'].get('discount_percent').
+    """
+
+    __slots__ = ()
+    _fields = frozenset()
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def get(self, key, default=None):
+        if key not in self._fields:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return self._fields
+
+
+@dataclass(frozen=True, slots=True)
+class Price(_Record):
+    """Prezzo di un prodotto"""
+
+    current: float | None = None
+    current_formatted: str = 'Non disponibile'
+    original: float | None = None
+    original_formatted: str | None = None
+    discount_percent: int | None = None
+
+    _fields = frozenset((
+        'current', 'current_formatted', 'original', 'original_formatted', 'discount_percent'
+    ))
+
+    def to_dict(self):
+        return {
+            'current': self.current,
+            'current_formatted': self.current_formatted,
+            'original': self.original,
+            'original_formatted': self.original_formatted,
+            'discount_percent': self.discount_percent
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Rating(_Record):
+    """Valutazione media e numero di recensioni"""
+
+    stars: float = 0.0
+    count: int = 0
+
+    _fields = frozenset(('stars', 'count'))
+
+    def to_dict(self):
+        return {'stars': self.stars, 'count': self.count}
+
+
+# Istanze condivise dai prodotti senza offerte / senza recensioni
+NO_PRICE = Price()
+NO_RATING = Rating()
+
+
+@dataclass(frozen=True, slots=True)
+class Product(_Record):
+    """
+    Prodotto Amazon normalizzato (vedi parse_product)
+
+    Immutabile: i dati comuni (NO_PRICE, NO_RATING) sono condivisi
+    tra istanze e il dict per JSON/template è calcolato una volta.
+    """
+
+    asin: str
+    title: str
+    url: str
+    image_url: str
+    brand: str
+    price: Price = NO_PRICE
+    is_prime: bool = False
+    rating: Rating = NO_RATING
+    features: tuple = ()
+    _dict: dict | None = field(default=None, init=False, repr=False, compare=False)
+
+    _fields = frozenset((
+        'asin', 'title', 'url', 'image_url', 'brand', 'price', 'is_prime', 'rating', 'features'
+    ))
+
+    def to_dict(self):
+        """
+        Rappresentazione dict (JSON, export), calcolata al primo uso e riusata
+
+        Returns:
+            dict: Stesso formato storico di parse_product (da non modificare)
+        """
+        if self._dict is None:
+            object.__setattr__(self, '_dict', {
+                'asin': self.asin,
+                'title': self.title,
+                'url': self.url,
+                'image_url': self.image_url,
+                'brand': self.brand,
+                'price': self.price.to_dict(),
+                'is_prime': self.is_prime,
+                'rating': self.rating.to_dict(),
+                'features': list(self.features)
+            })
+        return self._dict
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Costruisce un Product dal formato dict di parse_product
+
+        Args:
+            data: dict prodotto (es: dati mock della demo mode)
+
+        Returns:
+            Product
+        """
+        return cls(
+            asin=data['asin'],
+            title=data['title'],
+            url=data['url'],
+            image_url=data['image_url'],
+            brand=data['brand'],
+            price=Price(**data['price']) if data.get('price') else NO_PRICE,
+            is_prime=data.get('is_prime', False),
+            rating=Rating(**data['rating']) if data.get('rating') else NO_RATING,
+            features=tuple(data.get('features') or ())
+        )
@@ -0,0 +1,200 @@
+"""
+Costruzione e firma (AWS SigV4) delle richieste HTTP a PA-API 5.0
+"""
+from datetime import datetime, timezone
+import hashlib
+import hmac
+import json
+
+PAAPI_SERVICE = 'ProductAdvertisingAPI'
+PAAPI_TARGET_PREFIX = 'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.'
+
+# Operazione -> path dell'endpoint
+OPERATIONS = {
+    'SearchItems': '/paapi5/searchitems',
+    'GetItems': '/paapi5/getitems',
+}
+
+
+class PaapiError(Exception):
+    """Errore restituito da PA-API (campo Errors della risposta)"""
+
+    def __init__(self, code, message, status=None):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+def host_for_marketplace(marketplace):
+    """
+    Host dell'endpoint PA-API per un marketplace
+
+    Args:
+        marketplace: Dominio marketplace (es: www.amazon.it)
+
+    Returns:
+        str: Host (es: webservices.amazon.it)
+    """
+    domain = (marketplace or 'www.amazon.it').lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return f"webservices.{domain}"
+
+
+def build_search_payload(
+    keywords,
+    associate_tag,
+    marketplace,
+    resources,
+    category='All',
+    item_count=10,
+    item_page=1,
+    max_price=None
+):
+    """
+    Corpo JSON di una richiesta SearchItems
+
+    Args:
+        keywords: Parole chiave di ricerca
+        associate_tag: Tag affiliato (PartnerTag)
+        marketplace: Dominio marketplace
+        resources: Lista di resources PA-API
+        category: Search index
+        item_count: Risultati per pagina (max 10)
+        item_page: Pagina richiesta (1..10)
+        max_price: Prezzo massimo in euro (opzionale)
+
+    Returns:
+        dict: Payload PA-API
+    """
+    payload = {
+        'Keywords': keywords,
+        'SearchIndex': category or 'All',
+        'ItemCount': min(item_count, 10),
+        'Resources': list(resources),
+        'PartnerTag': associate_tag,
+        'PartnerType': 'Associates',
+        'Marketplace': marketplace,
+    }
+    if item_page and item_page > 1:
+        payload['ItemPage'] = item_page
+    if max_price:
+        payload['MaxPrice'] = int(max_price * 100)  # Converti in centesimi
+    return payload
+
+
+def build_get_items_payload(asins, associate_tag, marketplace, resources):
+    """
+    Corpo JSON di una richiesta GetItems
+
+    Args:
+        asins: Lista di ASIN (max 10)
+        associate_tag: Tag affiliato (PartnerTag)
+        marketplace: Dominio marketplace
+        resources: Lista di resources PA-API
+
+    Returns:
+        dict: Payload PA-API
+    """
+    return {
+        'ItemIds': list(asins),
+        'ItemIdType': 'ASIN',
+        'Resources': list(resources),
+        'PartnerTag': associate_tag,
+        'PartnerType': 'Associates',
+        'Marketplace': marketplace,
+    }
+
+
+def _hmac(key, message):
+    return hmac.new(key, message.encode('utf-8'), hashlib.sha256).digest()
+
+
+def sign_request(operation, payload, access_key, secret_key, region, host, now=None):
+    """
+    Prepara una richiesta PA-API firmata con AWS Signature Version 4
+
+    Args:
+        operation: Nome operazione (SearchItems, GetItems)
+        payload: Corpo JSON (dict)
+        access_key: AWS Access Key
+        secret_key: AWS Secret Key
+        region: AWS Region (es: eu-west-1)
+        host: Host endpoint (vedi host_for_marketplace)
+        now: datetime UTC della firma (default: adesso)
+
+    Returns:
+        tuple: (url, headers, body in bytes)
+    """
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = now.strftime('%Y%m%d')
+    path = OPERATIONS[operation]
+    body = json.dumps(payload).encode('utf-8')
+
+    headers = {
+        'content-encoding': 'amz-1.0',
+        'content-type': 'application/json; charset=utf-8',
+        'host': host,
+        'x-amz-date': amz_date,
+        'x-amz-target': PAAPI_TARGET_PREFIX + operation,
+    }
+
+    signed_headers = ';'.join(sorted(headers))
+    canonical_headers = ''.join(f"{name}:{headers[name]}\n" for name in sorted(headers))
+    canonical_request = '\n'.join([
+        'POST',
+        path,
+        '',
+        canonical_headers,
+        signed_headers,
+        hashlib.sha256(body).hexdigest(),
+    ])
+
+    scope = f"{date_stamp}/{region}/{PAAPI_SERVICE}/aws4_request"
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode('utf-8')).hexdigest(),
+    ])
+
+    signing_key = _hmac(('AWS4' + secret_key).encode('utf-8'), date_stamp)
+    signing_key = _hmac(signing_key, region)
+    signing_key = _hmac(signing_key, PAAPI_SERVICE)
+    signing_key = _hmac(signing_key, 'aws4_request')
+    signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    headers['Authorization'] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return f"https://{host}{path}", headers, body
+
+
+def check_response(data, status=200):
+    """
+    Solleva PaapiError se la risposta contiene errori
+
+    Args:
+        data: Risposta JSON decodificata
+        status: Status code HTTP
+
+    Returns:
+        dict: data, se senza errori (NoResults è trattato come risposta vuota)
+
+    Raises:
+        PaapiError: Errore PA-API (es: TooManyRequests, InvalidSignature)
+    """
+    errors = data.get('Errors') if isinstance(data, dict) else None
+    if errors:
+        code = errors[0].get('Code', 'Unknown')
+        if code == 'NoResults':
+            return {}
+        raise PaapiError(code, errors[0].get('Message', ''), status)
+
+    if status >= 400:
+        raise PaapiError('HttpError', f"status {status}", status)
+
+    return data
@@ -0,0 +1,356 @@
+"""
+Storico prezzi compatto per ASIN con rilevamento offerte
+
+Ogni ASIN occupa una riga di due array NumPy (timestamp, centesimi) con
+i cambi di prezzo in ordine cronologico: le query su tutti gli ASIN
+(minimo a 30 giorni, % sotto la mediana pesata per durata, ribassi)
+sono vettoriali.
+
+Lo storico vive nella memoria del processo: ogni worker gunicorn ha il
+proprio, alimentato dalle risposte PA-API che quel worker ha ricevuto.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+# Sentinelle delle celle vuote: fuori da ogni finestra, in coda agli ordinamenti
+_NO_TS = np.iinfo(np.uint32).max
+_NO_CENTS = np.iinfo(np.int32).max
+
+# Durata massima (secondi) di un prezzo nella mediana pesata: 32 bit bassi
+_MAX_DURATION = 0xFFFFFFFF
+
+
+def to_cents(amount):
+    """Prezzo in euro (float) -> centesimi interi, None se assente"""
+    if amount is None:
+        return None
+    return int(round(amount * 100))
+
+
+class PriceHistory:
+    """
+    Storico prezzi in memoria, condiviso tra i thread del processo
+
+    Si salva un'osservazione solo quando il prezzo cambia: la riga di un
+    ASIN contiene gli ultimi `capacity` cambi di prezzo. Il prezzo in
+    vigore all'inizio di una finestra è l'ultimo cambio precedente.
+    """
+
+    def __init__(self, capacity=32, initial_rows=1024, clock=time.time):
+        """
+        Args:
+            capacity: Cambi di prezzo conservati per ASIN (i più vecchi sono scartati)
+            initial_rows: ASIN allocati inizialmente (l'array raddoppia se pieno)
+            clock: Orologio di sistema (iniettabile nei test)
+        """
+        self.capacity = capacity
+        self._clock = clock
+
+        self._index = {}
+        self._asins = []
+        self._ts = np.full((initial_rows, capacity), _NO_TS, dtype=np.uint32)
+        self._cents = np.full((initial_rows, capacity), _NO_CENTS, dtype=np.int32)
+        self._count = np.zeros(initial_rows, dtype=np.int32)
+        self._lock = threading.Lock()
+
+        self.observations = 0
+        self.changes = 0
+
+    def record(self, asin, cents, ts=None):
+        """
+        Registra un prezzo osservato
+
+        Args:
+            asin: ASIN del prodotto
+            cents: Prezzo in centesimi
+            ts: Timestamp UNIX dell'osservazione (default: ora)
+
+        Returns:
+            bool: True se il prezzo è cambiato rispetto all'ultima osservazione
+        """
+        ts = int(self._clock() if ts is None else ts)
+
+        with self._lock:
+            self.observations += 1
+            row = self._index.get(asin)
+            if row is None:
+                row = self._add_row(asin)
+
+            count = self._count[row]
+            if count and self._cents[row, count - 1] == cents:
+                return False
+
+            if count == self.capacity:
+                # Riga piena: scarta il cambio più vecchio
+                self._ts[row, :-1] = self._ts[row, 1:]
+                self._cents[row, :-1] = self._cents[row, 1:]
+                count -= 1
+
+            self._ts[row, count] = ts
+            self._cents[row, count] = cents
+            self._count[row] = count + 1
+            self.changes += 1
+            return True
+
+    def record_products(self, products, ts=None):
+        """
+        Registra il prezzo corrente di una lista di Product
+
+        Args:
+            products: Product parsati da una risposta PA-API
+            ts: Timestamp UNIX comune (default: ora)
+
+        Returns:
+            int: Prezzi cambiati
+        """
+        ts = self._clock() if ts is None else ts
+        changed = 0
+        for product in products:
+            cents = to_cents(product.price.current)
+            if cents is not None and self.record(product.asin, cents, ts):
+                changed += 1
+        return changed
+
+    def history(self, asin):
+        """
+        Cambi di prezzo di un ASIN
+
+        Returns:
+            list: [(timestamp, centesimi), ...] in ordine cronologico
+        """
+        with self._lock:
+            row = self._index.get(asin)
+            if row is None:
+                return []
+            count = self._count[row]
+            return list(zip(self._ts[row, :count].tolist(), self._cents[row, :count].tolist()))
+
+    def lowest(self, asins=None, days=30):
+        """
+        Prezzo minimo negli ultimi `days` giorni
+
+        Args:
+            asins: ASIN da valutare (None = tutti, in ordine di inserimento)
+            days: Ampiezza della finestra in giorni
+
+        Returns:
+            np.ndarray: Centesimi (int64), -1 per ASIN senza storico
+        """
+        with self._lock:
+            ts, cents, count = self._rows(asins)
+            start, _ = self._window(ts, count, self._clock() - days * DAY)
+            lowest = self._windowed(cents, start).min(axis=1).astype(np.int64)
+        lowest[count == 0] = -1
+        return lowest
+
+    def median(self, asins=None, days=30):
+        """
+        Mediana dei prezzi negli ultimi `days` giorni, pesata per durata
+
+        Returns:
+            np.ndarray: Centesimi (float64), NaN per ASIN senza storico
+        """
+        now = self._clock()
+        cutoff = now - days * DAY
+        with self._lock:
+            ts, cents, count = self._rows(asins)
+            start, _ = self._window(ts, count, cutoff)
+            return self._median(ts, self._windowed(cents, start), start, count, cutoff, now)
+
+    def below_median(self, asins=None, days=30):
+        """
+        Percentuale del prezzo corrente sotto la mediana a `days` giorni (vedi median)
+
+        Returns:
+            np.ndarray: Percentuali (float64, negative se sopra la mediana),
+                NaN per ASIN senza storico
+        """
+        now = self._clock()
+        cutoff = now - days * DAY
+        with self._lock:
+            ts, cents, count = self._rows(asins)
+            start, _ = self._window(ts, count, cutoff)
+            current = self._last(cents, count, 1)
+            median = self._median(ts, self._windowed(cents, start), start, count, cutoff, now)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (median - current) / median * 100
+
+    def price_drop(self, asins=None, since=None):
+        """
+        Ribasso dell'ultimo cambio di prezzo rispetto al precedente
+
+        Args:
+            asins: ASIN da valutare (None = tutti)
+            since: Considera solo cambi avvenuti da questo timestamp (opzionale)
+
+        Returns:
+            np.ndarray: Centesimi di ribasso (int64), 0 se nessun ribasso
+        """
+        with self._lock:
+            ts, cents, count = self._rows(asins)
+            last = self._last(cents, count, 1)
+            previous = self._last(cents, count, 2)
+            changed_at = self._last(ts, count, 1)
+
+        drop = np.nan_to_num(previous - last, nan=0.0)
+        if since is not None:
+            drop[changed_at < since] = 0
+        return np.maximum(drop, 0).astype(np.int64)
+
+    def deals(self, days=30, limit=50, min_below_median=5.0):
+        """
+        Migliori offerte: prodotti più sotto la propria mediana (pesata per durata)
+
+        Args:
+            days: Finestra in giorni per minimo e mediana
+            limit: Numero massimo di risultati
+            min_below_median: Percentuale minima sotto la mediana
+
+        Returns:
+            list: [{'asin', 'current', 'lowest', 'median', 'below_median_percent',
+                'is_lowest', 'drop'}] in centesimi, dal ribasso maggiore
+        """
+        now = self._clock()
+        cutoff = now - days * DAY
+        with self._lock:
+            asins = list(self._asins)
+            ts, cents, count = self._rows(None)
+            start, _ = self._window(ts, count, cutoff)
+            windowed = self._windowed(cents, start)
+            lowest = windowed.min(axis=1)
+            current = self._last(cents, count, 1)
+            previous = self._last(cents, count, 2)
+            median = self._median(ts, windowed, start, count, cutoff, now)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            below = (median - current) / median * 100
+            selected = np.flatnonzero(below >= min_below_median)
+        if len(selected) > limit:
+            top = np.argpartition(-below[selected], limit - 1)[:limit]
+            selected = selected[top]
+        selected = selected[np.argsort(-below[selected], kind='stable')]
+
+        drop = np.maximum(np.nan_to_num(previous - current, nan=0.0), 0)
+        return [
+            {
+                'asin': asins[row],
+                'current': int(current[row]),
+                'lowest': int(lowest[row]),
+                'median': float(median[row]),
+                'below_median_percent': round(float(below[row]), 1),
+                'is_lowest': bool(current[row] <= lowest[row]),
+                'drop': int(drop[row])
+            }
+            for row in selected
+        ]
+
+    def stats(self):
+        """
+        Statistiche dello storico
+
+        Returns:
+            dict: ASIN, osservazioni, cambi di prezzo e memoria occupata
+        """
+        with self._lock:
+            return {
+                'asins': len(self._asins),
+                'observations': self.observations,
+                'changes': self.changes,
+                'bytes': self._ts.nbytes + self._cents.nbytes + self._count.nbytes
+            }
+
+    def _add_row(self, asin):
+        """Assegna una riga a un nuovo ASIN (raddoppia gli array se pieni)"""
+        row = len(self._asins)
+        if row == len(self._count):
+            self._ts = np.concatenate([self._ts, np.full_like(self._ts, _NO_TS)])
+            self._cents = np.concatenate([self._cents, np.full_like(self._cents, _NO_CENTS)])
+            self._count = np.concatenate([self._count, np.zeros_like(self._count)])
+
+        self._index[asin] = row
+        self._asins.append(asin)
+        return row
+
+    def _rows(self, asins):
+        """
+        Righe (timestamp, centesimi, numero di cambi) per una lista di ASIN
+
+        Con asins=None ritorna viste sugli array senza copie.
+        """
+        if asins is None:
+            rows = len(self._asins)
+            return self._ts[:rows], self._cents[:rows], self._count[:rows]
+
+        index = self._index
+        rows = np.fromiter((index.get(asin, -1) for asin in asins), dtype=np.int64, count=len(asins))
+        known = rows >= 0
+        rows = np.where(known, rows, 0)
+        ts, cents = self._ts[rows], self._cents[rows]
+        ts[~known] = _NO_TS
+        cents[~known] = _NO_CENTS
+        return ts, cents, np.where(known, self._count[rows], 0)
+
+    def _window(self, ts, count, cutoff):
+        """
+        Prezzi in vigore da cutoff in poi, incluso quello all'inizio della finestra
+
+        Returns:
+            tuple: (prima colonna nella finestra, numero di prezzi) per riga
+        """
+        # Primo cambio dopo cutoff: righe in ordine cronologico, celle vuote = _NO_TS
+        after = ts >= cutoff
+        first = np.where(after.any(axis=1), after.argmax(axis=1), self.capacity)
+        start = np.maximum(first - 1, 0)
+        return start, np.maximum(count - start, 0)
+
+    def _windowed(self, cents, start):
+        """Centesimi con le celle prima di start sostituite da _NO_CENTS"""
+        return np.where(np.arange(self.capacity) >= start[:, None], cents, _NO_CENTS)
+
+    @staticmethod
+    def _last(values, count, offset):
+        """Valore in posizione count - offset di ogni riga (NaN se assente)"""
+        index = count - offset
+        present = index >= 0
+        taken = np.take_along_axis(values, np.maximum(index, 0)[:, None], axis=1)[:, 0]
+        return np.where(present, taken, np.nan)
+
+    def _median(self, ts, windowed, start, count, cutoff, now):
+        """
+        Mediana per riga pesata per durata (NaN per righe vuote)
+
+        Ogni prezzo conta per il tempo in cui è rimasto in vigore dentro la
+        finestra: un prezzo tenuto 29 giorni pesa più di un'offerta di un'ora.
+        """
+        # Solo le colonne occupate da almeno una riga
+        width = int(count.max()) if len(count) else 0
+        if width == 0:
+            return np.full(len(count), np.nan)
+        columns = np.arange(width)
+        ts = ts[:, :width].astype(np.int64)
+        windowed = windowed[:, :width]
+        # Fine validità: il cambio successivo, `now` per il prezzo corrente
+        durations = np.empty_like(ts)
+        durations[:, :-1] = ts[:, 1:]
+        durations[columns == (count - 1)[:, None]] = int(now)
+        durations -= np.maximum(ts, int(cutoff))
+        # Almeno un secondo: un prezzo appena osservato conta comunque
+        np.clip(durations, 1, _MAX_DURATION, out=durations)
+        durations[(columns < start[:, None]) | (columns >= count[:, None])] = 0
+
+        # Prezzo e durata in un solo int64: un sort per riga ordina entrambi
+        packed = (windowed.astype(np.int64) << 32) | durations
+        packed.sort(axis=1)
+        cumulative = np.cumsum(packed & _MAX_DURATION, axis=1)
+        middle = (cumulative * 2 >= cumulative[:, -1:]).argmax(axis=1)
+
+        median = (packed[np.arange(len(packed)), middle] >> 32).astype(np.float64)
+        median[count == 0] = np.nan
+        return median
@@ -2,6 +2,7 @@
 Parser per risposte Amazon Product Advertising API
 """
 import logging
+from amazon.models import NO_PRICE, NO_RATING, Price, Product, Rating
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +29,176 @@ def safe_get(obj, *keys, default=None):
         return default
 
 
+# Sentinella per distinguere "attributo assente" da un attributo None
+_MISSING = object()
+
+
+def _compile(name, keys, source):
+    """Compila il sorgente di un accessor e gli assegna un nome leggibile"""
+    namespace = {'_MISSING': _MISSING}
+    exec(source, namespace)
+    accessor = namespace['accessor']
+    accessor.__qualname__ = accessor.__name__ = f"{name}{keys!r}"
+    accessor.keys = keys
+    return accessor
+
+
+def compile_path(*keys):
+    """
+    Compila un accessor equivalente a safe_get(obj, *keys, default=default)
+
+    Il percorso è tradotto una sola volta in una funzione senza cicli né
+    argomenti variabili; ogni livello prova l'attributo e poi .get(), come
+    safe_get, quindi funziona su modelli SDK, Mock e dict.
+
+    Args:
+        *keys: Sequenza di chiavi/attributi (es: 'offers', 'listings')
+
+    Returns:
+        callable: accessor(obj, default=None)
+    """
+    steps = ''.join(
+        "        if obj is None:\n"
+        "            return default\n"
+        f"        value = getattr(obj, {key!r}, _MISSING)\n"
+        f"        obj = obj.get({key!r}) if value is _MISSING else value\n"
+        for key in keys
+    )
+    source = (
+        "def accessor(obj, default=None):\n"
+        "    try:\n"
+        f"{steps}"
+        "    except (AttributeError, KeyError, TypeError):\n"
+        "        return default\n"
+        "    return obj if obj is not None else default\n"
+    )
+    return _compile('compile_path', keys, source)
+
+
+def raw_path(*keys):
+    """
+    Compila un accessor per un percorso nel JSON grezzo di PA-API
+
+    Il percorso è tradotto una sola volta in una funzione che indicizza
+    direttamente i dict (es: data['ItemInfo']['Title']['DisplayValue']).
+
+    Args:
+        *keys: Sequenza di chiavi JSON (es: 'ItemInfo', 'Title', 'DisplayValue')
+
+    Returns:
+        callable: accessor(data, default=None) con la stessa semantica di safe_get
+    """
+    lookup = ''.join(f"[{key!r}]" for key in keys)
+    source = (
+        "def accessor(data, default=None):\n"
+        "    try:\n"
+        f"        value = data{lookup}\n"
+        "    except (KeyError, IndexError, TypeError):\n"
+        "        return default\n"
+        "    return default if value is None else value\n"
+    )
+    return _compile('raw_path', keys, source)
+
+
+def _build_product(
+    associate_tag,
+    asin,
+    title,
+    url,
+    image_url,
+    brand,
+    listing,
+    current_price,
+    current_display,
+    saving_basis,
+    saving_display,
+    is_prime,
+    rating_value,
+    rating_count,
+    features_obj
+):
+    """Costruisce il Product a partire dai campi estratti dall'item"""
+    # URL prodotto
+    if url and associate_tag:
+        # Assicura che l'URL contenga il tag affiliato
+        if 'tag=' not in url:
+            separator = '&' if '?' in url else '?'
+            url = f"{url}{separator}tag={associate_tag}"
+
+    # Prezzi
+    if listing is not None:
+        # Prezzo corrente
+        if current_price:
+            current = float(current_price)
+            current_formatted = current_display if current_display is not None else f"€ {current_price}"
+        else:
+            current = None
+            current_formatted = 'Non disponibile'
+
+        # Prezzo originale (se in sconto)
+        original = original_formatted = discount_percent = None
+        if saving_basis:
+            original = float(saving_basis)
+            original_formatted = saving_display if saving_display is not None else f"€ {saving_basis}"
+
+            # Calcola percentuale sconto
+            if current_price and saving_basis:
+                discount = ((float(saving_basis) - float(current_price)) / float(saving_basis)) * 100
+                discount_percent = int(discount)
+
+        price = Price(current, current_formatted, original, original_formatted, discount_percent)
+    else:
+        # Nessuna offerta disponibile
+        price = NO_PRICE
+        is_prime = False
+
+    # Rating recensioni
+    if rating_value or rating_count:
+        rating = Rating(
+            float(rating_value) if rating_value else 0.0,
+            int(rating_count) if rating_count else 0
+        )
+    else:
+        rating = NO_RATING
+
+    # Features
+    features = tuple(features_obj)[:5] if features_obj else ()  # Max 5 features per card
+
+    # Costruisci oggetto prodotto
+    return Product(asin, title, url, image_url, brand, price, is_prime, rating, features)
+
+
+# Accessor precompilati per item SDK / dict snake_case
+_ASIN = compile_path('asin')
+_TITLE = compile_path('item_info', 'title', 'display_value')
+_URL = compile_path('detail_page_url')
+_IMAGE = compile_path('images', 'primary', 'large', 'url')
+_BRAND = compile_path('item_info', 'by_line_info', 'brand', 'display_value')
+_LISTINGS = compile_path('offers', 'listings')
+_PRICE = compile_path('price', 'amount')
+_PRICE_DISPLAY = compile_path('price', 'display_amount')
+_SAVING = compile_path('saving_basis', 'amount')
+_SAVING_DISPLAY = compile_path('saving_basis', 'display_amount')
+_PRIME = compile_path('program_eligibility', 'is_prime_exclusive')
+_STARS = compile_path('customer_reviews', 'star_rating', 'value')
+_REVIEWS = compile_path('customer_reviews', 'count')
+_FEATURES = compile_path('item_info', 'features', 'display_values')
+
+
 def parse_product(item, associate_tag):
     """
     Estrae dati strutturati da un item Amazon API
 
+    I campi non richiesti dal profilo di resources (es: 'price-refresh')
+    assumono i valori di default: nessun rating, nessuna feature, ecc.
+
     Args:
         item: Item dalla risposta API Amazon
         associate_tag: Tag affiliato per costruire URL
 
     Returns:
-        dict: {
+        Product: Prodotto, leggibile anche come dict (product['price']['current']);
+            to_dict() ritorna: {
             'asin': str,
             'title': str,
             'url': str,
@@ -60,129 +221,94 @@ def parse_product(item, associate_tag):
     """
     try:
         # ASIN
-        asin = safe_get(item, 'asin', default='')
+        asin = _ASIN(item, '')
         if not asin:
             logger.warning("Prodotto senza ASIN, skipping")
             return None
 
-        # Titolo
-        title = safe_get(item, 'item_info', 'title', 'display_value', default='Titolo non disponibile')
-
-        # URL prodotto
-        url = safe_get(item, 'detail_page_url', default='')
-        if url and associate_tag:
-            # Assicura che l'URL contenga il tag affiliato
-            if 'tag=' not in url:
-                separator = '&' if '?' in url else '?'
-                url = f"{url}{separator}tag={associate_tag}"
-
-        # Immagine
-        image_url = safe_get(
-            item,
-            'images',
-            'primary',
-            'large',
-            'url',
-            default='/static/images/placeholder.png'
-        )
+        listing = _LISTINGS(item)
+        first_listing = listing[0] if listing and len(listing) > 0 else None
 
-        # Brand
-        brand = safe_get(
-            item,
-            'item_info',
-            'by_line_info',
-            'brand',
-            'display_value',
-            default='Sconosciuto'
+        return _build_product(
+            associate_tag,
+            asin,
+            _TITLE(item, 'Titolo non disponibile'),
+            _URL(item, ''),
+            _IMAGE(item, '/static/images/placeholder.png'),
+            _BRAND(item, 'Sconosciuto'),
+            first_listing,
+            _PRICE(first_listing),
+            _PRICE_DISPLAY(first_listing),
+            _SAVING(first_listing),
+            _SAVING_DISPLAY(first_listing),
+            _PRIME(first_listing, False),
+            _STARS(item),
+            _REVIEWS(item, 0),
+            _FEATURES(item)
         )
 
-        # Prezzi
-        price_data = {}
-        listing = safe_get(item, 'offers', 'listings')
-        if listing and len(listing) > 0:
-            first_listing = listing[0]
-
-            # Prezzo corrente
-            current_price = safe_get(first_listing, 'price', 'amount')
-            if current_price:
-                price_data['current'] = float(current_price)
-                price_data['current_formatted'] = safe_get(
-                    first_listing,
-                    'price',
-                    'display_amount',
-                    default=f"€ {current_price}"
-                )
-            else:
-                price_data['current'] = None
-                price_data['current_formatted'] = 'Non disponibile'
-
-            # Prezzo originale (se in sconto)
-            saving_basis = safe_get(first_listing, 'saving_basis', 'amount')
-            if saving_basis:
-                price_data['original'] = float(saving_basis)
-                price_data['original_formatted'] = safe_get(
-                    first_listing,
-                    'saving_basis',
-                    'display_amount',
-                    default=f"€ {saving_basis}"
-                )
-
-                # Calcola percentuale sconto
-                if current_price and saving_basis:
-                    discount = ((float(saving_basis) - float(current_price)) / float(saving_basis)) * 100
-                    price_data['discount_percent'] = int(discount)
-                else:
-                    price_data['discount_percent'] = None
-            else:
-                price_data['original'] = None
-                price_data['original_formatted'] = None
-                price_data['discount_percent'] = None
-
-            # Eleggibilità Prime
-            is_prime = safe_get(
-                first_listing,
-                'program_eligibility',
-                'is_prime_exclusive',
-                default=False
-            )
-        else:
-            # Nessuna offerta disponibile
-            price_data = {
-                'current': None,
-                'current_formatted': 'Non disponibile',
-                'original': None,
-                'original_formatted': None,
-                'discount_percent': None
-            }
-            is_prime = False
-
-        # Rating recensioni
-        rating_value = safe_get(item, 'customer_reviews', 'star_rating', 'value')
-        rating_count = safe_get(item, 'customer_reviews', 'count', default=0)
-
-        rating = {
-            'stars': float(rating_value) if rating_value else 0.0,
-            'count': int(rating_count) if rating_count else 0
-        }
+    except Exception as e:
+        logger.error(f"Errore nel parsing prodotto: {str(e)}")
+        return None
+
+
+# Accessor precompilati per il JSON grezzo PA-API (chiavi PascalCase)
+_RAW_ASIN = raw_path('ASIN')
+_RAW_TITLE = raw_path('ItemInfo', 'Title', 'DisplayValue')
+_RAW_URL = raw_path('DetailPageURL')
+_RAW_IMAGE = raw_path('Images', 'Primary', 'Large', 'URL')
+_RAW_BRAND = raw_path('ItemInfo', 'ByLineInfo', 'Brand', 'DisplayValue')
+_RAW_LISTINGS = raw_path('Offers', 'Listings')
+_RAW_PRICE = raw_path('Price', 'Amount')
+_RAW_PRICE_DISPLAY = raw_path('Price', 'DisplayAmount')
+_RAW_SAVING = raw_path('SavingBasis', 'Amount')
+_RAW_SAVING_DISPLAY = raw_path('SavingBasis', 'DisplayAmount')
+_RAW_PRIME = raw_path('ProgramEligibility', 'IsPrimeExclusive')
+_RAW_STARS = raw_path('CustomerReviews', 'StarRating', 'Value')
+_RAW_REVIEWS = raw_path('CustomerReviews', 'Count')
+_RAW_FEATURES = raw_path('ItemInfo', 'Features', 'DisplayValues')
 
-        # Features
-        features_obj = safe_get(item, 'item_info', 'features', 'display_values')
-        features = list(features_obj) if features_obj else []
-
-        # Costruisci oggetto prodotto
-        product = {
-            'asin': asin,
-            'title': title,
-            'url': url,
-            'image_url': image_url,
-            'brand': brand,
-            'price': price_data,
-            'is_prime': is_prime,
-            'rating': rating,
-            'features': features[:5]  # Max 5 features per card
-        }
 
-        return product
+def parse_product_raw(item, associate_tag):
+    """
+    Estrae dati strutturati da un item nel JSON grezzo di PA-API
+
+    Equivalente a parse_product, ma legge direttamente i dict della risposta
+    (chiavi PascalCase) con accessor precompilati, senza modelli SDK.
+
+    Args:
+        item: Item dalla risposta JSON (SearchResult.Items / ItemsResult.Items)
+        associate_tag: Tag affiliato per costruire URL
+
+    Returns:
+        Product: Come parse_product, None se non valido
+    """
+    try:
+        asin = _RAW_ASIN(item, '')
+        if not asin:
+            logger.warning("Prodotto senza ASIN, skipping")
+            return None
+
+        listings = _RAW_LISTINGS(item)
+        first_listing = listings[0] if listings else None
+
+        return _build_product(
+            associate_tag,
+            asin,
+            _RAW_TITLE(item, 'Titolo non disponibile'),
+            _RAW_URL(item, ''),
+            _RAW_IMAGE(item, '/static/images/placeholder.png'),
+            _RAW_BRAND(item, 'Sconosciuto'),
+            first_listing,
+            _RAW_PRICE(first_listing),
+            _RAW_PRICE_DISPLAY(first_listing),
+            _RAW_SAVING(first_listing),
+            _RAW_SAVING_DISPLAY(first_listing),
+            _RAW_PRIME(first_listing, False),
+            _RAW_STARS(item),
+            _RAW_REVIEWS(item, 0),
+            _RAW_FEATURES(item)
+        )
 
     except Exception as e:
         logger.error(f"Errore nel parsing prodotto: {str(e)}")
@@ -0,0 +1,199 @@
+"""
+Filtri e ordinamenti vettoriali su insiemi di prodotti
+
+Un ProductTable tiene le colonne usate dai filtri (prezzo in centesimi,
+sconto, stelle, recensioni, Prime) in array NumPy: qualsiasi combinazione
+di filtri e un ordinamento si applicano in un solo passaggio vettoriale.
+"""
+from functools import cached_property
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Ordinamenti supportati (stessi valori della select di static/js/filters.js)
+SORT_KEYS = ('relevance', 'price-asc', 'price-desc', 'discount', 'rating')
+
+# Chiave di ordinamento dei prodotti senza prezzo (sempre in fondo)
+_MISSING_KEY = np.iinfo(np.int32).max
+
+
+def _price_cents(product):
+    current = product['price']['current'] if product.get('price') else None
+    return -1 if current is None else round(current * 100)
+
+
+def _discount(product):
+    return (product['price']['discount_percent'] if product.get('price') else None) or 0
+
+
+def _stars(product):
+    # Decimi di stella: confronti interi, niente errori di arrotondamento
+    return round(((product['rating']['stars'] if product.get('rating') else None) or 0) * 10)
+
+
+def _reviews(product):
+    return (product['rating']['count'] if product.get('rating') else None) or 0
+
+
+def _is_prime(product):
+    return bool(product.get('is_prime', False))
+
+
+class ProductTable:
+    """
+    Insieme di prodotti con colonne NumPy per filtri e ordinamenti
+
+    Le colonne sono estratte alla prima query che le usa; le righe
+    selezionate sono restituite come i prodotti originali (Product o dict).
+    """
+
+    def __init__(self, products):
+        """
+        Args:
+            products: Prodotti in ordine di rilevanza (Product o dict di parse_product)
+        """
+        self.products = list(products)
+
+    @classmethod
+    def from_columns(cls, products, price_cents, discount, stars, reviews, is_prime):
+        """
+        Costruisce una tabella da colonne già pronte (es: catalogo, benchmark)
+
+        Args:
+            products: Prodotti, una riga per colonna
+            price_cents: Prezzo in centesimi (-1 = senza prezzo)
+            discount: Sconto in percentuale (0 = nessuno)
+            stars: Valutazione in decimi di stella (45 = 4.5 stelle)
+            reviews: Numero di recensioni
+            is_prime: Idoneità Prime
+
+        Returns:
+            ProductTable
+        """
+        table = cls(products)
+        table.price_cents = np.asarray(price_cents, dtype=np.int64)
+        table.discount = np.asarray(discount, dtype=np.int16)
+        table.stars = np.asarray(stars, dtype=np.int16)
+        table.reviews = np.asarray(reviews, dtype=np.int32)
+        table.is_prime = np.asarray(is_prime, dtype=bool)
+        return table
+
+    def __len__(self):
+        return len(self.products)
+
+    @cached_property
+    def price_cents(self):
+        return self._column(_price_cents, np.int64)
+
+    @cached_property
+    def discount(self):
+        return self._column(_discount, np.int16)
+
+    @cached_property
+    def stars(self):
+        return self._column(_stars, np.int16)
+
+    @cached_property
+    def reviews(self):
+        return self._column(_reviews, np.int32)
+
+    @cached_property
+    def is_prime(self):
+        return self._column(_is_prime, bool)
+
+    def select(
+        self,
+        max_price=None,
+        prime_only=False,
+        discount_only=False,
+        min_discount=None,
+        min_rating=None,
+        min_reviews=None,
+        sort='relevance',
+        limit=None
+    ):
+        """
+        Righe che soddisfano tutti i filtri, nell'ordine richiesto
+
+        Args:
+            max_price: Prezzo massimo in euro (esclude i prodotti senza prezzo)
+            prime_only: Solo prodotti Prime
+            discount_only: Solo prodotti in sconto
+            min_discount: Sconto minimo in percentuale
+            min_rating: Valutazione minima in stelle
+            min_reviews: Numero minimo di recensioni
+            sort: Uno di SORT_KEYS (a parità, ordine di rilevanza)
+            limit: Numero massimo di righe (None = tutte)
+
+        Returns:
+            np.ndarray: Indici di riga in self.products
+
+        Raises:
+            ValueError: Ordinamento non supportato
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Ordinamento non supportato: {sort}")
+
+        size = len(self.products)
+        conditions = []
+        if max_price:
+            price = self.price_cents
+            conditions.append((price >= 0) & (price <= round(max_price * 100)))
+        if prime_only:
+            conditions.append(self.is_prime)
+        if discount_only:
+            conditions.append(self.discount > 0)
+        if min_discount:
+            conditions.append(self.discount >= min_discount)
+        if min_rating:
+            conditions.append(self.stars >= round(min_rating * 10))
+        if min_reviews:
+            conditions.append(self.reviews >= min_reviews)
+
+        if conditions:
+            rows = np.flatnonzero(np.logical_and.reduce(conditions))
+        else:
+            rows = np.arange(size)
+
+        if sort == 'relevance' or len(rows) < 2 or limit == 0:
+            return rows[:limit]
+
+        # Chiave intera univoca (chiave * righe + riga): a parità vale la rilevanza
+        key = self._sort_key(sort, rows) * size + rows
+        if limit is not None and limit < len(rows):
+            top = np.argpartition(key, limit - 1)[:limit]
+            return rows[top[np.argsort(key[top])]]
+        return rows[np.argsort(key)]
+
+    def filter(self, **params):
+        """
+        Prodotti che soddisfano i filtri (vedi select)
+
+        Returns:
+            list: Prodotti originali delle righe selezionate
+        """
+        products = self.products
+        return [products[row] for row in self.select(**params).tolist()]
+
+    def _sort_key(self, sort, rows):
+        """Chiave crescente (int64) per l'ordinamento richiesto"""
+        if sort == 'price-asc':
+            price = self.price_cents[rows]
+            return np.where(price >= 0, price, _MISSING_KEY)
+        if sort == 'price-desc':
+            price = self.price_cents[rows]
+            return np.where(price >= 0, -price, _MISSING_KEY)
+        if sort == 'discount':
+            return -self.discount[rows].astype(np.int64)
+        # rating
+        return -self.stars[rows].astype(np.int64)
+
+    def _column(self, extract, dtype):
+        """Estrae una colonna dai prodotti"""
+        return np.fromiter(
+            (extract(product) for product in self.products),
+            dtype=dtype,
+            count=len(self.products)
+        )
@@ -0,0 +1,89 @@
+"""
+Ranking e merge dei risultati di ricerche su più categorie
+"""
+import math
+
+# Costante della Reciprocal Rank Fusion: riduce il peso delle prime posizioni
+RRF_K = 60
+
+
+def score_by_rank(product, rank):
+    """Reciprocal Rank Fusion: conta solo la posizione nella categoria"""
+    return 1.0 / (RRF_K + rank)
+
+
+def score_by_discount(product, rank):
+    """Privilegia gli sconti più alti, la posizione decide a parità di sconto"""
+    discount = (product.get('price') or {}).get('discount_percent') or 0
+    return discount / 100 + score_by_rank(product, rank)
+
+
+def score_by_rating(product, rank):
+    """Privilegia stelle alte con molte recensioni"""
+    rating = product.get('rating') or {}
+    stars = rating.get('stars') or 0.0
+    count = rating.get('count') or 0
+    return stars * math.log1p(count) / 50 + score_by_rank(product, rank)
+
+
+SCORING = {
+    'rank': score_by_rank,
+    'discount': score_by_discount,
+    'rating': score_by_rating,
+}
+
+
+def get_scorer(scoring):
+    """
+    Risolve una strategia di scoring
+
+    Args:
+        scoring: Nome in SCORING oppure callable(product, rank) -> float
+
+    Returns:
+        callable: Funzione di scoring
+
+    Raises:
+        ValueError: Nome di scoring sconosciuto
+    """
+    if callable(scoring):
+        return scoring
+    try:
+        return SCORING[scoring or 'rank']
+    except KeyError:
+        raise ValueError(f"Scoring non supportato: {scoring}")
+
+
+def merge_ranked(products_by_category, scoring='rank', weights=None):
+    """
+    Unisce i risultati di più categorie deduplicando per ASIN
+
+    Un prodotto trovato in più categorie somma i punteggi ottenuti in ognuna.
+
+    Args:
+        products_by_category: {categoria: [prodotti in ordine di ranking]}
+        scoring: Strategia di scoring (vedi get_scorer)
+        weights: {categoria: peso} opzionale (default 1.0)
+
+    Returns:
+        list: Prodotti ordinati per punteggio decrescente
+    """
+    scorer = get_scorer(scoring)
+    weights = weights or {}
+
+    scores = {}
+    products = {}
+    first_seen = {}
+
+    for category, category_products in products_by_category.items():
+        weight = weights.get(category, 1.0)
+        for rank, product in enumerate(category_products, start=1):
+            asin = product['asin']
+            if asin not in products:
+                products[asin] = product
+                first_seen[asin] = len(first_seen)
+                scores[asin] = 0.0
+            scores[asin] += weight * scorer(product, rank)
+
+    ordered = sorted(products, key=lambda asin: (-scores[asin], first_seen[asin]))
+    return [products[asin] for asin in ordered]
@@ -0,0 +1,427 @@
+"""
+Rate limiter token bucket con priorità per le chiamate PA-API
+"""
+from abc import ABC, abstractmethod
+import asyncio
+from datetime import datetime, timezone
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+# Classi di priorità (valore più basso = servito prima)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_BULK = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_BACKGROUND: 'background',
+    PRIORITY_BULK: 'bulk',
+}
+
+
+class RateLimitExceeded(Exception):
+    """Nessun token PA-API disponibile entro la scadenza richiesta"""
+
+
+def utc_day(timestamp):
+    """Giorno UTC di un timestamp (la quota TPD PA-API si azzera a mezzanotte UTC)"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).date()
+
+
+class QuotaBackend(ABC):
+    """
+    Stato condiviso del token bucket (token disponibili e uso giornaliero)
+
+    Le implementazioni devono rendere take() atomico per tutti i processi
+    che condividono lo stesso store (memoria, file SQLite, store di rete).
+    """
+
+    @abstractmethod
+    def take(self, rate, burst, daily_quota):
+        """
+        Prova a prelevare un token
+
+        Args:
+            rate: Token generati al secondo
+            burst: Token accumulabili al massimo
+            daily_quota: Chiamate massime per giorno UTC (None = illimitate)
+
+        Returns:
+            float: 0 se il token è stato prelevato, altrimenti i secondi
+                stimati prima del prossimo token (inf = quota giornaliera esaurita)
+        """
+
+    @abstractmethod
+    def snapshot(self, rate, burst):
+        """
+        Stato corrente del bucket
+
+        Returns:
+            dict: {'tokens': float, 'daily_used': int}
+        """
+
+
+def _refill(tokens, updated, now, rate, burst):
+    """Token disponibili a `now` partendo dallo stato salvato a `updated`"""
+    elapsed = max(0.0, now - updated)
+    return min(burst, tokens + elapsed * rate)
+
+
+def _take_token(tokens, day_count, rate, daily_quota):
+    """Ritorna (nuovi token, nuovo contatore, attesa) per una richiesta di token"""
+    if daily_quota is not None and day_count >= daily_quota:
+        return tokens, day_count, float('inf')
+    if tokens >= 1:
+        return tokens - 1, day_count + 1, 0.0
+    return tokens, day_count, (1 - tokens) / rate
+
+
+class MemoryQuotaBackend(QuotaBackend):
+    """Stato del bucket nella memoria del processo"""
+
+    def __init__(self, clock=time.monotonic, wall_clock=time.time):
+        """
+        Args:
+            clock: Orologio monotono (iniettabile nei test)
+            wall_clock: Orologio di sistema per il reset giornaliero
+        """
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._tokens = None
+        self._updated = clock()
+        self._day = None
+        self._day_count = 0
+
+    def take(self, rate, burst, daily_quota):
+        self._sync(rate, burst)
+        self._tokens, self._day_count, wait = _take_token(
+            self._tokens, self._day_count, rate, daily_quota
+        )
+        return wait
+
+    def snapshot(self, rate, burst):
+        self._sync(rate, burst)
+        return {'tokens': self._tokens, 'daily_used': self._day_count}
+
+    def _sync(self, rate, burst):
+        now = self._clock()
+        if self._tokens is None:
+            self._tokens = float(burst)
+        self._tokens = _refill(self._tokens, self._updated, now, rate, burst)
+        self._updated = now
+
+        today = utc_day(self._wall_clock())
+        if today != self._day:
+            self._day = today
+            self._day_count = 0
+
+
+class SQLiteQuotaBackend(QuotaBackend):
+    """
+    Stato del bucket in un file SQLite condiviso tra processi
+
+    Ogni prelievo avviene in una transazione BEGIN IMMEDIATE: il lock del
+    file serializza i worker gunicorn dello stesso host.
+    """
+
+    def __init__(self, path, name='paapi', busy_timeout=5.0, wall_clock=time.time):
+        """
+        Args:
+            path: Percorso del file SQLite
+            name: Nome del bucket (più bucket possono condividere il file)
+            busy_timeout: Attesa massima per il lock del file (secondi)
+            wall_clock: Orologio di sistema, condiviso tra i processi
+        """
+        self.path = path
+        self.name = name
+        self.busy_timeout = busy_timeout
+        self._wall_clock = wall_clock
+        self._conn = None
+        self._pid = None
+
+    def take(self, rate, burst, daily_quota):
+        def take_token(tokens, day_count):
+            return _take_token(tokens, day_count, rate, daily_quota)
+
+        return self._update(rate, burst, take_token)
+
+    def snapshot(self, rate, burst):
+        state = {}
+
+        def read(tokens, day_count):
+            state.update(tokens=tokens, daily_used=day_count)
+            return tokens, day_count, 0.0
+
+        self._update(rate, burst, read)
+        return state
+
+    def _connect(self):
+        """Connessione per processo (riaperta dopo un fork)"""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS quota_buckets ('
+                'name TEXT PRIMARY KEY, tokens REAL, updated REAL, day TEXT, day_count INTEGER)'
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _update(self, rate, burst, apply):
+        """Legge, aggiorna con apply() e salva lo stato in una transazione esclusiva"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = self._wall_clock()
+            today = utc_day(now).isoformat()
+            row = conn.execute(
+                'SELECT tokens, updated, day, day_count FROM quota_buckets WHERE name = ?',
+                (self.name,)
+            ).fetchone()
+
+            if row is None:
+                tokens, day_count = float(burst), 0
+            else:
+                tokens, updated, day, day_count = row
+                tokens = _refill(tokens, updated, now, rate, burst)
+                if day != today:
+                    day_count = 0
+
+            tokens, day_count, wait = apply(tokens, day_count)
+
+            conn.execute(
+                'INSERT OR REPLACE INTO quota_buckets (name, tokens, updated, day, day_count) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self.name, tokens, now, today, day_count)
+            )
+            conn.execute('COMMIT')
+            return wait
+
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+
+class TokenBucket:
+    """
+    Token bucket per TPS con quota giornaliera (TPD) e code a priorità
+
+    I chiamanti in attesa sono serviti in ordine di priorità e, a parità,
+    in ordine di arrivo: il traffico interattivo passa davanti a refresh
+    in background e job bulk. La coda è locale al processo, i token vivono
+    nel backend (condivisibile tra processi).
+    """
+
+    def __init__(
+        self,
+        rate=1.0,
+        burst=1,
+        daily_quota=None,
+        timeouts=None,
+        backend=None,
+        clock=time.monotonic,
+        wall_clock=time.time
+    ):
+        """
+        Inizializza il limiter
+
+        Args:
+            rate: Token generati al secondo (TPS PA-API)
+            burst: Token accumulabili al massimo
+            daily_quota: Chiamate massime per giorno UTC (None = illimitate)
+            timeouts: {priorità: attesa massima di default in secondi}
+            backend: QuotaBackend per lo stato dei token
+                (default: MemoryQuotaBackend, solo questo processo)
+            clock: Orologio monotono (iniettabile nei test)
+            wall_clock: Orologio di sistema per il reset giornaliero
+        """
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.daily_quota = daily_quota
+        self.timeouts = dict(timeouts or {})
+        self.backend = backend or MemoryQuotaBackend(clock, wall_clock)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._waiters = []
+        self._async_waiters = {}  # ticket -> (event loop, asyncio.Event)
+        self._sequence = itertools.count()
+
+        self.granted = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.rejected = dict.fromkeys(PRIORITY_NAMES, 0)
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Ottiene un token, accodandosi secondo la priorità
+
+        Args:
+            priority: Classe di priorità (PRIORITY_*)
+            timeout: Attesa massima in secondi; 0 = fail fast,
+                None = default configurato per la priorità (o attesa illimitata)
+
+        Raises:
+            RateLimitExceeded: Token non disponibile entro il timeout
+                o quota giornaliera esaurita
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(priority)
+        deadline = None if timeout is None else self._clock() + timeout
+
+        with self._changed:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+
+            try:
+                while True:
+                    # Il primo in coda prova il backend, gli altri attendono una notifica
+                    wait = None
+                    if self._waiters[0] == ticket:
+                        wait = self.backend.take(self.rate, self.burst, self.daily_quota)
+                        if wait == 0:
+                            self.granted[priority] = self.granted.get(priority, 0) + 1
+                            return
+                        if wait == float('inf'):
+                            self._reject(priority)
+                            raise RateLimitExceeded("Quota giornaliera PA-API esaurita")
+
+                    if deadline is not None:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            self._reject(priority)
+                            raise RateLimitExceeded("Limite richieste PA-API raggiunto")
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    self._changed.wait(wait)
+
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._notify_waiters()
+
+    async def acquire_async(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Ottiene un token senza occupare un thread (vedi acquire)
+
+        Stessa coda a priorità dei chiamanti sincroni. L'attesa avviene
+        sull'event loop: se la coroutine viene cancellata mentre attende,
+        nessun token (né quota giornaliera) viene prelevato.
+
+        Args:
+            priority: Classe di priorità (PRIORITY_*)
+            timeout: Attesa massima in secondi (come acquire)
+
+        Raises:
+            RateLimitExceeded: Token non disponibile entro il timeout
+                o quota giornaliera esaurita
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(priority)
+        deadline = None if timeout is None else self._clock() + timeout
+        woken = asyncio.Event()
+
+        with self._lock:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), woken)
+
+        try:
+            while True:
+                # Prelievo senza await in mezzo: il token è preso solo se
+                # viene restituito al chiamante
+                with self._lock:
+                    woken.clear()
+                    wait = None
+                    if self._waiters[0] == ticket:
+                        wait = self.backend.take(self.rate, self.burst, self.daily_quota)
+                        if wait == 0:
+                            self.granted[priority] = self.granted.get(priority, 0) + 1
+                            return
+                        if wait == float('inf'):
+                            self._reject(priority)
+                            raise RateLimitExceeded("Quota giornaliera PA-API esaurita")
+
+                    if deadline is not None:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            self._reject(priority)
+                            raise RateLimitExceeded("Limite richieste PA-API raggiunto")
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                try:
+                    await asyncio.wait_for(woken.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+        finally:
+            with self._changed:
+                del self._async_waiters[ticket]
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._notify_waiters()
+
+    def wait_budget(self, count, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Attesa massima per count token chiesti dalla stessa richiesta
+
+        All'attesa ammessa per un token si aggiunge la spaziatura che il
+        limiter impone ai token oltre il burst: con 1 TPS e burst 1 la
+        quinta pagina di una ricerca arriva comunque dopo 4 secondi.
+
+        Args:
+            count: Token richiesti insieme (es: pagine di una ricerca)
+            priority: Classe di priorità (PRIORITY_*)
+            timeout: Attesa per un token (None = default della priorità)
+
+        Returns:
+            float | None: Secondi di attesa complessiva (None = illimitata)
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(priority)
+        if timeout is None:
+            return None
+        return timeout + max(0.0, count - self.burst) / self.rate
+
+    def stats(self):
+        """
+        Statistiche del limiter
+
+        Returns:
+            dict: Token disponibili, coda, uso giornaliero e contatori per priorità
+        """
+        with self._lock:
+            state = self.backend.snapshot(self.rate, self.burst)
+            return {
+                'backend': type(self.backend).__name__,
+                'rate': self.rate,
+                'burst': self.burst,
+                'tokens': round(state['tokens'], 3),
+                'waiting': len(self._waiters),
+                'daily_quota': self.daily_quota,
+                'daily_used': state['daily_used'],
+                'granted': {PRIORITY_NAMES.get(p, p): n for p, n in self.granted.items()},
+                'rejected': {PRIORITY_NAMES.get(p, p): n for p, n in self.rejected.items()}
+            }
+
+    def _notify_waiters(self):
+        """Sveglia i chiamanti in attesa dopo un cambio della coda (con il lock acquisito)"""
+        self._changed.notify_all()
+        if self._waiters and self._waiters[0] in self._async_waiters:
+            loop, woken = self._async_waiters[self._waiters[0]]
+            try:
+                loop.call_soon_threadsafe(woken.set)
+            except RuntimeError:
+                # Event loop già chiuso
+                pass
+
+    def _reject(self, priority):
+        self.rejected[priority] = self.rejected.get(priority, 0) + 1
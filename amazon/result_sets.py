@@ -0,0 +1,174 @@
+"""
+Risultati di ricerca ordinati lato server, paginati con cursori opachi
+
+Il primo accesso a una ricerca salva l'intero risultato già filtrato e
+ordinato; le pagine successive sono fette della stessa lista, senza
+nuove chiamate PA-API.
+"""
+import base64
+from collections import OrderedDict
+import json
+import logging
+import threading
+import time
+
+from amazon.product_table import ProductTable
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(query, offset, after=None):
+    """
+    Cursore opaco verso la pagina che inizia a `offset`
+
+    Args:
+        query: Parametri della richiesta originale (dict di stringhe)
+        offset: Posizione del primo prodotto della pagina
+        after: ASIN dell'ultimo prodotto già restituito
+
+    Returns:
+        str: Cursore base64 url-safe
+    """
+    payload = json.dumps({'q': query, 'o': offset, 'a': after}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursore di encode_cursor
+
+    Returns:
+        tuple: (query, offset, after)
+
+    Raises:
+        ValueError: Cursore malformato
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        query, offset, after = payload['q'], payload['o'], payload.get('a')
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Cursore non valido") from e
+
+    valid = (
+        isinstance(query, dict)
+        and all(isinstance(value, str) for value in query.values())
+        and isinstance(offset, int) and offset >= 0
+        and (after is None or isinstance(after, str))
+    )
+    if not valid:
+        raise ValueError("Cursore non valido")
+    return query, offset, after
+
+
+class ResultSet:
+    """Risultato di una ricerca filtrato e ordinato, con posizione per ASIN"""
+
+    __slots__ = ('products', 'categories', 'partial', 'positions')
+
+    def __init__(self, products, categories=None, partial=False):
+        self.products = products
+        self.categories = categories
+        self.partial = partial
+        self.positions = {product['asin']: i for i, product in enumerate(products)}
+
+    def page(self, offset, limit, after=None):
+        """
+        Fetta di `limit` prodotti a partire da offset
+
+        Se il risultato è stato ricostruito (es: cache scaduta) e l'ultimo
+        ASIN restituito non è più in offset - 1, la pagina riprende dopo
+        quell'ASIN: i cursori restano stabili senza duplicati.
+
+        Returns:
+            tuple: (prodotti, offset della pagina successiva o None)
+        """
+        if after is not None and offset:
+            position = self.positions.get(after)
+            if position is not None:
+                offset = position + 1
+
+        end = offset + limit
+        return self.products[offset:end], (end if end < len(self.products) else None)
+
+
+class ResultSetCache:
+    """Cache LRU con TTL dei ResultSet, condivisa tra le richieste del processo"""
+
+    def __init__(self, ttl=300, max_entries=200, clock=time.monotonic):
+        """
+        Args:
+            ttl: Secondi in cui un risultato ordinato resta paginabile
+            max_entries: Numero massimo di risultati in cache (LRU)
+            clock: Funzione orologio (iniettabile nei test)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Ritorna il ResultSet se ancora fresco
+
+        Args:
+            key: Chiave della ricerca (parametri normalizzati, ordinamento e filtri)
+
+        Returns:
+            ResultSet | None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, result, sort='relevance', min_rating=None):
+        """
+        Filtra, ordina e salva il risultato di una ricerca
+
+        Args:
+            key: Chiave della ricerca
+            result: Risultato di search_items/search_categories (senza errori)
+            sort: Uno di product_table.SORT_KEYS
+            min_rating: Valutazione minima in stelle
+
+        Returns:
+            ResultSet
+        """
+        products = ProductTable(result['products']).filter(sort=sort, min_rating=min_rating)
+        result_set = ResultSet(products, result.get('categories'), result.get('partial', False))
+
+        with self._lock:
+            self._entries[key] = (result_set, self._clock())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return result_set
+
+    def stats(self):
+        """
+        Statistiche della cache
+
+        Returns:
+            dict: Dimensione e contatori hit/miss
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,321 @@
+"""
+Indice invertito in memoria sui prodotti già visti
+
+Permette di rispondere localmente a ricerche simili a quelle già fatte
+su PA-API ("cuffie bluetooth" -> "cuffie bluetooth economiche").
+"""
+from collections import OrderedDict
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Parole vuote italiane (già senza accenti)
+STOPWORDS = frozenset((
+    'a', 'ad', 'al', 'alla', 'alle', 'allo', 'agli', 'ai', 'che', 'ci', 'col', 'con',
+    'da', 'dal', 'dalla', 'dalle', 'dallo', 'dagli', 'dai', 'del', 'della', 'delle',
+    'dello', 'degli', 'dei', 'di', 'e', 'ed', 'fra', 'gli', 'i', 'il', 'in', 'la',
+    'le', 'lo', 'ma', 'ne', 'nel', 'nella', 'nelle', 'nello', 'negli', 'nei', 'non',
+    'o', 'per', 'piu', 'se', 'si', 'sul', 'sulla', 'sulle', 'sullo', 'sugli', 'sui',
+    'su', 'tra', 'un', 'una', 'uno', 'the', 'and', 'for', 'with', 'of',
+    # Articolate elise: "dell'auricolare" -> "dell", "auricolare"
+    'all', 'dall', 'dell', 'nell', 'sull', 'quell',
+))
+
+# Peso di un termine per campo del prodotto
+FIELD_WEIGHTS = (('title', 3.0), ('brand', 2.0), ('features', 1.0))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold_accents(text):
+    """Minuscolo senza accenti: 'Perché Sì' -> 'perche si'"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem(token):
+    """
+    Stemming leggero per l'italiano: singolare e plurale collassano
+
+    cuffia/cuffie -> cuffi, economico/economiche -> economic,
+    auricolare/auricolari -> auricolar
+    """
+    if len(token) <= 4 or token.isdigit():
+        return token
+    if token.endswith(('che', 'chi', 'ghe', 'ghi')):
+        return token[:-2]
+    if token[-1] in 'aeiou':
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Token di un testo: accenti rimossi, elisioni separate, stopword escluse
+
+    Args:
+        text: Testo libero (titolo, marca, feature o query)
+
+    Returns:
+        list: Token normalizzati, nell'ordine del testo
+    """
+    if not text:
+        return []
+    return [
+        stem(token)
+        for token in _TOKEN_RE.findall(fold_accents(text))
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+class SearchIndex:
+    """
+    Indice invertito (token -> ASIN) con copertura delle ricerche
+
+    Una ricerca è "coperta" se negli ultimi max_age secondi PA-API ha
+    risposto a una ricerca più generica (i suoi token sono un sottoinsieme
+    di quelli della query) nella stessa categoria: i prodotti indicizzati
+    da quella risposta sono candidati anche per la query più specifica.
+    """
+
+    def __init__(self, max_age=900, max_documents=50000, max_coverage=10000, clock=time.time):
+        """
+        Args:
+            max_age: Secondi in cui prodotti e ricerche indicizzate sono considerati freschi
+            max_documents: Prodotti massimi nell'indice (i meno recenti sono rimossi)
+            max_coverage: Ricerche PA-API ricordate per la copertura
+            clock: Orologio (iniettabile nei test)
+        """
+        self.max_age = max_age
+        self.max_documents = max_documents
+        self.max_coverage = max_coverage
+        self._clock = clock
+
+        # asin -> (Product, {token: peso}, categorie, aggiornato, ordine)
+        self._documents = OrderedDict()
+        self._postings = {}  # token -> {asin: peso}
+        self._coverage = OrderedDict()  # (token, categoria, prezzo max) -> timestamp
+        self._coverage_by_token = {}
+        self._lock = threading.Lock()
+        self._batches = 0
+
+        self.local_hits = 0
+        self.fallbacks = 0
+
+    def add(self, products, category=None):
+        """
+        Indicizza (o reindicizza) i prodotti di una risposta PA-API
+
+        Args:
+            products: Product parsati
+            category: Categoria della ricerca (None/'All' = nessuna)
+
+        Returns:
+            int: Prodotti indicizzati
+        """
+        now = self._clock()
+        added = 0
+
+        with self._lock:
+            self._batches += 1
+            for position, product in enumerate(products):
+                terms = {}
+                for field, weight in FIELD_WEIGHTS:
+                    value = product.get(field)
+                    texts = value if isinstance(value, (list, tuple)) else [value]
+                    for text in texts:
+                        for token in tokenize(text):
+                            terms[token] = max(terms.get(token, 0.0), weight)
+
+                previous = self._remove(product.asin)
+                categories = previous[2] if previous else frozenset()
+                if category and category != 'All':
+                    categories = categories | {category}
+
+                # Ordine: prima le risposte più recenti, poi il ranking PA-API
+                self._documents[product.asin] = (
+                    product, terms, categories, now, (-self._batches, position)
+                )
+                for token, weight in terms.items():
+                    self._postings.setdefault(token, {})[product.asin] = weight
+                added += 1
+
+            while len(self._documents) > self.max_documents:
+                self._remove(next(iter(self._documents)))
+
+        return added
+
+    def mark_covered(self, keywords, category='All', max_price=None):
+        """
+        Registra che PA-API ha risposto alla ricerca (e i prodotti sono indicizzati)
+
+        Args:
+            keywords: Parole chiave della ricerca
+            category: Categoria Amazon
+            max_price: Prezzo massimo inviato a PA-API
+        """
+        tokens = frozenset(tokenize(keywords))
+        if not tokens:
+            return
+
+        key = (tokens, category or 'All', max_price or None)
+        with self._lock:
+            self._coverage[key] = self._clock()
+            self._coverage.move_to_end(key)
+            for token in tokens:
+                self._coverage_by_token.setdefault(token, set()).add(key)
+
+            while len(self._coverage) > self.max_coverage:
+                old_key, _ = self._coverage.popitem(last=False)
+                for token in old_key[0]:
+                    keys = self._coverage_by_token.get(token)
+                    if keys is not None:
+                        keys.discard(old_key)
+                        if not keys:
+                            del self._coverage_by_token[token]
+
+    def search(
+        self,
+        keywords,
+        category='All',
+        max_price=None,
+        prime_only=False,
+        discount_only=False,
+        limit=10
+    ):
+        """
+        Risponde localmente a una ricerca coperta da una ricerca PA-API recente
+
+        I risultati contengono tutti i token della query; se nessun prodotto
+        indicizzato li contiene tutti la query torna a PA-API.
+
+        Args:
+            keywords: Parole chiave
+            category: Categoria Amazon
+            max_price: Prezzo massimo
+            prime_only: Solo prodotti Prime
+            discount_only: Solo prodotti in sconto
+            limit: Numero massimo di risultati
+
+        Returns:
+            dict | None: Come AmazonClient.search_items, None se la query non
+                è coperta (il chiamante deve interrogare PA-API)
+        """
+        tokens = set(tokenize(keywords))
+
+        with self._lock:
+            covering = self._covering(tokens, category or 'All', max_price)
+            if covering is None or not tokens:
+                self.fallbacks += 1
+                return None
+
+            # Ogni token della query deve comparire nel prodotto: i token oltre
+            # la ricerca coperta restringono i candidati, non solo lo score
+            postings = [self._postings.get(token) for token in tokens]
+            if not all(postings):
+                self.fallbacks += 1
+                return None
+
+            cutoff = self._clock() - self.max_age
+            documents = self._documents
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for matches in postings[1:]:
+                candidates &= matches.keys()
+
+            total = len(documents)
+            idf = {
+                token: math.log(1 + total / len(self._postings[token]))
+                for token in tokens
+            }
+
+            scored = []
+            for asin in candidates:
+                product, terms, categories, updated, order = documents[asin]
+                if updated < cutoff:
+                    continue
+                if category and category != 'All' and category not in categories:
+                    continue
+                if max_price and (product.price.current is None or product.price.current > max_price):
+                    continue
+                if prime_only and not product.is_prime:
+                    continue
+                if discount_only and not product.price.discount_percent:
+                    continue
+
+                score = sum(terms[token] * weight for token, weight in idf.items() if token in terms)
+                scored.append((-score, order, product))
+
+            if not scored:
+                self.fallbacks += 1
+                return None
+
+            self.local_hits += 1
+
+        scored.sort(key=lambda entry: entry[:2])
+        products = [product for _, _, product in scored[:limit]]
+        return {
+            'products': products,
+            'count': len(products),
+            'error': None
+        }
+
+    def stats(self):
+        """
+        Statistiche dell'indice
+
+        Returns:
+            dict: Documenti, token, ricerche coperte e risposte locali
+        """
+        with self._lock:
+            lookups = self.local_hits + self.fallbacks
+            return {
+                'documents': len(self._documents),
+                'tokens': len(self._postings),
+                'covered_searches': len(self._coverage),
+                'local_hits': self.local_hits,
+                'fallbacks': self.fallbacks,
+                'hit_rate': self.local_hits / lookups if lookups else 0.0
+            }
+
+    def _covering(self, tokens, category, max_price):
+        """Token della ricerca PA-API fresca più specifica che copre la query"""
+        cutoff = self._clock() - self.max_age
+        best = None
+
+        keys = set()
+        for token in tokens:
+            keys |= self._coverage_by_token.get(token, set())
+
+        for key in keys:
+            covered_tokens, covered_category, covered_price = key
+            if covered_category != category or not covered_tokens <= tokens:
+                continue
+            if covered_price and (not max_price or max_price > covered_price):
+                continue
+            if self._coverage[key] < cutoff:
+                continue
+            if best is None or len(covered_tokens) > len(best):
+                best = covered_tokens
+
+        return best
+
+    def _remove(self, asin):
+        """Rimuove un prodotto dall'indice, ritorna la voce rimossa (o None)"""
+        entry = self._documents.pop(asin, None)
+        if entry is None:
+            return None
+
+        for token in entry[1]:
+            matches = self._postings.get(token)
+            if matches is not None:
+                matches.pop(asin, None)
+                if not matches:
+                    del self._postings[token]
+
+        return entry
@@ -0,0 +1,329 @@
+"""
+Risoluzione dei link brevi Amazon (amzn.to, amzn.eu, ...) con cache persistente
+
+I redirect sono seguiti fino al primo URL di un marketplace Amazon, senza
+scaricare la pagina prodotto. I risultati (anche i link morti) sono in
+una LRU in memoria e in SQLite, condivisa tra i processi: ogni link
+breve costa al massimo un giro di redirect finché resta in cache.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urljoin
+
+import urllib3
+
+from amazon.link_generator import classify_url
+from amazon.singleflight import SingleFlight
+from amazon.sqlite_pool import SQLitePool
+
+logger = logging.getLogger(__name__)
+
+REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+
+# 4xx temporanei (timeout, rate limit dell'accorciatore): ritentati come i 5xx
+TRANSIENT_STATUSES = frozenset((408, 429))
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS short_links (
+        url TEXT PRIMARY KEY,
+        resolved TEXT,
+        updated REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+)
+
+# Righe scadute rimosse dal file ogni N scritture
+_PRUNE_EVERY = 1000
+
+# Valore in cache di un link morto (None = non in cache)
+_DEAD = ''
+
+
+class ShortLinkResolver:
+    """
+    Risolve link brevi Amazon seguendo i redirect con un transport HTTP
+
+    Il transport è un oggetto con request(method, url, redirect=False,
+    timeout=...) che ritorna una risposta con .status e .headers
+    (urllib3.PoolManager o PooledTransport; uno stub nei test).
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        cache_path=None,
+        max_entries=10000,
+        ttl=30 * 86400,
+        negative_ttl=86400,
+        max_redirects=5,
+        timeout=5.0,
+        max_workers=8,
+        busy_timeout=5.0,
+        pool_size=2,
+        clock=time.time
+    ):
+        """
+        Args:
+            transport: Transport HTTP (default: urllib3.PoolManager)
+            cache_path: File SQLite della cache persistente (None = solo memoria)
+            max_entries: Link tenuti nella LRU in memoria
+            ttl: Secondi di validità di un link risolto
+            negative_ttl: Secondi di validità di un link morto
+            max_redirects: Redirect massimi seguiti per link
+            timeout: Timeout per richiesta HTTP in secondi
+            max_workers: Richieste concorrenti di resolve_many (pool di thread del resolver)
+            busy_timeout: Attesa massima per il lock in scrittura SQLite (secondi)
+            pool_size: Connessioni SQLite aperte al massimo
+            clock: Orologio di sistema, condiviso tra i processi
+        """
+        self.transport = transport if transport is not None else urllib3.PoolManager(maxsize=max_workers)
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_redirects = max_redirects
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.busy_timeout = busy_timeout
+        self._clock = clock
+
+        self._entries = OrderedDict()  # url -> (risolto o _DEAD, aggiornato)
+        self._lock = threading.Lock()
+        self._pool = None
+        if cache_path is not None:
+            self._pool = SQLitePool(cache_path, size=pool_size, busy_timeout=busy_timeout, schema=SCHEMA)
+        self._executor = None
+        self._executor_pid = None
+        self._flight = SingleFlight()
+        self._writes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.resolved = 0
+        self.dead = 0
+        self.errors = 0
+        self.requests = 0
+
+    def resolve(self, url):
+        """
+        URL finale di un link breve
+
+        Args:
+            url: Link breve (amzn.to/...); altri URL sono ritornati invariati
+
+        Returns:
+            str | None: URL del marketplace Amazon, None se il link è morto
+                o non raggiungibile
+        """
+        if classify_url(url)[1] != 'short':
+            return url
+
+        cached = self._lookup(url)
+        if cached is not None:
+            return cached or None
+
+        # Richieste concorrenti per lo stesso link seguono i redirect una volta
+        return self._flight.do(url, lambda: self._resolve_upstream(url))
+
+    def resolve_many(self, urls):
+        """
+        Risolve più link in parallelo (duplicati risolti una volta)
+
+        Args:
+            urls: Iterabile di URL
+
+        Returns:
+            dict: {url: URL risolto o None}
+        """
+        urls = list(dict.fromkeys(urls))
+        results = {}
+        pending = []
+        for url in urls:
+            if classify_url(url)[1] != 'short':
+                results[url] = url
+                continue
+            cached = self._lookup(url)
+            if cached is not None:
+                results[url] = cached or None
+            else:
+                pending.append(url)
+
+        if len(pending) == 1:
+            results[pending[0]] = self.resolve(pending[0])
+        elif pending:
+            # Pool del resolver, riusato da tutte le chiamate (es: ogni finestra di rewrite_links)
+            for url, resolved in zip(pending, self._get_executor().map(self.resolve, pending)):
+                results[url] = resolved
+
+        return {url: results[url] for url in urls}
+
+    def close(self):
+        """Ferma il pool di thread e chiude le connessioni SQLite"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.close()
+
+    def stats(self):
+        """
+        Statistiche del resolver
+
+        Returns:
+            dict: Hit in memoria e su disco, link risolti, morti, errori,
+                richieste HTTP e connessioni SQLite
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.resolved + self.dead + self.errors
+            return {
+                'size': len(self._entries),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'resolved': self.resolved,
+                'dead': self.dead,
+                'errors': self.errors,
+                'requests': self.requests,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'connections': self._pool.stats() if self._pool is not None else None
+            }
+
+    def _resolve_upstream(self, url):
+        """Segue i redirect e salva il risultato (gli errori di rete non sono salvati)"""
+        try:
+            resolved = self._follow(url)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Link breve non risolto {url}: {str(e)}")
+            return None
+
+        with self._lock:
+            if resolved:
+                self.resolved += 1
+            else:
+                self.dead += 1
+        self._save(url, resolved or _DEAD)
+        return resolved
+
+    def _follow(self, url):
+        """
+        Redirect fino al primo URL Amazon non breve
+
+        Returns:
+            str | None: URL risolto, None per link morti (4xx, troppi
+                redirect o redirect fuori da Amazon)
+
+        Raises:
+            Exception: Errori di rete, risposte 5xx, 408 e 429 (non
+                salvati in cache)
+        """
+        current = url
+        for _ in range(self.max_redirects + 1):
+            with self._lock:
+                self.requests += 1
+            response = self.transport.request(
+                'HEAD', current, redirect=False, timeout=self.timeout
+            )
+            status = response.status
+
+            if status in REDIRECT_STATUSES:
+                location = response.headers.get('Location')
+                if not location:
+                    return None
+                current = urljoin(current, location)
+                kind = classify_url(current)[1]
+                if kind == 'amazon':
+                    return current
+                if kind != 'short':
+                    return None
+                continue
+
+            if status >= 500 or status in TRANSIENT_STATUSES:
+                raise RuntimeError(f"HTTP {status}")
+            return None
+
+        return None
+
+    def _lookup(self, url):
+        """Risultato in cache (memoria, poi disco): URL, _DEAD o None se assente"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and self._fresh(entry, now):
+                self.memory_hits += 1
+                self._entries.move_to_end(url)
+                return entry[0]
+
+        if self._pool is None:
+            return None
+
+        try:
+            with self._pool.connection() as conn:
+                row = conn.execute(
+                    'SELECT resolved, updated FROM short_links WHERE url = ?', (url,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Errore nella lettura del link breve {url}: {str(e)}")
+            return None
+        if row is None or not self._fresh(row, now):
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(url, row)
+        return row[0]
+
+    def _save(self, url, resolved):
+        """Salva un risultato in memoria e su disco"""
+        entry = (resolved, self._clock())
+        with self._lock:
+            self._remember(url, entry)
+            self._writes += 1
+            prune = self._writes % _PRUNE_EVERY == 0
+
+        if self._pool is None:
+            return
+
+        try:
+            with self._pool.connection() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO short_links (url, resolved, updated) VALUES (?, ?, ?)',
+                    (url, resolved, entry[1])
+                )
+                if prune:
+                    conn.execute(
+                        'DELETE FROM short_links WHERE updated < ?',
+                        (entry[1] - max(self.ttl, self.negative_ttl),)
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Errore nel salvataggio del link breve {url}: {str(e)}")
+
+    def _fresh(self, entry, now):
+        """True se un risultato (risolto o morto) non è scaduto"""
+        ttl = self.ttl if entry[0] else self.negative_ttl
+        return now - entry[1] < ttl
+
+    def _remember(self, url, entry):
+        """Inserisce nella LRU in memoria (con il lock acquisito)"""
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_executor(self):
+        """Pool di thread per resolve_many (creato al primo uso, ricreato dopo un fork)"""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='short-links'
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
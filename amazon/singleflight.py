@@ -0,0 +1,82 @@
+"""
+Coalescing di chiamate concorrenti identiche (single-flight)
+"""
+import threading
+
+
+class _Call:
+    """Chiamata in corso condivisa tra più chiamanti"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Esegue una sola chiamata per chiave alla volta, condividendone il risultato"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Esegue fn() oppure attende la chiamata già in corso per la stessa chiave
+
+        Args:
+            key: Chiave hashable della chiamata
+            fn: Callable senza argomenti
+
+        Returns:
+            Risultato di fn(), condiviso tra tutti i chiamanti concorrenti
+
+        Raises:
+            L'eccezione sollevata da fn(), propagata a tutti i chiamanti
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self):
+        """
+        Statistiche di coalescing
+
+        Returns:
+            dict: Esecuzioni reali, chiamanti accodati e chiamate in corso
+        """
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
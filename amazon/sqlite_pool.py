@@ -0,0 +1,146 @@
+"""
+Pool limitato di connessioni SQLite condiviso tra thread
+
+Le connessioni (WAL) sono prese in prestito per una singola operazione e
+restituite subito: thread di breve durata (richieste, fan-out, executor)
+non lasciano connessioni e file descriptor aperti, e il numero di
+connessioni verso il file non supera mai `size`.
+"""
+from contextlib import contextmanager
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SQLitePool:
+    """Connessioni SQLite riusate, al massimo `size` aperte per processo"""
+
+    def __init__(self, path, size=4, busy_timeout=5.0, schema=()):
+        """
+        Args:
+            path: Percorso del file SQLite
+            size: Connessioni aperte al massimo
+            busy_timeout: Attesa massima per il lock del file e per una
+                connessione libera (secondi)
+            schema: Statement eseguiti all'apertura di ogni connessione
+        """
+        self.path = path
+        self.size = size
+        self.busy_timeout = busy_timeout
+        self.schema = tuple(schema)
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = []
+        self._open = 0
+        self._pid = os.getpid()
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        """
+        Connessione in prestito per la durata del blocco with
+
+        Raises:
+            sqlite3.OperationalError: Nessuna connessione libera entro busy_timeout
+        """
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    def close(self):
+        """Chiude le connessioni libere; quelle in uso sono chiuse alla restituzione"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        """
+        Statistiche del pool
+
+        Returns:
+            dict: Dimensione massima, connessioni aperte e libere
+        """
+        with self._lock:
+            return {'size': self.size, 'open': self._open, 'idle': len(self._idle)}
+
+    def _checkout(self):
+        """Prende una connessione libera o ne apre una nuova entro il limite"""
+        deadline = time.monotonic() + self.busy_timeout
+        with self._available:
+            self._reset_after_fork()
+            self._closed = False
+            while not self._idle and self._open >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Nessuna connessione SQLite libera entro {self.busy_timeout}s"
+                    )
+                self._available.wait(remaining)
+
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+
+        try:
+            return self._open_connection()
+        except BaseException:
+            with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+
+    def _checkin(self, conn):
+        """Restituisce una connessione al pool"""
+        reusable = True
+        if conn.in_transaction:
+            # Transazione lasciata aperta da un errore: non va riusata così
+            try:
+                conn.execute('ROLLBACK')
+            except sqlite3.Error as e:
+                logger.warning(f"Connessione SQLite scartata ({self.path}): {str(e)}")
+                reusable = False
+
+        with self._available:
+            if reusable and self._pid == os.getpid() and not self._closed:
+                self._idle.append(conn)
+                self._available.notify()
+                return
+            if self._pid == os.getpid():
+                self._open -= 1
+                self._available.notify()
+        conn.close()
+
+    def _open_connection(self):
+        """Nuova connessione in autocommit, WAL e schema applicato"""
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in self.schema:
+                conn.execute(statement)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _reset_after_fork(self):
+        """Dopo un fork le connessioni del processo padre non vanno usate (con il lock)"""
+        if self._pid != os.getpid():
+            self._idle = []
+            self._open = 0
+            self._pid = os.getpid()
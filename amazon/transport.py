@@ -0,0 +1,140 @@
+"""
+Transport HTTP keep-alive per le chiamate PA-API dell'SDK
+"""
+import logging
+import threading
+
+import urllib3
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class _CountingPoolMixin:
+    """Conta connessioni aperte, riusate e attese di un connection pool"""
+
+    transport = None
+
+    def _get_conn(self, timeout=None):
+        # Pool vuoto in modalità block: il chiamante attende una connessione libera
+        waited = self.pool is not None and self.pool.empty()
+        conn = super()._get_conn(timeout)
+
+        # Una connessione con socket aperto è keep-alive, le altre si connettono ora
+        reused = getattr(conn, 'sock', None) is not None
+        if self.transport is not None:
+            self.transport._record(reused, waited)
+        return conn
+
+    def urlopen(self, method, url, *args, timeout=None, pool_timeout=None, **kwargs):
+        # L'SDK passa timeout=None (nessun timeout): usa quello del pool
+        if timeout is None:
+            timeout = self.timeout
+        if pool_timeout is None and self.transport is not None:
+            pool_timeout = self.transport.pool_timeout
+        return super().urlopen(
+            method, url, *args, timeout=timeout, pool_timeout=pool_timeout, **kwargs
+        )
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class PooledTransport(urllib3.PoolManager):
+    """
+    PoolManager urllib3 con connessioni keep-alive persistenti e statistiche
+
+    Sostituisce il pool creato dall'SDK python-amazon-paapi: handshake
+    TCP/TLS pagati una volta per worker invece che per ricerca.
+    """
+
+    def __init__(
+        self,
+        pool_size=10,
+        connect_timeout=3.05,
+        read_timeout=10.0,
+        pool_timeout=None,
+        num_pools=4
+    ):
+        """
+        Inizializza il transport
+
+        Args:
+            pool_size: Connessioni keep-alive massime per host
+            connect_timeout: Timeout di connessione (TCP + TLS) in secondi
+            read_timeout: Timeout di lettura della risposta in secondi
+            pool_timeout: Attesa massima per una connessione libera
+                quando il pool è pieno (None = illimitata)
+            num_pools: Host distinti tenuti in memoria
+        """
+        super().__init__(
+            num_pools=num_pools,
+            maxsize=pool_size,
+            block=True,
+            timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout)
+        )
+        self.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.reused = 0
+        self.waited = 0
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.transport = self
+        return pool
+
+    def install(self, api):
+        """
+        Installa il transport nel client REST di un amazon_paapi.AmazonApi
+
+        Args:
+            api: Istanza amazon_paapi.AmazonApi
+
+        Returns:
+            bool: True se installato, False se l'SDK non espone il client REST
+        """
+        try:
+            rest_client = api.api.api_client.rest_client
+        except AttributeError:
+            logger.warning("Transport PA-API non installato: client REST SDK non trovato")
+            return False
+
+        rest_client.pool_manager = self
+        return True
+
+    def stats(self):
+        """
+        Statistiche del pool
+
+        Returns:
+            dict: Connessioni aperte, riusate e richieste che hanno atteso il pool
+        """
+        with self._stats_lock:
+            return {
+                'pool_size': self.pool_size,
+                'requests': self.requests,
+                'opened': self.requests - self.reused,
+                'reused': self.reused,
+                'waited': self.waited,
+                'reuse_rate': self.reused / self.requests if self.requests else 0.0
+            }
+
+    def _record(self, reused, waited):
+        with self._stats_lock:
+            self.requests += 1
+            if reused:
+                self.reused += 1
+            if waited:
+                self.waited += 1
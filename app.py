@@ -3,9 +3,12 @@ Amazon Prime Day Affiliate Finder
 Applicazione Flask per ricerca prodotti Amazon con link affiliati
 """
 from flask import Flask, render_template
-from flask_caching import Cache
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from markupsafe import Markup
+from amazon.fragment_cache import FragmentCache, card_key
 from config import Config
+from routes.links import links_bp
 from routes.main import main_bp
 from routes.search import search_bp
 import logging
@@ -20,11 +23,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class JSONProvider(DefaultJSONProvider):
+    """Serializza anche i modelli con to_dict() (Product, Price, Rating)"""
+
+    @staticmethod
+    def default(o):
+        if hasattr(o, 'to_dict'):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
 def create_app():
     """Factory pattern per creare app Flask"""
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = JSONProvider(app)
 
     # Verifica credenziali Amazon
     try:
@@ -35,16 +49,13 @@ def create_app():
         if not Config.DEBUG:
             raise
 
-    # Inizializza estensioni
-    cache = Cache(app, config={
-        'CACHE_TYPE': Config.CACHE_TYPE,
-        'CACHE_DEFAULT_TIMEOUT': Config.CACHE_DEFAULT_TIMEOUT
-    })
+    # Inizializza estensioni (la cache delle ricerche è SearchCache, vedi routes/search.py)
     CORS(app)
 
     # Registra blueprints
     app.register_blueprint(main_bp)
     app.register_blueprint(search_bp)
+    app.register_blueprint(links_bp)
 
     # Error handlers
     @app.errorhandler(404)
@@ -81,6 +92,23 @@ def create_app():
 
         return html
 
+    # Card prodotto: l'HTML è riusato finché i campi mostrati non cambiano
+    app.card_cache = None
+    if Config.CARD_CACHE_ENABLED:
+        app.card_cache = FragmentCache(max_entries=Config.CARD_CACHE_MAX_ENTRIES)
+
+    @app.template_global('render_card')
+    def render_card(product):
+        """Renderizza templates/_product_card.html (dalla cache dei frammenti)"""
+        template = app.jinja_env.get_template('_product_card.html')
+
+        def render():
+            return template.render(product=product)
+
+        if app.card_cache is None:
+            return Markup(render())
+        return Markup(app.card_cache.get_or_render(card_key(product), render))
+
     # Context processors
     @app.context_processor
     def inject_globals():
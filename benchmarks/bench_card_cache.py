@@ -0,0 +1,65 @@
+"""
+Benchmark del rendering di una pagina di risultati con e senza cache delle card
+
+Pagina di 50 card: rendering Jinja di ogni card, primo rendering con
+cache (tutti miss) e rendering ripetuto (tutti hit).
+
+Uso:
+    python -m benchmarks.bench_card_cache [ripetizioni]
+"""
+import sys
+import time
+
+from amazon.fragment_cache import FragmentCache
+from amazon.models import Price, Product, Rating
+from app import create_app
+
+CARDS = 50
+
+
+def make_products(count=CARDS):
+    """Prodotti con prezzo, sconto, rating e features"""
+    return [
+        Product(
+            f"B{i:09d}", f"Cuffie Bluetooth modello {i} con cancellazione del rumore",
+            f"https://www.amazon.it/dp/B{i:09d}?tag=demo-21",
+            f"https://m.media-amazon.com/images/I/{i}.jpg", 'Marca',
+            Price(19.99 + i, f"€ {19.99 + i:.2f}", 29.99 + i, f"€ {29.99 + i:.2f}", 30),
+            is_prime=i % 2 == 0,
+            rating=Rating(4.5, 1000 + i),
+            features=('Bluetooth 5.3', 'Autonomia 30 ore', 'Custodia inclusa')
+        )
+        for i in range(count)
+    ]
+
+
+def run(label, app, template, products, repeat, clear=False):
+    with app.test_request_context():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            if clear and app.card_cache is not None:
+                app.card_cache.clear()
+            template.render(products=products)
+        elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<14} {elapsed * 1000:>8.3f} ms/pagina")
+
+
+def main(repeat=200):
+    app = create_app()
+    products = make_products()
+    template = app.jinja_env.from_string(
+        '{% for product in products %}{{ render_card(product) }}{% endfor %}'
+    )
+    print(f"{CARDS} card, {repeat} ripetizioni")
+
+    app.card_cache = None
+    run('senza cache', app, template, products, repeat)
+
+    app.card_cache = FragmentCache()
+    run('cache fredda', app, template, products, repeat, clear=True)
+    run('cache calda', app, template, products, repeat)
+    print(f"hit rate {app.card_cache.stats()['hit_rate']:.1%}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,78 @@
+"""
+Benchmark degli accessor compilati: safe_get per chiamata vs compile_path
+
+Uso:
+    python -m benchmarks.bench_compile_path [numero_item]
+"""
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from amazon_paapi.sdk.api_client import ApiClient
+
+from amazon import product_parser
+from amazon.product_parser import _build_product, parse_product, safe_get
+from benchmarks.bench_parse import make_items
+
+
+def parse_product_safe_get(item, associate_tag):
+    """parse_product come prima di compile_path: safe_get ad ogni accesso"""
+    asin = safe_get(item, 'asin', default='')
+    listing = safe_get(item, 'offers', 'listings')
+    first_listing = listing[0] if listing and len(listing) > 0 else None
+    return _build_product(
+        associate_tag,
+        asin,
+        safe_get(item, 'item_info', 'title', 'display_value', default='Titolo non disponibile'),
+        safe_get(item, 'detail_page_url', default=''),
+        safe_get(item, 'images', 'primary', 'large', 'url', default='/static/images/placeholder.png'),
+        safe_get(item, 'item_info', 'by_line_info', 'brand', 'display_value', default='Sconosciuto'),
+        first_listing,
+        safe_get(first_listing, 'price', 'amount'),
+        safe_get(first_listing, 'price', 'display_amount'),
+        safe_get(first_listing, 'saving_basis', 'amount'),
+        safe_get(first_listing, 'saving_basis', 'display_amount'),
+        safe_get(first_listing, 'program_eligibility', 'is_prime_exclusive', default=False),
+        safe_get(item, 'customer_reviews', 'star_rating', 'value'),
+        safe_get(item, 'customer_reviews', 'count', default=0),
+        safe_get(item, 'item_info', 'features', 'display_values')
+    )
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(count=10000):
+    body = json.dumps({'SearchResult': {'Items': make_items(count)}})
+    sdk_client = ApiClient('key', 'secret', 'webservices.amazon.it', 'eu-west-1')
+    models = sdk_client.deserialize(SimpleNamespace(data=body), 'SearchItemsResponse').search_result.items
+    sdk_client.pool.close()
+    sdk_client.pool.join()
+
+    assert [parse_product(item, 'tag') for item in models] == \
+        [parse_product_safe_get(item, 'tag') for item in models]
+
+    title = product_parser._TITLE
+    keys = title.keys
+
+    print(f"{count} item (modelli SDK), migliore di 5")
+    old = best_of(lambda: [safe_get(item, *keys) for item in models])
+    new = best_of(lambda: [title(item) for item in models])
+    print(f"accessor titolo   safe_get {old * 1e6 / count:6.2f} µs  "
+          f"compile_path {new * 1e6 / count:6.2f} µs  ({old / new:.1f}x)")
+
+    old = best_of(lambda: [parse_product_safe_get(item, 'tag') for item in models])
+    new = best_of(lambda: [parse_product(item, 'tag') for item in models])
+    print(f"parse_product     safe_get {old * 1e6 / count:6.2f} µs  "
+          f"compile_path {new * 1e6 / count:6.2f} µs  ({old / new:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,101 @@
+"""
+Benchmark del classificatore di URL compilato contro urlparse + ricerca lineare
+
+Corpus misto: link prodotto di tutti i formati, link brevi, domini
+simili ad Amazon (da rifiutare) e URL non Amazon.
+
+Uso:
+    python -m benchmarks.bench_link_classifier [numero_url]
+"""
+import random
+import sys
+import time
+from urllib.parse import parse_qs, urlparse
+
+from amazon.link_generator import classify_url, extract_asin_from_url, is_amazon_url
+
+LEGACY_DOMAINS = [
+    'amazon.it', 'amazon.com', 'amazon.co.uk', 'amazon.de',
+    'amazon.fr', 'amazon.es', 'amzn.to', 'amzn.eu'
+]
+
+TEMPLATES = [
+    ('https://www.amazon.it/dp/{asin}?tag=vecchio-21', True),
+    ('https://www.amazon.de/Kopfhoerer-Bluetooth/dp/{asin}/ref=sr_1_3?keywords=x', True),
+    ('https://www.amazon.co.uk/gp/product/{asin}?psc=1', True),
+    ('https://www.amazon.com/gp/aw/d/{asin}', True),
+    ('https://www.amazon.co.jp/exec/obidos/ASIN/{asin}/', True),
+    ('https://smile.amazon.com/s?k=cuffie&asin={asin}', True),
+    ('https://amzn.to/3xYz{short}', True),
+    ('https://evil-amazon.it.example.com/dp/{asin}', False),
+    ('https://www.amazon.it.phishing.net/dp/{asin}', False),
+    ('https://amazon.com.evil.org/gp/product/{asin}', False),
+    ('https://notamazon.de/dp/{asin}', False),
+    ('https://www.google.com/search?q={asin}', False),
+]
+
+
+def legacy_is_amazon_url(url):
+    """is_amazon_url originale: sottostringa su otto domini"""
+    parsed = urlparse(url)
+    return any(domain in parsed.netloc for domain in LEGACY_DOMAINS)
+
+
+def legacy_extract_asin_from_url(url):
+    """extract_asin_from_url originale: urlparse, split e list.index"""
+    parsed = urlparse(url)
+    path_parts = parsed.path.split('/')
+    try:
+        if 'dp' in path_parts:
+            return path_parts[path_parts.index('dp') + 1]
+        elif 'product' in path_parts:
+            return path_parts[path_parts.index('product') + 1]
+    except (IndexError, ValueError):
+        pass
+    params = parse_qs(parsed.query)
+    if 'asin' in params:
+        return params['asin'][0]
+    return None
+
+
+def make_corpus(count, seed=0):
+    """Lista di (url, è_amazon) con ASIN casuali"""
+    rng = random.Random(seed)
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+    corpus = []
+    for _ in range(count):
+        template, expected = rng.choice(TEMPLATES)
+        asin = 'B0' + ''.join(rng.choices(alphabet, k=8))
+        corpus.append((template.format(asin=asin, short=asin[:3]), expected))
+    return corpus
+
+
+def run(label, is_amazon, extract, corpus):
+    start = time.perf_counter()
+    accepted = 0
+    lookalikes = 0
+    for url, expected in corpus:
+        if is_amazon(url):
+            accepted += 1
+            extract(url)
+            if not expected:
+                lookalikes += 1
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {len(corpus) / elapsed:>12,.0f} URL/s   "
+          f"accettate {accepted:>9,}   domini simili accettati {lookalikes:>9,}")
+
+
+def main(count=1_000_000):
+    corpus = make_corpus(count)
+    print(f"{count:,} URL")
+    run('urlparse', legacy_is_amazon_url, legacy_extract_asin_from_url, corpus)
+    run('compilato', is_amazon_url, extract_asin_from_url, corpus)
+
+    start = time.perf_counter()
+    for url, _ in corpus:
+        classify_url(url)
+    print(f"{'classify_url':<12} {count / (time.perf_counter() - start):>12,.0f} URL/s")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
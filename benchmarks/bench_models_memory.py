@@ -0,0 +1,57 @@
+"""
+Memoria per prodotto: dict annidati (formato storico) vs Product/Price/Rating slotted
+
+Uso:
+    python -m benchmarks.bench_models_memory [numero_item]
+"""
+import json
+import sys
+import tracemalloc
+
+from amazon.product_parser import parse_product_raw
+from benchmarks.bench_parse import make_items
+
+
+def as_nested_dict(product):
+    """Formato storico di parse_product (dict nuovi, non la cache di to_dict)"""
+    return {
+        'asin': product.asin,
+        'title': product.title,
+        'url': product.url,
+        'image_url': product.image_url,
+        'brand': product.brand,
+        'price': product.price.to_dict(),
+        'is_prime': product.is_prime,
+        'rating': product.rating.to_dict(),
+        'features': list(product.features)
+    }
+
+
+def measure(build):
+    """Byte allocati (e ancora vivi) da build()"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main(count=10000):
+    # Stringhe condivise: si misura solo il costo dei contenitori
+    raw_items = json.loads(json.dumps(make_items(count)))
+    products = [parse_product_raw(item, 'tag-21') for item in raw_items]
+
+    dict_bytes, _ = measure(lambda: [as_nested_dict(p) for p in products])
+    slot_bytes, _ = measure(lambda: [parse_product_raw(item, 'tag-21') for item in raw_items])
+    cached_bytes, _ = measure(lambda: [p.to_dict() for p in products])
+
+    print(f"{count} prodotti")
+    print(f"dict annidati        {dict_bytes / count:7.0f} B/prodotto")
+    print(f"Product slotted      {slot_bytes / count:7.0f} B/prodotto "
+          f"(-{(1 - slot_bytes / dict_bytes) * 100:.0f}%)")
+    print(f"+ to_dict() in cache {cached_bytes / count:7.0f} B/prodotto (solo se serializzato)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,76 @@
+"""
+Benchmark del parsing prodotti: modelli SDK + parse_product vs JSON grezzo + parse_product_raw
+
+Uso:
+    python -m benchmarks.bench_parse [numero_item]
+"""
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from amazon_paapi.sdk.api_client import ApiClient
+
+from amazon.product_parser import parse_product, parse_product_raw
+
+
+def make_items(count):
+    """Item sintetici con tutte le resources richieste dal client"""
+    return [
+        {
+            'ASIN': f"B{i:09d}",
+            'DetailPageURL': f"https://www.amazon.it/dp/B{i:09d}?tag=tag-21",
+            'Images': {'Primary': {'Large': {'URL': f"https://m.media-amazon.com/images/I/{i}.jpg"}}},
+            'ItemInfo': {
+                'Title': {'DisplayValue': f"Prodotto di test numero {i}"},
+                'ByLineInfo': {'Brand': {'DisplayValue': 'Marca'}},
+                'Features': {'DisplayValues': [f"Caratteristica {n}" for n in range(6)]},
+            },
+            'Offers': {'Listings': [{
+                'Price': {'Amount': 49.99, 'DisplayAmount': '€ 49,99'},
+                'SavingBasis': {'Amount': 69.99, 'DisplayAmount': '€ 69,99'},
+                'ProgramEligibility': {'IsPrimeExclusive': i % 2 == 0},
+            }]},
+            'CustomerReviews': {'StarRating': {'Value': 4.4}, 'Count': 1000 + i},
+        }
+        for i in range(count)
+    ]
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed * 1e6 / count:8.2f} µs/item")
+    return elapsed
+
+
+def main(count=2000):
+    body = json.dumps({'SearchResult': {'Items': make_items(count)}})
+    sdk_client = ApiClient('key', 'secret', 'webservices.amazon.it', 'eu-west-1')
+
+    def deserialize():
+        response = SimpleNamespace(data=body)
+        return sdk_client.deserialize(response, 'SearchItemsResponse').search_result.items
+
+    models = deserialize()
+    raw_items = json.loads(body)['SearchResult']['Items']
+
+    print(f"{count} item")
+    sdk_total = timed("SDK: deserializzazione modelli + parse_product", count,
+                      lambda: [parse_product(item, 'tag-21') for item in deserialize()])
+    timed("SDK: solo parse_product sui modelli", count,
+          lambda: [parse_product(item, 'tag-21') for item in models])
+    raw_total = timed("Raw: json.loads + parse_product_raw", count,
+                      lambda: [parse_product_raw(item, 'tag-21')
+                               for item in json.loads(body)['SearchResult']['Items']])
+    timed("Raw: solo parse_product_raw", count,
+          lambda: [parse_product_raw(item, 'tag-21') for item in raw_items])
+    print(f"Speedup end-to-end: {sdk_total / raw_total:.1f}x")
+
+    sdk_client.pool.close()
+    sdk_client.pool.join()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,50 @@
+"""
+Benchmark delle query vettoriali dello storico prezzi (punteggio offerte)
+
+Uso:
+    python -m benchmarks.bench_price_history [numero_asin]
+"""
+import sys
+import time
+
+import numpy as np
+
+from amazon.price_history import DAY, PriceHistory
+
+
+def make_history(count, changes=20, now=1_000 * DAY):
+    """Storico con `changes` cambi di prezzo per ASIN negli ultimi 40 giorni"""
+    history = PriceHistory(initial_rows=count, clock=lambda: now)
+    rng = np.random.default_rng(0)
+    prices = rng.integers(1000, 20000, (count, changes), dtype=np.int32)
+    offsets = np.sort(rng.integers(0, 40 * DAY, (count, changes)), axis=1)
+
+    start = time.perf_counter()
+    for row in range(count):
+        asin = f"B{row:09d}"
+        for cents, offset in zip(prices[row].tolist(), offsets[row].tolist()):
+            history.record(asin, cents, now - 40 * DAY + offset)
+    elapsed = time.perf_counter() - start
+    print(f"record: {count * changes / elapsed:,.0f} osservazioni/s")
+    return history
+
+
+def timed(label, fn, repeat=5):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"{label:<28} {(time.perf_counter() - start) / repeat * 1000:8.1f} ms")
+
+
+def main(count=100_000):
+    history = make_history(count)
+    print(f"{count} ASIN, {history.stats()['bytes'] / 2**20:.1f} MiB")
+    timed("minimo a 30 giorni", history.lowest)
+    timed("% sotto mediana 30 giorni", history.below_median)
+    timed("ribasso dall'ultimo prezzo", history.price_drop)
+    timed("deals (top 50)", history.deals)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,51 @@
+"""
+Benchmark dei filtri e ordinamenti vettoriali su insiemi di prodotti
+
+Uso:
+    python -m benchmarks.bench_product_table [numero_prodotti]
+"""
+import sys
+import time
+
+import numpy as np
+
+from amazon.product_table import ProductTable
+
+
+def make_table(count):
+    """Tabella con colonne casuali (i prodotti sono gli indici di riga)"""
+    rng = np.random.default_rng(0)
+    return ProductTable.from_columns(
+        range(count),
+        price_cents=rng.integers(-1, 50_000, count),
+        discount=rng.integers(0, 70, count),
+        stars=rng.integers(10, 51, count),
+        reviews=rng.integers(0, 10_000, count),
+        is_prime=rng.random(count) < 0.5
+    )
+
+
+def timed(label, fn, repeat=5):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"{label:<36} {(time.perf_counter() - start) / repeat * 1000:8.1f} ms")
+
+
+def main(count=1_000_000):
+    table = make_table(count)
+    print(f"{count} prodotti")
+    timed("nessun filtro, rilevanza", lambda: table.select(limit=50))
+    timed("prime + sconto", lambda: table.select(prime_only=True, discount_only=True))
+    timed("prezzo max + stelle, prezzo crescente",
+          lambda: table.select(max_price=100, min_rating=4, sort='price-asc'))
+    timed("tutti i filtri, top 50 per sconto", lambda: table.select(
+        max_price=200, prime_only=True, min_discount=10, min_rating=4,
+        min_reviews=100, sort='discount', limit=50
+    ))
+    timed("ordinamento completo per valutazione", lambda: table.select(sort='rating'))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
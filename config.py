@@ -2,6 +2,7 @@
 Configurazione centralizzata per Amazon Prime Day Affiliate Finder
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,13 +20,102 @@ class Config:
     ASSOCIATE_TAG = os.getenv('AMAZON_ASSOCIATE_TAG')
     REGION = os.getenv('AMAZON_REGION', 'eu-west-1')
     MARKETPLACE = os.getenv('AMAZON_MARKETPLACE', 'www.amazon.it')
+    PAAPI_MAX_WORKERS = int(os.getenv('PAAPI_MAX_WORKERS', 4))
+    # Pool di connessioni keep-alive verso PA-API (client sincrono)
+    PAAPI_POOL_SIZE = int(os.getenv('PAAPI_POOL_SIZE', 10))
+    PAAPI_CONNECT_TIMEOUT = float(os.getenv('PAAPI_CONNECT_TIMEOUT', 3.05))
+    PAAPI_READ_TIMEOUT = float(os.getenv('PAAPI_READ_TIMEOUT', 10.0))
+    # Firma locale e parsing del JSON grezzo invece dei modelli SDK
+    PAAPI_RAW_JSON = os.getenv('PAAPI_RAW_JSON', 'False').lower() == 'true'
+    # Client asincrono (/api/async/*): connessioni HTTP e timeout verso PA-API
+    PAAPI_ASYNC_MAX_CONNECTIONS = int(os.getenv('PAAPI_ASYNC_MAX_CONNECTIONS', 100))
+    PAAPI_ASYNC_TIMEOUT = float(os.getenv('PAAPI_ASYNC_TIMEOUT', 10.0))
 
-    # Cache
-    CACHE_TYPE = os.getenv('CACHE_TYPE', 'simple')
-    CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))
+    # Rate limit PA-API (token bucket con priorità)
+    PAAPI_TPS = float(os.getenv('PAAPI_TPS', 1.0))
+    PAAPI_BURST = int(os.getenv('PAAPI_BURST', 1))
+    PAAPI_TPD = int(os.getenv('PAAPI_TPD', 8640))
+    # Attesa massima per un token (secondi) per classe di priorità
+    RATE_LIMIT_INTERACTIVE_WAIT = float(os.getenv('RATE_LIMIT_INTERACTIVE_WAIT', 2.0))
+    RATE_LIMIT_BACKGROUND_WAIT = float(os.getenv('RATE_LIMIT_BACKGROUND_WAIT', 30.0))
+    RATE_LIMIT_BULK_WAIT = float(os.getenv('RATE_LIMIT_BULK_WAIT', 300.0))
+    # Stato dei token: 'sqlite' (condiviso tra worker gunicorn) o 'memory' (per processo)
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'sqlite')
+    RATE_LIMIT_SQLITE_PATH = os.getenv(
+        'RATE_LIMIT_SQLITE_PATH',
+        os.path.join(tempfile.gettempdir(), 'paapi_quota.sqlite3')
+    )
+
+    # Micro-batching dei lookup singoli GetItems (0 = disattivato)
+    ITEM_BATCH_WINDOW_MS = int(os.getenv('ITEM_BATCH_WINDOW_MS', 5))
+    ITEM_BATCH_MAX_SIZE = int(os.getenv('ITEM_BATCH_MAX_SIZE', 10))
+
+    # Catalogo prodotti locale (SQLite): ogni risposta PA-API viene salvata e i
+    # lookup più recenti di CATALOG_MAX_AGE secondi sono serviti dal catalogo
+    CATALOG_ENABLED = os.getenv('CATALOG_ENABLED', 'True').lower() == 'true'
+    CATALOG_PATH = os.getenv(
+        'CATALOG_PATH',
+        os.path.join(tempfile.gettempdir(), 'paapi_catalog.sqlite3')
+    )
+    CATALOG_MAX_AGE = int(os.getenv('CATALOG_MAX_AGE', 3600))
+    # Connessioni SQLite condivise tra i thread del processo
+    CATALOG_POOL_SIZE = int(os.getenv('CATALOG_POOL_SIZE', 4))
+
+    # Storico prezzi in memoria: cambi di prezzo conservati per ASIN
+    PRICE_HISTORY_ENABLED = os.getenv('PRICE_HISTORY_ENABLED', 'True').lower() == 'true'
+    PRICE_HISTORY_CAPACITY = int(os.getenv('PRICE_HISTORY_CAPACITY', 32))
+
+    # Indice invertito locale: /search risponde senza PA-API se una ricerca più
+    # generica è stata fatta negli ultimi SEARCH_INDEX_MAX_AGE secondi
+    SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'True').lower() == 'true'
+    SEARCH_INDEX_MAX_AGE = int(os.getenv('SEARCH_INDEX_MAX_AGE', 900))
+    SEARCH_INDEX_MAX_DOCUMENTS = int(os.getenv('SEARCH_INDEX_MAX_DOCUMENTS', 50000))
+
+    # Risoluzione dei link brevi (amzn.to, amzn.eu) in /api/links/bulk?resolve=true:
+    # cache LRU in memoria + SQLite, link morti ricordati per SHORT_LINK_NEGATIVE_TTL
+    SHORT_LINK_CACHE_PATH = os.getenv(
+        'SHORT_LINK_CACHE_PATH',
+        os.path.join(tempfile.gettempdir(), 'short_links.sqlite3')
+    )
+    SHORT_LINK_CACHE_MAX_ENTRIES = int(os.getenv('SHORT_LINK_CACHE_MAX_ENTRIES', 10000))
+    SHORT_LINK_TTL = int(os.getenv('SHORT_LINK_TTL', 30 * 86400))
+    SHORT_LINK_NEGATIVE_TTL = int(os.getenv('SHORT_LINK_NEGATIVE_TTL', 86400))
+    SHORT_LINK_TIMEOUT = float(os.getenv('SHORT_LINK_TIMEOUT', 5.0))
+    SHORT_LINK_MAX_WORKERS = int(os.getenv('SHORT_LINK_MAX_WORKERS', 8))
+
+    # Cache risultati ricerca (stale-while-revalidate)
+    SEARCH_CACHE_ENABLED = os.getenv('SEARCH_CACHE_ENABLED', 'True').lower() == 'true'
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 300))
+    SEARCH_CACHE_STALE_TTL = int(os.getenv('SEARCH_CACHE_STALE_TTL', 600))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 1000))
+
+    # Cache HTML delle card prodotto di results.html (per ASIN e campi mostrati)
+    CARD_CACHE_ENABLED = os.getenv('CARD_CACHE_ENABLED', 'True').lower() == 'true'
+    CARD_CACHE_MAX_ENTRIES = int(os.getenv('CARD_CACHE_MAX_ENTRIES', 5000))
 
     # Paginazione
     ITEMS_PER_PAGE = 10
+    # Pagine PA-API (ItemPage) richieste in parallelo per ricerca
+    SEARCH_PAGES = int(os.getenv('SEARCH_PAGES', 1))
+    SEARCH_MAX_PAGES = int(os.getenv('SEARCH_MAX_PAGES', 5))
+    # Pagine massime per categoria in /api/export (PA-API ne restituisce al massimo 10)
+    EXPORT_MAX_PAGES = int(os.getenv('EXPORT_MAX_PAGES', 10))
+    # Secondi massimi per un export (chiamate con priorità bulk, in coda alle ricerche)
+    EXPORT_TIMEOUT = float(os.getenv('EXPORT_TIMEOUT', 300))
+
+    # Ricerca su più categorie in parallelo
+    FANOUT_TIMEOUT = float(os.getenv('FANOUT_TIMEOUT', 3.0))
+    FANOUT_SCORING = os.getenv('FANOUT_SCORING', 'rank')
+
+    # Profilo di resources PA-API di default per /api/search (card, detail, price-refresh)
+    API_SEARCH_PROFILE = os.getenv('API_SEARCH_PROFILE', 'card')
+
+    # Paginazione di /api/search: prodotti per pagina (default e massimo) e
+    # secondi in cui il risultato ordinato resta paginabile con ?cursor=
+    API_SEARCH_PAGE_SIZE = int(os.getenv('API_SEARCH_PAGE_SIZE', 20))
+    API_SEARCH_MAX_PAGE_SIZE = int(os.getenv('API_SEARCH_MAX_PAGE_SIZE', 100))
+    RESULT_SET_TTL = int(os.getenv('RESULT_SET_TTL', 300))
+    RESULT_SET_MAX_ENTRIES = int(os.getenv('RESULT_SET_MAX_ENTRIES', 200))
 
     # Categorie supportate Amazon
     CATEGORIES = {
@@ -0,0 +1,92 @@
+"""
+Route link affiliati
+"""
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from amazon.bulk_links import BulkStats, chunked, read_urls, rewrite_links, to_csv, to_ndjson
+from amazon.short_links import ShortLinkResolver
+from config import Config
+import logging
+
+links_bp = Blueprint('links', __name__)
+logger = logging.getLogger(__name__)
+
+
+def get_short_link_resolver():
+    """Ottieni il resolver dei link brevi (cached nell'app context)"""
+    if not hasattr(current_app, 'short_link_resolver'):
+        current_app.short_link_resolver = ShortLinkResolver(
+            cache_path=Config.SHORT_LINK_CACHE_PATH,
+            max_entries=Config.SHORT_LINK_CACHE_MAX_ENTRIES,
+            ttl=Config.SHORT_LINK_TTL,
+            negative_ttl=Config.SHORT_LINK_NEGATIVE_TTL,
+            timeout=Config.SHORT_LINK_TIMEOUT,
+            max_workers=Config.SHORT_LINK_MAX_WORKERS
+        )
+    return current_app.short_link_resolver
+
+
+@links_bp.route('/api/links/bulk', methods=['POST'])
+def api_links_bulk():
+    """
+    Riscrive in blocco i link Amazon con il tag affiliato
+
+    Body: una URL per riga (text/plain) o CSV (text/csv o ?format=csv,
+    colonna scelta con ?column=). Tag: ?tag= (default ASSOCIATE_TAG).
+    Con ?resolve=true i link brevi sono sostituiti dall'URL del marketplace
+    e taggati; senza restano invariati (contati come 'unresolved').
+    Risposta in streaming: JSON Lines con riepilogo finale (URL/secondo),
+    o CSV con ?output=csv. Input e output non sono mai caricati interi
+    in memoria.
+    """
+    associate_tag = request.args.get('tag') or Config.ASSOCIATE_TAG
+    if not associate_tag:
+        return jsonify({
+            'success': False,
+            'error': 'Tag affiliato mancante'
+        }), 400
+
+    input_format = request.args.get('format')
+    if input_format is None:
+        input_format = 'csv' if request.mimetype == 'text/csv' else 'lines'
+    if input_format not in ('lines', 'csv'):
+        return jsonify({
+            'success': False,
+            'error': f"Formato non supportato: {input_format}"
+        }), 400
+
+    output = request.args.get('output', 'ndjson')
+    if output not in ('ndjson', 'csv'):
+        return jsonify({
+            'success': False,
+            'error': f"Output non supportato: {output}"
+        }), 400
+
+    column = request.args.get('column')
+    if column is not None and column.isdigit():
+        column = int(column)
+
+    stats = BulkStats()
+    lines = (line.decode('utf-8', errors='replace') for line in request.stream)
+    resolver = get_short_link_resolver() if request.args.get('resolve') == 'true' else None
+    results = rewrite_links(
+        read_urls(lines, input_format, column), associate_tag, stats, resolver=resolver
+    )
+
+    def generate():
+        try:
+            body = to_csv(results) if output == 'csv' else to_ndjson(results, stats)
+            yield from chunked(body)
+        except Exception as e:
+            logger.error(f"Errore nella riscrittura link in blocco: {str(e)}")
+            raise
+        summary = stats.summary()
+        logger.info(
+            f"Link in blocco: {summary['urls']} URL, {summary['tagged']} taggate, "
+            f"{summary['urls_per_second']} URL/s"
+        )
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv' if output == 'csv' else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
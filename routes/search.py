@@ -1,10 +1,32 @@
 """
 Route ricerca prodotti
 """
-from flask import Blueprint, render_template, request, jsonify, current_app
-from amazon.api_client import AmazonClient
+from flask import Blueprint, Response, render_template, request, jsonify, current_app, stream_with_context
+from werkzeug.datastructures import MultiDict
+from amazon.api_client import RESOURCE_PROFILES, AmazonClient
+from amazon.async_client import AsyncAmazonClient, EventLoopThread
+from amazon.cache import SearchCache
+from amazon.catalog import ProductCatalog
+from amazon.export import EXPORT_FORMATS, iter_csv, iter_jsonl
+from amazon.price_history import PriceHistory
+from amazon.product_table import SORT_KEYS
+from amazon.ranking import SCORING
+from amazon.rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    SQLiteQuotaBackend,
+    TokenBucket,
+)
+from amazon.result_sets import ResultSetCache, decode_cursor, encode_cursor
+from amazon.search_index import SearchIndex
+from amazon.transport import PooledTransport
 from config import Config
+import itertools
 import logging
+import os
+import time
+from urllib.parse import urlencode
 
 search_bp = Blueprint('search', __name__)
 logger = logging.getLogger(__name__)
@@ -13,16 +35,120 @@ logger = logging.getLogger(__name__)
 def get_amazon_client():
     """Ottieni istanza client Amazon (cached nell'app context)"""
     if not hasattr(current_app, 'amazon_client'):
+        cache = None
+        if Config.SEARCH_CACHE_ENABLED:
+            cache = SearchCache(
+                ttl=Config.SEARCH_CACHE_TTL,
+                stale_ttl=Config.SEARCH_CACHE_STALE_TTL,
+                max_entries=Config.SEARCH_CACHE_MAX_ENTRIES
+            )
+
+        # Quota condivisa tra i worker gunicorn dello stesso host
+        quota_backend = None
+        if Config.RATE_LIMIT_BACKEND == 'sqlite':
+            quota_backend = SQLiteQuotaBackend(Config.RATE_LIMIT_SQLITE_PATH)
+
+        limiter = TokenBucket(
+            rate=Config.PAAPI_TPS,
+            burst=Config.PAAPI_BURST,
+            daily_quota=Config.PAAPI_TPD,
+            timeouts={
+                PRIORITY_INTERACTIVE: Config.RATE_LIMIT_INTERACTIVE_WAIT,
+                PRIORITY_BACKGROUND: Config.RATE_LIMIT_BACKGROUND_WAIT,
+                PRIORITY_BULK: Config.RATE_LIMIT_BULK_WAIT,
+            },
+            backend=quota_backend
+        )
+
+        catalog = None
+        if Config.CATALOG_ENABLED:
+            catalog = ProductCatalog(
+                Config.CATALOG_PATH,
+                max_age=Config.CATALOG_MAX_AGE,
+                pool_size=Config.CATALOG_POOL_SIZE
+            )
+
+        price_history = None
+        if Config.PRICE_HISTORY_ENABLED:
+            price_history = PriceHistory(capacity=Config.PRICE_HISTORY_CAPACITY)
+
+        search_index = None
+        if Config.SEARCH_INDEX_ENABLED:
+            search_index = SearchIndex(
+                max_age=Config.SEARCH_INDEX_MAX_AGE,
+                max_documents=Config.SEARCH_INDEX_MAX_DOCUMENTS
+            )
+
         current_app.amazon_client = AmazonClient(
             access_key=Config.AWS_ACCESS_KEY,
             secret_key=Config.AWS_SECRET_KEY,
             associate_tag=Config.ASSOCIATE_TAG,
             region=Config.REGION,
-            marketplace=Config.MARKETPLACE
+            marketplace=Config.MARKETPLACE,
+            cache=cache,
+            max_workers=Config.PAAPI_MAX_WORKERS,
+            batch_window=Config.ITEM_BATCH_WINDOW_MS / 1000,
+            batch_max_size=Config.ITEM_BATCH_MAX_SIZE,
+            limiter=limiter,
+            transport=PooledTransport(
+                pool_size=Config.PAAPI_POOL_SIZE,
+                connect_timeout=Config.PAAPI_CONNECT_TIMEOUT,
+                read_timeout=Config.PAAPI_READ_TIMEOUT
+            ),
+            raw_json=Config.PAAPI_RAW_JSON,
+            catalog=catalog,
+            price_history=price_history,
+            search_index=search_index
         )
     return current_app.amazon_client
 
 
+def get_async_amazon_client():
+    """
+    Ottieni client Amazon asincrono e loop su cui eseguirlo (cached nell'app context)
+
+    Cache, rate limiter, catalogo, storico prezzi e indice di ricerca sono
+    condivisi con il client sincrono.
+
+    Returns:
+        tuple: (AsyncAmazonClient, EventLoopThread)
+    """
+    if not hasattr(current_app, 'async_amazon_client'):
+        client = get_amazon_client()
+        current_app.async_amazon_loop = EventLoopThread()
+        current_app.async_amazon_client = AsyncAmazonClient(
+            access_key=Config.AWS_ACCESS_KEY,
+            secret_key=Config.AWS_SECRET_KEY,
+            associate_tag=Config.ASSOCIATE_TAG,
+            region=Config.REGION,
+            marketplace=Config.MARKETPLACE,
+            cache=client.cache,
+            limiter=client.limiter,
+            catalog=client.catalog,
+            price_history=client.price_history,
+            search_index=client.search_index,
+            timeout=Config.PAAPI_ASYNC_TIMEOUT,
+            max_connections=Config.PAAPI_ASYNC_MAX_CONNECTIONS
+        )
+    return current_app.async_amazon_client, current_app.async_amazon_loop
+
+
+def export_query(search_params):
+    """Query string di /api/export per i parametri di una ricerca di /search"""
+    query = {
+        'keywords': search_params['keywords'],
+        'category': search_params['category'],
+        'pages': search_params['pages']
+    }
+    if search_params['max_price']:
+        query['max_price'] = search_params['max_price']
+    if search_params['prime_only']:
+        query['prime_only'] = 'true'
+    if search_params['discount_only']:
+        query['discount_only'] = 'true'
+    return urlencode(query)
+
+
 @search_bp.route('/search', methods=['GET', 'POST'])
 def search():
     """Endpoint ricerca prodotti"""
@@ -34,12 +160,16 @@ def search():
         category = request.form.get('category', 'All')
         prime_only = request.form.get('prime_only') == 'on'
         discount_only = request.form.get('discount_only') == 'on'
+        pages = request.form.get('pages', Config.SEARCH_PAGES, type=int)
     else:
         keywords = request.args.get('keywords', '').strip()
         max_price = request.args.get('max_price', type=float)
         category = request.args.get('category', 'All')
         prime_only = request.args.get('prime_only') == 'true'
         discount_only = request.args.get('discount_only') == 'true'
+        pages = request.args.get('pages', Config.SEARCH_PAGES, type=int)
+
+    pages = max(1, min(pages, Config.SEARCH_MAX_PAGES))
 
     # Validazione
     if not keywords:
@@ -56,20 +186,47 @@ def search():
         'max_price': max_price,
         'category': category,
         'prime_only': prime_only,
-        'discount_only': discount_only
+        'discount_only': discount_only,
+        'pages': pages
     }
 
-    # Esegui ricerca
+    # Esegui ricerca: indice locale se la query è coperta, altrimenti PA-API
     try:
         client = get_amazon_client()
-        result = client.search_items(
-            keywords=keywords,
-            max_price=max_price,
-            category=category,
-            item_count=Config.ITEMS_PER_PAGE,
-            prime_only=prime_only,
-            discount_only=discount_only
-        )
+        result = None
+        if client.search_index is not None:
+            result = client.search_index.search(
+                keywords,
+                category=category,
+                max_price=max_price,
+                prime_only=prime_only,
+                discount_only=discount_only,
+                limit=Config.ITEMS_PER_PAGE * pages
+            )
+
+        # Più pagine PA-API: la griglia è riempita dal browser con
+        # /api/search/stream (stessi parametri dell'export) man mano che
+        # le pagine arrivano, invece di attenderle tutte qui
+        if result is None and pages > 1:
+            return render_template(
+                'results.html',
+                products=[],
+                search_params=search_params,
+                stream_query=export_query(search_params),
+                export_query=export_query(search_params),
+                categories=Config.CATEGORIES
+            )
+
+        if result is None:
+            result = client.search_items(
+                keywords=keywords,
+                max_price=max_price,
+                category=category,
+                item_count=Config.ITEMS_PER_PAGE,
+                prime_only=prime_only,
+                discount_only=discount_only,
+                pages=pages
+            )
 
         # Gestisci errore API
         if result['error']:
@@ -80,12 +237,13 @@ def search():
                 search_params=search_params
             )
 
-        # Renderizza risultati
+        # Renderizza risultati (export_query: parametri per /api/export)
         return render_template(
             'results.html',
             products=result['products'],
             count=result['count'],
             search_params=search_params,
+            export_query=export_query(search_params),
             categories=Config.CATEGORIES
         )
 
@@ -99,43 +257,454 @@ def search():
         )
 
 
+# Parametri di /api/search salvati nel cursore (limit può essere cambiato a ogni pagina)
+CURSOR_QUERY_ARGS = (
+    'keywords', 'category', 'categories', 'scoring', 'profile', 'max_price',
+    'prime_only', 'discount_only', 'pages', 'sort', 'min_rating', 'limit'
+)
+
+
+def get_result_sets():
+    """Ottieni la cache dei risultati ordinati di /api/search (cached nell'app context)"""
+    if not hasattr(current_app, 'result_sets'):
+        current_app.result_sets = ResultSetCache(
+            ttl=Config.RESULT_SET_TTL,
+            max_entries=Config.RESULT_SET_MAX_ENTRIES
+        )
+    return current_app.result_sets
+
+
+def bad_request(error):
+    """Risposta 400 di /api/search"""
+    return jsonify({
+        'success': False,
+        'error': error
+    }), 400
+
+
+def parse_api_search_args(max_pages=None):
+    """
+    Legge e valida i parametri di /api/search
+
+    Con ?cursor= i parametri della ricerca sono quelli salvati nel cursore.
+
+    Args:
+        max_pages: Pagine massime per ricerca (default: Config.SEARCH_MAX_PAGES)
+
+    Returns:
+        tuple: (params, None) con params = {'keywords', 'category', 'categories',
+            'scoring', 'filters', 'page'}, oppure (None, risposta di errore 400);
+            filters include il profilo di resources PA-API ('profile'),
+            page = {'sort', 'min_rating', 'limit', 'offset', 'after', 'query'}
+    """
+    args, offset, after = request.args, 0, None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            query, offset, after = decode_cursor(cursor)
+        except ValueError as e:
+            return None, bad_request(str(e))
+        args = MultiDict(query)
+
+    keywords = args.get('keywords', '').strip()
+
+    if not keywords:
+        return None, bad_request('Keywords mancanti')
+
+    pages = args.get('pages', Config.SEARCH_PAGES, type=int)
+    pages = max(1, min(pages, max_pages or Config.SEARCH_MAX_PAGES))
+    filters = {
+        'max_price': args.get('max_price', type=float),
+        'prime_only': args.get('prime_only') == 'true',
+        'discount_only': args.get('discount_only') == 'true',
+        'pages': pages
+    }
+
+    # Ricerca su più categorie: ?categories=Electronics,Computers
+    categories = [
+        category.strip()
+        for category in args.get('categories', '').split(',')
+        if category.strip()
+    ]
+    invalid = [c for c in categories if c not in Config.CATEGORIES or c == 'All']
+    if invalid:
+        return None, bad_request(f"Categorie non supportate: {', '.join(invalid)}")
+
+    scoring = args.get('scoring', Config.FANOUT_SCORING)
+    if scoring not in SCORING:
+        return None, bad_request(f"Scoring non supportato: {scoring}")
+
+    # Campi PA-API richiesti: ?profile=card|detail|price-refresh
+    profile = args.get('profile', Config.API_SEARCH_PROFILE)
+    if profile not in RESOURCE_PROFILES:
+        return None, bad_request(f"Profilo non supportato: {profile}")
+    filters['profile'] = profile
+
+    # Ordinamento e filtri applicati lato server: ?sort=price-asc&min_rating=4
+    sort = args.get('sort', 'relevance')
+    if sort not in SORT_KEYS:
+        return None, bad_request(f"Ordinamento non supportato: {sort}")
+
+    limit = args.get('limit', Config.API_SEARCH_PAGE_SIZE, type=int)
+    if 'limit' in request.args:
+        limit = request.args.get('limit', type=int)
+    if limit is None or limit < 1:
+        return None, bad_request("Limit non valido")
+
+    page = {
+        'sort': sort,
+        'min_rating': args.get('min_rating', type=float),
+        'limit': min(limit, Config.API_SEARCH_MAX_PAGE_SIZE),
+        'offset': offset,
+        'after': after,
+        'query': {name: args[name] for name in CURSOR_QUERY_ARGS if name in args}
+    }
+    page['query']['limit'] = str(page['limit'])
+
+    return {
+        'keywords': keywords,
+        'category': args.get('category', 'All'),
+        'categories': categories,
+        'scoring': scoring,
+        'filters': filters,
+        'page': page
+    }, None
+
+
+def result_set_key(params):
+    """Chiave del risultato ordinato: ricerca, filtri, ordinamento (non la pagina)"""
+    return (
+        ' '.join(params['keywords'].lower().split()),
+        params['category'],
+        tuple(params['categories']),
+        params['scoring'],
+        tuple(sorted(params['filters'].items())),
+        params['page']['sort'],
+        params['page']['min_rating']
+    )
+
+
+def search_error_response(result):
+    """Risposta JSON di /api/search per un risultato con errore"""
+    return jsonify({
+        'success': False,
+        'error': result['error']
+    }), 500
+
+
+def search_response(result_set, params):
+    """Risposta JSON di /api/search: una pagina del risultato ordinato"""
+    page = params['page']
+    products, next_offset = result_set.page(page['offset'], page['limit'], page['after'])
+
+    next_cursor = None
+    if next_offset is not None:
+        next_cursor = encode_cursor(page['query'], next_offset, products[-1]['asin'])
+
+    response = {
+        'success': True,
+        'products': products,
+        'count': len(products),
+        'total': len(result_set.products),
+        'next_cursor': next_cursor
+    }
+    if params['categories']:
+        response['categories'] = result_set.categories
+    if result_set.partial:
+        # Alcune pagine PA-API non sono arrivate: risultato incompleto
+        response['partial'] = True
+
+    return jsonify(response)
+
+
 @search_bp.route('/api/search', methods=['GET'])
 def api_search():
-    """API endpoint per ricerca AJAX"""
+    """
+    API endpoint per ricerca AJAX
 
-    keywords = request.args.get('keywords', '').strip()
+    Il risultato è filtrato e ordinato una volta e salvato: le pagine
+    successive (?cursor=) sono fette della stessa lista.
+    """
 
-    if not keywords:
+    params, error_response = parse_api_search_args()
+    if error_response:
+        return error_response
+
+    try:
+        result_sets = get_result_sets()
+        key = result_set_key(params)
+        result_set = result_sets.get(key)
+
+        if result_set is None:
+            client = get_amazon_client()
+            if params['categories']:
+                result = client.search_categories(
+                    params['keywords'],
+                    params['categories'],
+                    timeout=Config.FANOUT_TIMEOUT,
+                    scoring=params['scoring'],
+                    **params['filters']
+                )
+            else:
+                result = client.search_items(
+                    keywords=params['keywords'],
+                    category=params['category'],
+                    **params['filters']
+                )
+
+            if result['error']:
+                return search_error_response(result)
+            result_set = result_sets.put(
+                key, result, params['page']['sort'], params['page']['min_rating']
+            )
+
+        return search_response(result_set, params)
+
+    except Exception as e:
+        logger.error(f"Errore API search: {str(e)}")
         return jsonify({
             'success': False,
-            'error': 'Keywords mancanti'
-        }), 400
+            'error': str(e)
+        }), 500
+
+
+@search_bp.route('/api/async/search', methods=['GET'])
+async def api_search_async():
+    """
+    Versione asincrona di /api/search
+
+    Le chiamate PA-API girano sul loop condiviso del processo: pagine e
+    categorie sono richieste in parallelo senza occupare thread.
+    """
+
+    params, error_response = parse_api_search_args()
+    if error_response:
+        return error_response
 
     try:
-        client = get_amazon_client()
-        result = client.search_items(
-            keywords=keywords,
-            max_price=request.args.get('max_price', type=float),
-            category=request.args.get('category', 'All'),
-            prime_only=request.args.get('prime_only') == 'true',
-            discount_only=request.args.get('discount_only') == 'true'
-        )
+        result_sets = get_result_sets()
+        key = result_set_key(params)
+        result_set = result_sets.get(key)
 
-        if result['error']:
-            return jsonify({
-                'success': False,
-                'error': result['error']
-            }), 500
+        if result_set is None:
+            client, loop_thread = get_async_amazon_client()
+            if params['categories']:
+                coro = client.search_categories(
+                    params['keywords'],
+                    params['categories'],
+                    timeout=Config.FANOUT_TIMEOUT,
+                    scoring=params['scoring'],
+                    **params['filters']
+                )
+            else:
+                coro = client.search_items(
+                    keywords=params['keywords'],
+                    category=params['category'],
+                    **params['filters']
+                )
 
-        return jsonify({
-            'success': True,
-            'products': result['products'],
-            'count': result['count']
-        })
+            result = await loop_thread.run(coro)
+            if result['error']:
+                return search_error_response(result)
+            result_set = result_sets.put(
+                key, result, params['page']['sort'], params['page']['min_rating']
+            )
+
+        return search_response(result_set, params)
 
     except Exception as e:
-        logger.error(f"Errore API search: {str(e)}")
+        logger.error(f"Errore API async search: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+
+
+@search_bp.route('/api/search/stream', methods=['GET'])
+def api_search_stream():
+    """
+    Versione in streaming di /api/search (NDJSON, o SSE con ?format=sse)
+
+    Ogni pagina è inviata appena parsata, nell'ordine di arrivo; l'ultimo
+    evento è il riepilogo (count, errori, tempi). sort, min_rating e
+    cursor non si applicano: per risultati ordinati e paginati usare
+    /api/search.
+    """
+
+    params, error_response = parse_api_search_args()
+    if error_response:
+        return error_response
+
+    sse = (
+        request.args.get('format') == 'sse'
+        or request.accept_mimetypes.best == 'text/event-stream'
+    )
+    dumps = current_app.json.dumps
+    client = get_amazon_client()
+    events = client.stream_search(
+        params['keywords'],
+        categories=params['categories'] or None,
+        category=params['category'],
+        timeout=Config.FANOUT_TIMEOUT if params['categories'] else None,
+        **params['filters']
+    )
+
+    def generate():
+        try:
+            for event in events:
+                if sse:
+                    yield f"event: {event['event']}\ndata: {dumps(event)}\n\n"
+                else:
+                    yield dumps(event) + '\n'
+        except Exception as e:
+            logger.error(f"Errore API search stream: {str(e)}")
+            event = {'event': 'error', 'error': str(e)}
+            yield f"event: error\ndata: {dumps(event)}\n\n" if sse else dumps(event) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@search_bp.route('/api/export', methods=['GET'])
+def api_export():
+    """
+    Esporta i risultati di una ricerca in CSV (default) o JSON Lines (?format=jsonl)
+
+    Stessi parametri di /api/search, con fino a EXPORT_MAX_PAGES pagine
+    per categoria; min_rating è applicato, l'ordine è quello di arrivo
+    delle pagine. Le chiamate PA-API hanno priorità bulk (cedono il passo
+    alle ricerche interattive) e l'export dura al massimo EXPORT_TIMEOUT. Le righe sono inviate in chunk man mano che le pagine
+    sono parsate.
+
+    Se nessuna pagina arriva (tutte le chiamate PA-API falliscono) risponde
+    502 in JSON; le pagine fallite dopo l'inizio dello stream sono
+    segnalate in coda al file (righe '#error' / record 'error').
+    """
+
+    params, error_response = parse_api_search_args(max_pages=Config.EXPORT_MAX_PAGES)
+    if error_response:
+        return error_response
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return bad_request(f"Formato non supportato: {export_format}")
+    mimetype, extension = EXPORT_FORMATS[export_format]
+
+    client = get_amazon_client()
+    events = client.stream_search(
+        params['keywords'],
+        categories=params['categories'] or None,
+        category=params['category'],
+        timeout=Config.EXPORT_TIMEOUT,
+        priority=PRIORITY_BULK,
+        **params['filters']
+    )
+    min_rating = params['page']['min_rating']
+
+    # Il primo evento è letto prima di inviare gli header: se tutte le
+    # chiamate upstream falliscono la risposta è un errore, non un file vuoto
+    try:
+        first = next(events)
+    except Exception as e:
+        logger.error(f"Errore API export: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 502
+    if first['event'] == 'summary' and first['errors'] and not first['count']:
+        logger.error(f"Export fallito per {params['keywords']!r}: {first['errors']}")
+        return jsonify({
+            'success': False,
+            'error': first['errors'][0]['error'],
+            'errors': first['errors']
+        }), 502
+
+    errors = []
+    failure = None
+
+    def pages():
+        nonlocal failure
+        try:
+            for event in itertools.chain([first], events):
+                if event['event'] == 'summary':
+                    for error in event['errors']:
+                        logger.warning(f"Export incompleto per {params['keywords']!r}: {error}")
+                    errors.extend(event['errors'])
+                    continue
+                products = event['products']
+                if min_rating:
+                    products = [p for p in products if (p['rating']['stars'] or 0) >= min_rating]
+                yield products
+        except Exception as e:
+            logger.exception(f"Errore API export: {str(e)}")
+            errors.append({'error': str(e)})
+            failure = e
+
+    def generate():
+        writer = iter_csv if export_format == 'csv' else iter_jsonl
+        yield from writer(pages(), errors)
+        if failure is not None:
+            # Dopo il marcatore d'errore: la risposta chunked non è chiusa come completa
+            raise failure
+
+    filename = f"amazon-products-{int(time.time())}.{extension}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@search_bp.route('/api/deals', methods=['GET'])
+def api_deals():
+    """
+    Migliori offerte dallo storico prezzi (prodotti più sotto la mediana)
+
+    Lo storico è in memoria per processo: con più worker gunicorn ognuno
+    risponde con i prezzi osservati nelle proprie risposte PA-API.
+
+    Query params:
+        days: Finestra in giorni (default: 30)
+        limit: Numero massimo di offerte (default: 50, max 500)
+        min_below_median: Percentuale minima sotto la mediana (default: 5)
+    """
+    days = request.args.get('days', 30, type=int)
+    limit = request.args.get('limit', 50, type=int)
+    min_below_median = request.args.get('min_below_median', 5.0, type=float)
+    if not 1 <= days <= 365:
+        return bad_request('days deve essere tra 1 e 365')
+    if not 1 <= limit <= 500:
+        return bad_request('limit deve essere tra 1 e 500')
+
+    history = get_amazon_client().price_history
+    if history is None:
+        return jsonify({
+            'success': False,
+            'error': 'Storico prezzi disattivato (PRICE_HISTORY_ENABLED)'
+        }), 404
+
+    deals = history.deals(days=days, limit=limit, min_below_median=min_below_median)
+    return jsonify({
+        'success': True,
+        'count': len(deals),
+        'deals': deals,
+        'pid': os.getpid()
+    })
+
+
+@search_bp.route('/api/stats', methods=['GET'])
+def api_stats():
+    """Statistiche client Amazon (cache, coalescing, batching, rate limit) e cache delle card"""
+    client = get_amazon_client()
+    stats = client.get_stats()
+    stats['result_sets'] = get_result_sets().stats()
+    card_cache = getattr(current_app, 'card_cache', None)
+    stats['card_cache'] = card_cache.stats() if card_cache else None
+    return jsonify(stats)
@@ -67,8 +67,29 @@ function loadRecentSearches() {
     return searches;
 }
 
-// Export Results to CSV
+// Export Results: the server streams every page of the search (CSV or JSON Lines)
+function exportSearch(params, format = 'csv') {
+    const query = new URLSearchParams(params);
+    query.set('format', format);
+
+    const link = document.createElement('a');
+    link.setAttribute('href', `/api/export?${query}`);
+    link.setAttribute('download', '');
+    link.style.visibility = 'hidden';
+
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+}
+
+// Export Results to CSV: search params are exported server-side (all pages),
+// a products array is still converted in the browser
 function exportToCSV(products) {
+    if (products && !Array.isArray(products)) {
+        exportSearch(products, 'csv');
+        return;
+    }
+
     if (!products || products.length === 0) {
         alert('Nessun prodotto da esportare');
         return;
@@ -234,6 +255,132 @@ function shareResults() {
     }
 }
 
+// Streaming Search: render product cards as soon as each page arrives
+function escapeHTML(text) {
+    const div = document.createElement('div');
+    div.textContent = text ?? '';
+    return div.innerHTML;
+}
+
+function formatPrice(amount) {
+    return `€ ${Number(amount).toFixed(2).replace('.', ',')}`;
+}
+
+function formatStars(rating) {
+    const full = Math.floor(rating);
+    const half = rating - full >= 0.5 ? 1 : 0;
+    return '★'.repeat(full) + (half ? '½' : '') + '☆'.repeat(Math.max(5 - full - half, 0));
+}
+
+// Same markup as the cards in templates/results.html
+function renderProductCard(product) {
+    const price = product.price || {};
+    const rating = product.rating || {};
+    const features = (product.features || []).slice(0, 3);
+
+    return `
+        <div class="product-card">
+            <div class="product-image">
+                <img src="${escapeHTML(product.image_url)}" alt="${escapeHTML(product.title)}" loading="lazy">
+                ${price.discount_percent ? `<span class="badge badge-discount">-${price.discount_percent}%</span>` : ''}
+                ${product.is_prime ? '<span class="badge badge-prime">Prime</span>' : ''}
+            </div>
+            <div class="product-info">
+                <h3 class="product-title" title="${escapeHTML(product.title)}">${escapeHTML(product.title)}</h3>
+                <p class="product-brand">${escapeHTML(product.brand)}</p>
+                ${rating.stars > 0 ? `
+                <div class="product-rating">
+                    <span class="stars">${formatStars(rating.stars)}</span>
+                    <span class="rating-value">${rating.stars}</span>
+                    <span class="rating-count">(${rating.count || 0})</span>
+                </div>` : ''}
+                <div class="product-price">
+                    ${price.current ? `
+                    <span class="price-current">${formatPrice(price.current)}</span>
+                    ${price.original ? `<span class="price-original">${formatPrice(price.original)}</span>` : ''}
+                    ` : '<span class="price-unavailable">Prezzo non disponibile</span>'}
+                </div>
+                ${features.length ? `
+                <ul class="product-features">
+                    ${features.map(feature => `<li>${escapeHTML(feature)}</li>`).join('')}
+                </ul>` : ''}
+                <a href="${escapeHTML(product.url)}" target="_blank" rel="noopener noreferrer nofollow" class="btn btn-amazon">
+                    Vedi su Amazon →
+                </a>
+                <p class="product-asin">ASIN: ${escapeHTML(product.asin)}</p>
+            </div>
+        </div>
+    `;
+}
+
+// Reads /api/search/stream (NDJSON) and calls onProducts for every page
+async function streamSearch(params, { onProducts, onSummary } = {}) {
+    const response = await fetch(`/api/search/stream?${new URLSearchParams(params)}`, {
+        headers: { Accept: 'application/x-ndjson' }
+    });
+
+    if (!response.ok) {
+        const body = await response.json().catch(() => ({}));
+        throw new Error(body.error || `HTTP ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let summary = null;
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+
+        const event = JSON.parse(line);
+        if (event.event === 'page') {
+            if (onProducts) onProducts(event.products, event);
+        } else if (event.event === 'summary') {
+            summary = event;
+            if (onSummary) onSummary(event);
+        } else if (event.event === 'error') {
+            throw new Error(event.error);
+        }
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+
+    return summary;
+}
+
+// Appends cards to a grid while the search is still running
+function renderSearchStream(grid, params) {
+    grid.innerHTML = '';
+
+    return streamSearch(params, {
+        onProducts: (products) => {
+            grid.insertAdjacentHTML('beforeend', products.map(renderProductCard).join(''));
+        }
+    }).then(summary => {
+        if (summary && summary.count === 0) {
+            showNotification('Nessun prodotto trovato', 'error');
+        }
+        return summary;
+    }).catch(err => {
+        console.error('Errore ricerca in streaming:', err);
+        showNotification('Errore durante la ricerca', 'error');
+    });
+}
+
+// Grids with data-stream-search="keywords=..." (multi-page /search results) are filled incrementally
+document.querySelectorAll('.products-grid[data-stream-search]').forEach(grid => {
+    renderSearchStream(grid, new URLSearchParams(grid.dataset.streamSearch));
+});
+
 // Console welcome message
 console.log('%c🎯 Amazon Prime Finder', 'font-size: 20px; font-weight: bold; color: #FF9900');
 console.log('%cBuilt with Flask & Amazon Product Advertising API', 'color: #232F3E');
@@ -219,6 +219,13 @@ document.addEventListener('DOMContentLoaded', () => {
 const exportBtn = document.getElementById('exportResults');
 if (exportBtn) {
     exportBtn.addEventListener('click', () => {
+        // Whole search exported by /api/export when the search params are known
+        const grid = document.querySelector('.products-grid');
+        if (grid && grid.dataset.exportQuery) {
+            exportToCSV(new URLSearchParams(grid.dataset.exportQuery));
+            return;
+        }
+
         // Collect product data from DOM
         const products = Array.from(document.querySelectorAll('.product-card')).map(card => {
             return {
@@ -0,0 +1,207 @@
+"""
+Fixture e helper condivisi dai test
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from amazon.api_client import AmazonClient
+from amazon.async_client import AsyncAmazonClient
+
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+
+def snake_case_keys(data):
+    """
+    Converte ricorsivamente le chiavi JSON PA-API in snake_case
+
+    Il risultato ha la stessa forma dei modelli SDK ed è quindi
+    leggibile da parse_product (oracolo per parse_product_raw).
+    """
+    if isinstance(data, dict):
+        return {_CAMEL_BOUNDARY.sub('_', key).lower(): snake_case_keys(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [snake_case_keys(value) for value in data]
+    return data
+
+
+class FakeClock:
+    """Orologio controllabile nei test"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def run_concurrently(count, target, join=False):
+    """
+    Esegue target(index) in count thread avviati insieme (barriera)
+
+    Returns:
+        tuple: (threads, results); con join=True i thread sono già terminati
+    """
+    results = [None] * count
+    start = threading.Barrier(count)
+
+    def worker(index):
+        start.wait()
+        results[index] = target(index)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    if join:
+        for thread in threads:
+            thread.join()
+    return threads, results
+
+
+def wait_until(condition, timeout=2.0):
+    """Attende che condition() sia vera; fallisce il test oltre il timeout"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail(f"Condizione non raggiunta entro {timeout}s")
+        time.sleep(0.005)
+
+
+# --- Client sincrono (SDK amazon_paapi simulato) ---
+
+@pytest.fixture
+def paapi():
+    """
+    AmazonApi simulata per la durata del test
+
+    Yields:
+        Mock: Istanza usata dagli AmazonClient creati nel test
+            (configurare search_items / get_items)
+    """
+    with patch('amazon_paapi.AmazonApi') as api_class:
+        api_class.return_value = Mock()
+        yield api_class.return_value
+
+
+def make_client(region="region", marketplace="marketplace", **kwargs):
+    """AmazonClient con credenziali di test (AmazonApi va simulata, vedi paapi)"""
+    return AmazonClient("key", "secret", "tag", region, marketplace, **kwargs)
+
+
+def make_item(asin):
+    """Item PA-API mock minimale"""
+    item = Mock()
+    item.asin = asin
+    item.item_info = Mock()
+    item.item_info.title = Mock()
+    item.item_info.title.display_value = f"Prodotto {asin}"
+    item.item_info.features = None
+    item.offers = Mock()
+    item.offers.listings = []
+    item.customer_reviews = Mock()
+    item.customer_reviews.star_rating = None
+    item.customer_reviews.count = 0
+    item.detail_page_url = f"https://www.amazon.it/dp/{asin}"
+    return item
+
+
+def make_get_items(missing=()):
+    """side_effect per api.get_items che ritorna tutti gli ASIN tranne missing"""
+    calls = []
+    lock = threading.Lock()
+
+    def get_items(item_ids, resources):
+        with lock:
+            calls.append(list(item_ids))
+        response = Mock()
+        response.items_result = Mock()
+        response.items_result.items = [make_item(asin) for asin in item_ids if asin not in missing]
+        return response
+
+    return get_items, calls
+
+
+def make_search(pages, delay=0.0, failing=()):
+    """side_effect per api.search_items con una lista di ASIN per pagina"""
+
+    def search_items(**params):
+        page = params.get('item_page', 1)
+        time.sleep(delay)
+        if page in failing:
+            raise RuntimeError("TooManyRequests")
+        response = Mock()
+        response.search_result = Mock()
+        response.search_result.items = [make_item(asin) for asin in pages.get(page, [])]
+        return response
+
+    return search_items
+
+
+# --- Client asincrono (JSON PA-API su httpx.MockTransport) ---
+
+def raw_item(asin, amount=50.0, is_prime=True):
+    """Item nel formato JSON restituito da PA-API"""
+    return {
+        'ASIN': asin,
+        'DetailPageURL': f"https://www.amazon.it/dp/{asin}?tag=tag",
+        'ItemInfo': {
+            'Title': {'DisplayValue': f"Prodotto {asin}"},
+            'ByLineInfo': {'Brand': {'DisplayValue': 'Marca'}},
+        },
+        'Offers': {
+            'Listings': [{
+                'Price': {'Amount': amount, 'DisplayAmount': f"€ {amount:.2f}"},
+                'ProgramEligibility': {'IsPrimeExclusive': is_prime},
+            }]
+        },
+    }
+
+
+def full_item(asin='B000000001'):
+    """Item con tutti i campi letti da parse_product"""
+    item = raw_item(asin, amount=79.99)
+    item['Images'] = {'Primary': {'Large': {'URL': 'https://m.media-amazon.com/images/I/x.jpg'}}}
+    item['ItemInfo']['Features'] = {'DisplayValues': [f"Feature {i}" for i in range(7)]}
+    item['Offers']['Listings'][0]['SavingBasis'] = {'Amount': 99.99, 'DisplayAmount': '€ 99,99'}
+    item['CustomerReviews'] = {'StarRating': {'Value': 4.5}, 'Count': 1234}
+    return item
+
+
+def make_handler(pages, delay=0.0, calls=None):
+    """Handler per httpx.MockTransport: SearchItems con una lista di ASIN per pagina"""
+
+    async def handler(request):
+        payload = json.loads(request.content)
+        if calls is not None:
+            calls.append(payload)
+        await asyncio.sleep(delay)
+
+        if 'ItemIds' in payload:
+            items = [raw_item(asin) for asin in payload['ItemIds'] if asin != 'B000000404']
+            return httpx.Response(200, json={'ItemsResult': {'Items': items}})
+
+        asins = pages.get(payload.get('ItemPage', 1), [])
+        if not asins:
+            return httpx.Response(404, json={
+                'Errors': [{'Code': 'NoResults', 'Message': 'No results'}]
+            })
+        return httpx.Response(200, json={
+            'SearchResult': {'Items': [raw_item(asin) for asin in asins]}
+        })
+
+    return handler
+
+
+def make_async_client(handler, **kwargs):
+    """AsyncAmazonClient con credenziali di test e transport httpx simulato"""
+    return AsyncAmazonClient(
+        "key", "secret", "tag", "eu-west-1", "www.amazon.it",
+        transport=httpx.MockTransport(handler),
+        **kwargs
+    )
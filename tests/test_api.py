@@ -2,8 +2,7 @@
 Unit Tests per Amazon Prime Finder
 """
 import pytest
-from unittest.mock import Mock, patch
-from amazon.api_client import AmazonClient
+from unittest.mock import Mock
 from amazon.product_parser import parse_product, safe_get, format_price
 from amazon.link_generator import (
     generate_affiliate_link,
@@ -11,6 +10,7 @@ from amazon.link_generator import (
     extract_asin_from_url,
     is_amazon_url
 )
+from tests.conftest import make_client
 
 
 # ===== Test Product Parser =====
@@ -231,13 +231,8 @@ class TestLinkGenerator:
 class TestAmazonClient:
     """Test per api_client.py"""
 
-    @patch('amazon_paapi.AmazonApi')
-    def test_search_items_success(self, mock_api_class):
+    def test_search_items_success(self, paapi):
         """Test ricerca prodotti con successo"""
-        # Mock API response
-        mock_api = Mock()
-        mock_api_class.return_value = mock_api
-
         # Mock search result
         mock_item = Mock()
         mock_item.asin = "B08N5WRWNW"
@@ -263,36 +258,29 @@ class TestAmazonClient:
         mock_response.search_result = Mock()
         mock_response.search_result.items = [mock_item]
 
-        mock_api.search_items.return_value = mock_response
+        paapi.search_items.return_value = mock_response
 
         # Test
-        client = AmazonClient("key", "secret", "tag", "region", "marketplace")
+        client = make_client()
         result = client.search_items("laptop")
 
         assert result['count'] == 1
         assert len(result['products']) == 1
         assert result['error'] is None
 
-    @patch('amazon_paapi.AmazonApi')
-    def test_search_items_no_results(self, mock_api_class):
+    def test_search_items_no_results(self, paapi):
         """Test ricerca senza risultati"""
-        mock_api = Mock()
-        mock_api_class.return_value = mock_api
-        mock_api.search_items.return_value = None
+        paapi.search_items.return_value = None
 
-        client = AmazonClient("key", "secret", "tag", "region", "marketplace")
+        client = make_client()
         result = client.search_items("nonexistent")
 
         assert result['count'] == 0
         assert len(result['products']) == 0
         assert result['error'] is not None
 
-    @patch('amazon_paapi.AmazonApi')
-    def test_search_items_with_filters(self, mock_api_class):
+    def test_search_items_with_filters(self, paapi):
         """Test ricerca con filtri"""
-        mock_api = Mock()
-        mock_api_class.return_value = mock_api
-
         # Mock Prime product
         mock_item = Mock()
         mock_item.asin = "B08N5WRWNW"
@@ -327,9 +315,9 @@ class TestAmazonClient:
         mock_response.search_result = Mock()
         mock_response.search_result.items = [mock_item]
 
-        mock_api.search_items.return_value = mock_response
+        paapi.search_items.return_value = mock_response
 
-        client = AmazonClient("key", "secret", "tag", "region", "marketplace")
+        client = make_client()
         result = client.search_items("laptop", prime_only=True)
 
         assert result['count'] == 1
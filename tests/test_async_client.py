@@ -0,0 +1,220 @@
+"""
+Test per il client asincrono e la firma delle richieste PA-API
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from amazon_paapi.sdk.auth.sign_helper import AWSV4Auth
+
+from amazon.async_client import EventLoopThread
+from amazon.cache import SearchCache
+from amazon.paapi_request import (
+    build_search_payload,
+    host_for_marketplace,
+    sign_request,
+)
+from amazon.rate_limiter import RateLimitExceeded, TokenBucket
+from tests.conftest import make_async_client, make_handler, raw_item, snake_case_keys
+
+
+class TestSigning:
+    """Test per paapi_request.py"""
+
+    def test_signature_matches_sdk(self):
+        """La firma locale coincide con quella dell'SDK"""
+        now = datetime(2024, 7, 16, 10, 30, tzinfo=timezone.utc)
+        host = host_for_marketplace('www.amazon.it')
+        payload = build_search_payload("cuffie", "tag-21", "www.amazon.it", ['ItemInfo.Title'])
+
+        _, headers, body = sign_request(
+            'SearchItems', payload, "AKID", "SECRET", "eu-west-1", host, now=now
+        )
+
+        sdk_headers = AWSV4Auth(
+            "AKID", "SECRET", host, "eu-west-1", 'ProductAdvertisingAPI', 'POST', now,
+            headers={
+                'host': host,
+                'content-type': 'application/json; charset=utf-8',
+                'x-amz-target': 'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.SearchItems',
+                'content-encoding': 'amz-1.0',
+                'x-amz-date': '20240716T103000Z',
+            },
+            path='/paapi5/searchitems',
+            payload=payload
+        ).get_headers()
+
+        assert headers['Authorization'] == sdk_headers['Authorization']
+        assert json.loads(body) == payload
+
+    def test_snake_case_keys(self):
+        """Le chiavi PA-API diventano i nomi attributo dell'SDK"""
+        converted = snake_case_keys(raw_item('B000000001'))
+
+        assert converted['asin'] == 'B000000001'
+        assert converted['detail_page_url'].endswith('tag=tag')
+        listing = converted['offers']['listings'][0]
+        assert listing['program_eligibility']['is_prime_exclusive'] is True
+
+
+class TestAsyncClient:
+    """Test per AsyncAmazonClient"""
+
+    def test_search_pages_merged(self):
+        """Le pagine sono unite in ordine e parsate come nel client sincrono"""
+        calls = []
+        client = make_async_client(make_handler({
+            1: ['B000000001', 'B000000002'],
+            2: ['B000000002', 'B000000003'],
+        }, calls=calls))
+
+        result = asyncio.run(client.search_items("cuffie", pages=3))
+
+        assert result['error'] is None
+        assert [p['asin'] for p in result['products']] == ['B000000001', 'B000000002', 'B000000003']
+        assert result['products'][0]['price']['current'] == 50.0
+        assert result['products'][0]['is_prime'] is True
+        assert sorted(call.get('ItemPage', 1) for call in calls) == [1, 2, 3]
+
+    def test_partial_pages_not_cached(self):
+        """Con una pagina in errore il risultato è parziale e non finisce in cache"""
+        pages = make_handler({1: ['B000000001'], 2: ['B000000002']})
+
+        async def handler(request):
+            if json.loads(request.content).get('ItemPage') == 2:
+                return httpx.Response(500, json={
+                    'Errors': [{'Code': 'InternalFailure', 'Message': 'Errore interno'}]
+                })
+            return await pages(request)
+
+        client = make_async_client(handler, cache=SearchCache())
+        result = asyncio.run(client.search_items("cuffie", pages=2))
+
+        assert result['partial'] is True
+        assert [p['asin'] for p in result['products']] == ['B000000001']
+        assert client.cache.stats()['size'] == 0
+
+    def test_no_results(self):
+        """NoResults da PA-API produce il messaggio standard"""
+        client = make_async_client(make_handler({}))
+
+        result = asyncio.run(client.search_items("introvabile"))
+
+        assert result['count'] == 0
+        assert result['error'] == 'Nessun risultato trovato'
+
+    def test_api_error(self):
+        """Gli errori PA-API sono riportati come nel client sincrono"""
+
+        def handler(request):
+            return httpx.Response(401, json={
+                'Errors': [{'Code': 'InvalidSignature', 'Message': 'Firma non valida'}]
+            })
+
+        result = asyncio.run(make_async_client(handler).search_items("cuffie"))
+
+        assert result['count'] == 0
+        assert 'InvalidSignature' in result['error']
+
+    def test_many_calls_in_flight(self):
+        """Molte ricerche concorrenti costano circa la latenza di una"""
+        client = make_async_client(make_handler({1: ['B000000001']}, delay=0.2))
+
+        async def run():
+            return await asyncio.gather(*(
+                client.search_items(f"ricerca {i}") for i in range(200)
+            ))
+
+        start = time.monotonic()
+        results = asyncio.run(run())
+
+        assert all(result['count'] == 1 for result in results)
+        assert time.monotonic() - start < 2.0
+
+    def test_cache_shared(self):
+        """Un risultato fresco in cache evita la chiamata upstream"""
+        calls = []
+        cache = SearchCache(ttl=60)
+        client = make_async_client(make_handler({1: ['B000000001']}, calls=calls), cache=cache)
+
+        async def run():
+            first = await client.search_items("cuffie")
+            second = await client.search_items("cuffie")
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert second is first
+        assert len(calls) == 1
+
+    def test_rate_limited(self):
+        """Con limite raggiunto e fail fast viene ritornato l'errore leggibile"""
+        client = make_async_client(make_handler({1: ['B000000001']}), limiter=TokenBucket(rate=0.01, burst=0))
+
+        result = asyncio.run(client.search_items("cuffie", max_wait=0))
+
+        assert 'Troppe richieste' in result['error']
+
+    def test_items_batch_rate_limited(self):
+        """GetItems limitata solleva RateLimitExceeded invece di ASIN mancanti"""
+        calls = []
+        client = make_async_client(make_handler({}, calls=calls), limiter=TokenBucket(rate=0.01, burst=0))
+
+        with pytest.raises(RateLimitExceeded):
+            asyncio.run(client.get_items_batch(['B000000001'], max_wait=0))
+        assert calls == []
+
+    def test_items_batch(self):
+        """GetItems a blocchi da 10, None per gli ASIN non trovati"""
+        calls = []
+        client = make_async_client(make_handler({}, calls=calls))
+        asins = [f"B000000{i:03d}" for i in range(395, 410)]
+
+        results = asyncio.run(client.get_items_batch(asins))
+
+        assert len(calls) == 2
+        assert results['B000000404'] is None
+        assert results['B000000400']['title'] == 'Prodotto B000000400'
+
+    def test_event_loop_thread(self):
+        """Il loop condiviso esegue le coroutine di altri loop"""
+        loop_thread = EventLoopThread()
+        client = make_async_client(make_handler({1: ['B000000001']}))
+
+        async def run():
+            return await loop_thread.run(client.get_item_details('B000000001'))
+
+        first = asyncio.run(run())
+        second = asyncio.run(run())
+
+        assert first['asin'] == second['asin'] == 'B000000001'
+        assert client._http_loop is loop_thread.loop
+
+
+class TestAsyncRoute:
+    """Test per /api/async/search"""
+
+    def test_async_search_demo_mode(self, monkeypatch):
+        """La route asincrona risponde come /api/search"""
+        monkeypatch.setenv('DEMO_MODE', 'true')
+        from app import create_app
+
+        app = create_app()
+        with app.test_client() as http:
+            sync = http.get('/api/search?keywords=cuffie&prime_only=true').get_json()
+            response = http.get('/api/async/search?keywords=cuffie&prime_only=true')
+
+        assert response.status_code == 200
+        assert response.get_json() == sync
+
+    def test_async_search_validation(self):
+        """Parametri non validi producono 400"""
+        from app import create_app
+
+        app = create_app()
+        with app.test_client() as http:
+            assert http.get('/api/async/search').status_code == 400
+            assert http.get('/api/async/search?keywords=x&categories=Nope').status_code == 400
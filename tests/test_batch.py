@@ -0,0 +1,62 @@
+"""
+Test per il recupero batch dei prodotti (GetItems)
+"""
+from tests.conftest import make_client, make_get_items
+
+
+class TestGetItemsBatch:
+    """Test per AmazonClient.get_items_batch"""
+
+    def test_chunks_of_ten(self, paapi):
+        """25 ASIN richiedono 3 chiamate GetItems"""
+        get_items, calls = make_get_items()
+        paapi.get_items.side_effect = get_items
+
+        asins = [f"B{i:09d}" for i in range(25)]
+        client = make_client()
+        result = client.get_items_batch(asins)
+
+        assert sorted(len(call) for call in calls) == [5, 10, 10]
+        assert list(result) == asins
+        assert all(result[asin]['asin'] == asin for asin in asins)
+
+    def test_explicit_misses_and_duplicates(self, paapi):
+        """ASIN non trovati presenti con valore None, duplicati richiesti una volta"""
+        get_items, calls = make_get_items(missing={'B000000002'})
+        paapi.get_items.side_effect = get_items
+
+        client = make_client()
+        result = client.get_items_batch(['B000000001', 'B000000002', 'B000000001'])
+
+        assert calls == [['B000000001', 'B000000002']]
+        assert result['B000000001']['title'] == "Prodotto B000000001"
+        assert result['B000000002'] is None
+
+    def test_failed_chunk_does_not_drop_others(self, paapi):
+        """Un errore su un blocco non invalida gli altri"""
+        get_items, _ = make_get_items()
+
+        def flaky_get_items(item_ids, resources):
+            if 'B000000010' in item_ids:
+                raise RuntimeError("TooManyRequests")
+            return get_items(item_ids, resources)
+
+        paapi.get_items.side_effect = flaky_get_items
+
+        asins = [f"B{i:09d}" for i in range(15)]
+        client = make_client()
+        result = client.get_items_batch(asins)
+
+        assert all(result[asin] is not None for asin in asins[:10])
+        assert all(result[asin] is None for asin in asins[10:])
+
+    def test_get_item_details_wraps_batch(self, paapi):
+        """get_item_details usa get_items_batch"""
+        get_items, calls = make_get_items()
+        paapi.get_items.side_effect = get_items
+
+        client = make_client()
+        product = client.get_item_details('B08N5WRWNW')
+
+        assert product['asin'] == 'B08N5WRWNW'
+        assert calls == [['B08N5WRWNW']]
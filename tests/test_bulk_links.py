@@ -0,0 +1,114 @@
+"""
+Test per la riscrittura in blocco dei link (bulk_links e /api/links/bulk)
+"""
+import json
+import tracemalloc
+
+import pytest
+
+from amazon.bulk_links import BulkStats, chunked, read_urls, rewrite_links, to_csv
+
+
+URLS = [
+    'https://www.amazon.it/dp/B08N5WRWNW?tag=vecchio-21',
+    'https://amzn.to/3abcDEF',
+    'https://www.google.com/search?q=cuffie',
+    'non una url',
+    'https://www.amazon.de/gp/product/B0BSHF7WHW',
+]
+
+
+class TestReadUrls:
+    """Test per bulk_links.read_urls"""
+
+    def test_lines(self):
+        """Una URL per riga, righe vuote ignorate"""
+        assert list(read_urls(['a\n', '\n', ' b \n'])) == [(1, 'a'), (3, 'b')]
+
+    def test_csv_header(self):
+        """Colonna dall'intestazione (url/link/href o ?column=)"""
+        lines = ['titolo,link\n', 'Cuffie,https://amzn.to/x\n', '"Mouse, wireless",https://a.it\n']
+        assert list(read_urls(lines, 'csv')) == [(2, 'https://amzn.to/x'), (3, 'https://a.it')]
+        assert list(read_urls(lines, 'csv', column='titolo')) == [(2, 'Cuffie'), (3, 'Mouse, wireless')]
+
+    def test_csv_without_header(self):
+        """Senza intestazione si usa la prima cella http(s)"""
+        lines = ['Cuffie,https://amzn.to/x\n', 'Nessun link,\n']
+        assert list(read_urls(lines, 'csv')) == [(1, 'https://amzn.to/x')]
+
+    def test_invalid_format(self):
+        """Formato sconosciuto -> ValueError"""
+        with pytest.raises(ValueError):
+            list(read_urls([], 'xml'))
+
+
+class TestRewriteLinks:
+    """Test per bulk_links.rewrite_links"""
+
+    def test_classify_and_tag(self):
+        """Solo i link Amazon ricevono il tag, gli altri restano invariati"""
+        stats = BulkStats()
+        results = list(rewrite_links(enumerate(URLS, 1), 'nuovo-21', stats))
+
+        assert [r['kind'] for r in results] == ['amazon', 'short', 'other', 'invalid', 'amazon']
+        assert 'tag=nuovo-21' in results[0]['url'] and 'vecchio-21' not in results[0]['url']
+        # Il redirect del link breve non conserva la query string: invariato
+        assert results[1]['url'] == URLS[1]
+        assert results[2]['url'] == URLS[2]
+        assert [r['asin'] for r in results] == ['B08N5WRWNW', None, None, None, 'B0BSHF7WHW']
+        assert results[4]['domain'] == 'www.amazon.de'
+
+        summary = stats.summary()
+        assert (summary['urls'], summary['tagged'], summary['asins']) == (5, 2, 2)
+        assert summary['unresolved'] == 1
+
+    def test_constant_memory(self):
+        """La memoria non cresce con il numero di URL"""
+        def peak(count):
+            urls = (f"https://www.amazon.it/dp/B{i:09d}\n" for i in range(count))
+            tracemalloc.start()
+            for _ in chunked(to_csv(rewrite_links(read_urls(urls), 'tag-21'))):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        assert peak(20_000) < peak(2_000) * 2
+
+
+class TestBulkRoute:
+    """Test per POST /api/links/bulk"""
+
+    @pytest.fixture
+    def http(self):
+        from app import create_app
+
+        with create_app().test_client() as http:
+            yield http
+
+    def test_ndjson(self, http):
+        """Input una URL per riga, output JSON Lines con riepilogo"""
+        response = http.post('/api/links/bulk?tag=nuovo-21', data='\n'.join(URLS), content_type='text/plain')
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert response.mimetype == 'application/x-ndjson'
+        assert [row['line'] for row in rows[:-1]] == [1, 2, 3, 4, 5]
+        assert rows[-1]['summary']['tagged'] == 2
+        assert rows[-1]['summary']['urls_per_second'] > 0
+
+    def test_csv(self, http):
+        """Input e output CSV"""
+        body = 'nome,url\nCuffie,https://www.amazon.it/dp/B08N5WRWNW\n'
+        response = http.post('/api/links/bulk?tag=nuovo-21&output=csv', data=body, content_type='text/csv')
+        lines = response.get_data(as_text=True).splitlines()
+
+        assert response.mimetype == 'text/csv'
+        assert lines[0] == 'line,input,url,asin,domain,kind'
+        assert lines[1].endswith(',B08N5WRWNW,www.amazon.it,amazon')
+
+    def test_validation(self, http, monkeypatch):
+        """Tag mancante o formati sconosciuti -> 400"""
+        monkeypatch.setattr('config.Config.ASSOCIATE_TAG', '')
+        assert http.post('/api/links/bulk', data='x').status_code == 400
+        assert http.post('/api/links/bulk?tag=t-21&format=xml', data='x').status_code == 400
+        assert http.post('/api/links/bulk?tag=t-21&output=xml', data='x').status_code == 400
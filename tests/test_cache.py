@@ -0,0 +1,112 @@
+"""
+Test per la cache dei risultati di ricerca
+"""
+import threading
+import time
+from unittest.mock import Mock
+from amazon.cache import SearchCache, make_search_key
+from tests.conftest import FakeClock, make_client
+
+
+def make_result(name='prodotto'):
+    return {'products': [{'asin': 'B000000001', 'title': name}], 'count': 1, 'error': None}
+
+
+class TestSearchCache:
+    """Test per cache.py"""
+
+    def test_make_search_key_normalizes(self):
+        """Ricerche equivalenti producono la stessa chiave"""
+        key_a = make_search_key('  Cuffie   Bluetooth ', max_price=50, marketplace='www.amazon.it')
+        key_b = make_search_key('cuffie bluetooth', max_price=50.0, marketplace='WWW.AMAZON.IT')
+
+        assert key_a == key_b
+        assert key_a != make_search_key('cuffie bluetooth', max_price=50, prime_only=True)
+
+    def test_hit_after_miss(self):
+        """Seconda richiesta servita dalla cache"""
+        cache = SearchCache(ttl=60)
+        fetch = Mock(return_value=make_result())
+
+        first = cache.get_or_fetch(('k',), fetch)
+        second = cache.get_or_fetch(('k',), fetch)
+
+        assert first is second
+        assert fetch.call_count == 1
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_errors_not_cached(self):
+        """I risultati con errore non vengono salvati"""
+        cache = SearchCache(ttl=60)
+        fetch = Mock(return_value={'products': [], 'count': 0, 'error': 'Errore API'})
+
+        cache.get_or_fetch(('k',), fetch)
+        cache.get_or_fetch(('k',), fetch)
+
+        assert fetch.call_count == 2
+        assert cache.stats()['size'] == 0
+
+    def test_stale_while_revalidate(self):
+        """Entry scaduta servita subito e aggiornata in background"""
+        clock = FakeClock()
+        cache = SearchCache(ttl=60, stale_ttl=120, clock=clock)
+        cache.get_or_fetch(('k',), Mock(return_value=make_result('vecchio')))
+
+        clock.now += 90
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return make_result('nuovo')
+
+        stale = cache.get_or_fetch(('k',), fetch)
+        assert stale['products'][0]['title'] == 'vecchio'
+        assert refreshed.wait(2)
+
+        for _ in range(100):
+            if cache.stats()['refreshes']:
+                break
+            time.sleep(0.01)
+
+        fresh = cache.get_or_fetch(('k',), Mock())
+        assert fresh['products'][0]['title'] == 'nuovo'
+        assert cache.stats()['stale_hits'] == 1
+
+    def test_expired_beyond_stale_window(self):
+        """Oltre la finestra stale la ricerca torna upstream"""
+        clock = FakeClock()
+        cache = SearchCache(ttl=60, stale_ttl=60, clock=clock)
+        cache.get_or_fetch(('k',), Mock(return_value=make_result()))
+
+        clock.now += 500
+        fetch = Mock(return_value=make_result())
+        cache.get_or_fetch(('k',), fetch)
+
+        assert fetch.call_count == 1
+        assert cache.stats()['misses'] == 2
+
+    def test_max_entries_evicts_lru(self):
+        """Oltre max_entries viene rimossa la entry meno usata"""
+        cache = SearchCache(ttl=60, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.get_or_fetch((key,), Mock(return_value=make_result()))
+
+        fetch = Mock(return_value=make_result())
+        cache.get_or_fetch(('a',), fetch)
+        assert fetch.call_count == 1
+
+    def test_client_uses_cache(self, paapi):
+        """search_items chiama PA-API una sola volta per ricerche equivalenti"""
+        mock_response = Mock()
+        mock_response.search_result = Mock()
+        mock_response.search_result.items = []
+        paapi.search_items.return_value = mock_response
+
+        client = make_client(marketplace="www.amazon.it", cache=SearchCache(ttl=60))
+        client.search_items("Laptop")
+        client.search_items("laptop ")
+
+        assert paapi.search_items.call_count == 1
+        assert client.get_stats()['search_cache']['hits'] == 1
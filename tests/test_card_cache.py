@@ -0,0 +1,108 @@
+"""
+Test per la cache delle card prodotto (FragmentCache)
+"""
+from unittest.mock import Mock, patch
+
+from amazon.fragment_cache import FragmentCache, card_key
+from amazon.models import Price, Product, Rating
+from tests.conftest import make_client
+
+
+def product(asin='B000000001', amount=49.99, discount=None, stars=4.5):
+    return Product(
+        asin, 'Cuffie Bluetooth <Over-Ear>', f"https://www.amazon.it/dp/{asin}", 'img', 'Marca',
+        Price(amount, f"€ {amount}", discount_percent=discount),
+        is_prime=True,
+        rating=Rating(stars, 120),
+        features=('Cancellazione del rumore', 'Bluetooth 5.3')
+    )
+
+
+class TestFragmentCache:
+    """Test per fragment_cache.py"""
+
+    def test_hit_and_miss(self):
+        """Il secondo accesso con la stessa chiave non renderizza"""
+        cache = FragmentCache()
+        render = Mock(return_value='<div></div>')
+
+        assert cache.get_or_render('a', render) == '<div></div>'
+        assert cache.get_or_render('a', render) == '<div></div>'
+
+        assert render.call_count == 1
+        assert cache.stats() == {'size': 1, 'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    def test_lru(self):
+        """Oltre max_entries si rimuovono i frammenti meno usati"""
+        cache = FragmentCache(max_entries=2)
+        for key in ('a', 'b', 'a', 'c'):
+            cache.get_or_render(key, lambda: key)
+
+        assert cache.stats()['size'] == 2
+        render = Mock(return_value='b')
+        cache.get_or_render('b', render)
+        assert render.call_count == 1
+
+    def test_card_key_visible_fields(self):
+        """Prezzo, sconto o rating diversi cambiano la chiave; dict e Product coincidono"""
+        base = product()
+
+        assert card_key(base) == card_key(product())
+        assert card_key(base) == card_key(base.to_dict())
+        assert card_key(base) != card_key(product(amount=39.99))
+        assert card_key(base) != card_key(product(discount=20))
+        assert card_key(base) != card_key(product(stars=4.0))
+
+
+class TestRenderCard:
+    """Test per render_card in results.html"""
+
+    def test_cached_equals_uncached(self):
+        """L'HTML dalla cache è identico al rendering diretto"""
+        from app import create_app
+
+        app = create_app()
+        item = product()
+        with app.test_request_context():
+            render_card = app.jinja_env.globals['render_card']
+            cold = render_card(item)
+            warm = render_card(item)
+            uncached = app.jinja_env.get_template('_product_card.html').render(product=item)
+
+        assert cold == warm == uncached
+        assert 'Cuffie Bluetooth &lt;Over-Ear&gt;' in warm
+        assert app.card_cache.stats()['hits'] == 1
+
+    def test_price_change_rerenders(self):
+        """Un prezzo aggiornato produce una nuova card"""
+        from app import create_app
+
+        app = create_app()
+        with app.test_request_context():
+            render_card = app.jinja_env.globals['render_card']
+            render_card(product(amount=49.99))
+            updated = render_card(product(amount=39.99))
+
+        assert '39,99' in updated
+        assert app.card_cache.stats()['misses'] == 2
+
+    @patch('amazon.api_client.parse_product')
+    def test_repeat_search_hits(self, mock_parse, paapi):
+        """La stessa ricerca ripetuta riusa le card e le statistiche sono in /api/stats"""
+        from app import create_app
+
+        paapi.search_items.return_value.search_result.items = ['item-1', 'item-2']
+        products = {'item-1': product('B000000001'), 'item-2': product('B000000002', amount=19.99)}
+        mock_parse.side_effect = lambda item, *args, **kwargs: products[item]
+
+        app = create_app()
+        app.amazon_client = make_client()
+        with app.test_client() as http:
+            first = http.get('/search?keywords=cuffie')
+            second = http.get('/search?keywords=cuffie')
+            stats = http.get('/api/stats').get_json()
+
+        assert first.status_code == second.status_code == 200
+        assert first.get_data() == second.get_data()
+        assert stats['card_cache']['misses'] == 2
+        assert stats['card_cache']['hits'] == 2
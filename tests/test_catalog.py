@@ -0,0 +1,248 @@
+"""
+Test per il catalogo prodotti SQLite (ProductCatalog)
+"""
+import sqlite3
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from amazon.api_client import ITEM_RESOURCES, RESOURCE_PROFILES
+from amazon.catalog import ProductCatalog
+from amazon.models import Price
+from amazon.product_parser import parse_product_raw
+from benchmarks.bench_parse import make_items
+from tests.conftest import FakeClock, full_item, make_client, make_get_items, make_item
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ProductCatalog(
+        str(tmp_path / 'catalog.sqlite3'), max_age=60, clock=FakeClock(now=1_000_000.0)
+    )
+    yield catalog
+    catalog.close()
+
+
+def sdk_item(asin):
+    """Item mock dell'SDK senza attributi Mock non serializzabili"""
+    item = make_item(asin)
+    item.images = None
+    item.item_info.by_line_info = None
+    return item
+
+
+def sdk_get_items(item_ids, resources, calls):
+    calls.append(list(item_ids))
+    response = Mock()
+    response.items_result.items = [sdk_item(asin) for asin in item_ids]
+    return response
+
+
+def products(count):
+    return [parse_product_raw(item, 'tag-21') for item in make_items(count)]
+
+
+class TestProductCatalog:
+    """Test per catalog.py"""
+
+    def test_wal_mode_and_indexes(self, catalog):
+        """Il file è in WAL mode, con indici su categoria, prezzo e sconto"""
+        catalog.upsert(products(1), ITEM_RESOURCES)
+
+        conn = sqlite3.connect(catalog.path)
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list('products')")}
+        assert {'products_category', 'products_price', 'products_discount'} <= indexes
+        conn.close()
+
+    def test_roundtrip(self, catalog):
+        """Il prodotto letto è uguale a quello salvato"""
+        product = parse_product_raw(full_item(), 'tag-21')
+        catalog.upsert([product], ITEM_RESOURCES, category='Electronics')
+
+        assert catalog.get(product.asin, ITEM_RESOURCES) == product
+        assert catalog.get('B999999999', ITEM_RESOURCES) is None
+
+    def test_max_age(self, catalog):
+        """Righe più vecchie di max_age non sono servite"""
+        catalog.upsert(products(1), ITEM_RESOURCES)
+        asin = products(1)[0].asin
+
+        catalog._clock.now += 59
+        assert catalog.get(asin, ITEM_RESOURCES) is not None
+        catalog._clock.now += 2
+        assert catalog.get(asin, ITEM_RESOURCES) is None
+        assert catalog.get(asin, ITEM_RESOURCES, max_age=3600) is not None
+
+    def test_price_refresh_keeps_other_fields(self, catalog):
+        """Un aggiornamento solo prezzi non sovrascrive titolo e features"""
+        product = parse_product_raw(full_item(), 'tag-21')
+        catalog.upsert([product], ITEM_RESOURCES, category='Electronics')
+
+        catalog._clock.now += 120
+        refreshed = parse_product_raw({
+            'ASIN': product.asin,
+            'Offers': {'Listings': [{'Price': {'Amount': 59.99, 'DisplayAmount': '€ 59,99'}}]}
+        }, 'tag-21')
+        catalog.upsert([refreshed], RESOURCE_PROFILES['price-refresh'])
+
+        assert catalog.get(product.asin, RESOURCE_PROFILES['price-refresh']).price.current == 59.99
+        # Titolo e features non sono stati aggiornati: niente dettaglio fresco
+        assert catalog.get(product.asin, ITEM_RESOURCES) is None
+
+        stored = catalog.get(product.asin, ITEM_RESOURCES, max_age=3600)
+        assert stored.title == product.title
+        assert stored.features == product.features
+        assert stored.price == Price(59.99, '€ 59,99')
+        assert catalog.find(category='Electronics', max_age=3600)[0].asin == product.asin
+
+    def test_card_does_not_satisfy_detail(self, catalog):
+        """Un prodotto salvato senza features non è servito come dettaglio"""
+        product = parse_product_raw(full_item(), 'tag-21')
+        catalog.upsert([product], RESOURCE_PROFILES['card'])
+
+        assert catalog.get(product.asin, RESOURCE_PROFILES['card']) is not None
+        assert catalog.get(product.asin, ITEM_RESOURCES) is None
+
+    def test_find_filters(self, catalog):
+        """find filtra per categoria, prezzo e sconto"""
+        cheap = parse_product_raw(full_item('B000000001'), 'tag-21')
+        other = products(1)[0]
+        catalog.upsert([cheap], ITEM_RESOURCES, category='Electronics')
+        catalog.upsert([other], ITEM_RESOURCES, category='Computers')
+        # Una ricerca su 'All' non cancella la categoria salvata
+        catalog.upsert([cheap], ITEM_RESOURCES, category='All')
+
+        assert [p.asin for p in catalog.find(category='Electronics')] == ['B000000001']
+        assert [p.asin for p in catalog.find(min_discount=25)] == [other.asin]
+        assert [p.asin for p in catalog.find(max_price=60)] == [other.asin]
+        assert len(catalog.find()) == 2
+
+    def test_concurrent_readers_and_writers(self, catalog):
+        """Scritture e letture da più thread senza errori di lock"""
+        batches = [products(200)[i:i + 10] for i in range(0, 200, 10)]
+        errors = []
+
+        def write(batch_list):
+            try:
+                for batch in batch_list:
+                    catalog.upsert(batch, ITEM_RESOURCES)
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                for batch in batches:
+                    catalog.get_many([p.asin for p in batch], ITEM_RESOURCES)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(batches[i::4],)) for i in range(4)]
+        threads += [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert catalog.count() == 200
+
+    def test_short_lived_threads_reuse_connections(self, catalog):
+        """Thread di breve durata non lasciano connessioni aperte"""
+        batch = products(5)
+
+        def work():
+            catalog.upsert(batch, ITEM_RESOURCES)
+            catalog.get_many([p.asin for p in batch], ITEM_RESOURCES)
+
+        for _ in range(20):
+            threads = [threading.Thread(target=work) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        connections = catalog.stats()['connections']
+        assert connections['open'] <= connections['size'] == 4
+        assert connections['idle'] == connections['open']
+
+
+class TestCatalogThroughput:
+    """Throughput minimo di upsert e lookup (ordini di grandezza sotto il reale)"""
+
+    def test_upsert_throughput(self, catalog):
+        """Upsert in transazioni da 10 prodotti (una risposta PA-API)"""
+        items = products(5000)
+
+        start = time.perf_counter()
+        for i in range(0, len(items), 10):
+            catalog.upsert(items[i:i + 10], ITEM_RESOURCES, category='Electronics')
+        elapsed = time.perf_counter() - start
+
+        assert catalog.count() == 5000
+        assert catalog.stats()['transactions'] == 500
+        assert len(items) / elapsed > 2000
+
+    def test_lookup_throughput(self, catalog):
+        """Lookup singoli per ASIN"""
+        items = products(5000)
+        for i in range(0, len(items), 100):
+            catalog.upsert(items[i:i + 100], ITEM_RESOURCES)
+
+        start = time.perf_counter()
+        found = [catalog.get(product.asin, ITEM_RESOURCES) for product in items]
+        elapsed = time.perf_counter() - start
+
+        assert all(found)
+        assert len(items) / elapsed > 2000
+
+
+class TestClientCatalog:
+    """Test per AmazonClient(catalog=...)"""
+
+    def test_search_writes_catalog(self, paapi, catalog):
+        """Ogni pagina di ricerca è salvata nel catalogo con la sua categoria"""
+        paapi.search_items.return_value.search_result.items = [
+            sdk_item('B000000001'), sdk_item('B000000002')
+        ]
+
+        client = make_client(catalog=catalog)
+        client.search_items("cuffie", category='Electronics')
+
+        assert catalog.stats()['transactions'] == 1
+        assert [p.asin for p in catalog.find(category='Electronics')] == [
+            'B000000001', 'B000000002'
+        ]
+
+    def test_details_served_from_catalog(self, paapi, catalog):
+        """Lookup ripetuti non richiamano PA-API finché la riga è fresca"""
+        calls = []
+        paapi.get_items.side_effect = lambda item_ids, resources: sdk_get_items(
+            item_ids, resources, calls
+        )
+
+        client = make_client(batch_window=0.01, catalog=catalog)
+        first = client.get_item_details('B000000001')
+        second = client.get_item_details('B000000001')
+        batch = client.get_items_batch(['B000000001', 'B000000002'])
+
+        assert first == second
+        assert calls == [['B000000001'], ['B000000002']]
+        assert batch['B000000001'] == first
+
+        catalog._clock.now += 61
+        client.get_item_details('B000000001')
+        assert len(calls) == 3
+
+    def test_catalog_errors_do_not_break_lookups(self, paapi, catalog):
+        """Un errore del catalogo non blocca la risposta"""
+        get_items, _ = make_get_items()
+        paapi.get_items.side_effect = get_items
+
+        catalog.upsert = Mock(side_effect=sqlite3.OperationalError('database is locked'))
+        client = make_client(catalog=catalog)
+
+        assert client.get_item_details('B000000001')['asin'] == 'B000000001'
+        assert catalog.stats()['write_errors'] == 1
@@ -0,0 +1,81 @@
+"""
+Test per gli accessor compilati (compile_path)
+"""
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from amazon.product_parser import compile_path, parse_product, safe_get
+from tests.conftest import make_item
+
+
+class Broken:
+    """Oggetto la cui proprietà solleva AttributeError"""
+
+    @property
+    def price(self):
+        raise AttributeError('price')
+
+    def get(self, key):
+        return {'price': 'via get'}.get(key)
+
+
+def sample_objects():
+    mock = Mock()
+    mock.offers.listings = ['listing']
+    mock.none_value = None
+
+    return [
+        None,
+        {'offers': {'listings': [1, 2]}},
+        {'offers': None},
+        {'offers': {'listings': None}},
+        {'items': 'chiave omonima di un metodo dict'},
+        SimpleNamespace(offers=SimpleNamespace(listings=[3])),
+        SimpleNamespace(offers={'listings': [4]}),
+        SimpleNamespace(),
+        mock,
+        Mock(spec=[]),
+        Broken(),
+        'stringa',
+        42,
+        [1, 2, 3],
+    ]
+
+
+PATHS = [
+    ('offers', 'listings'),
+    ('offers',),
+    ('items',),
+    ('price',),
+    ('none_value',),
+    ('offers', 'listings', 'missing'),
+]
+
+
+class TestCompilePath:
+    """Test per product_parser.compile_path"""
+
+    @pytest.mark.parametrize('keys', PATHS)
+    def test_same_result_as_safe_get(self, keys):
+        """Stesso risultato di safe_get su dict, modelli, Mock e valori inattesi"""
+        accessor = compile_path(*keys)
+
+        for obj in sample_objects():
+            expected = safe_get(obj, *keys, default='default')
+            actual = accessor(obj, 'default')
+            if isinstance(expected, Mock):
+                assert actual is expected
+            else:
+                assert actual == expected, (obj, keys)
+
+    def test_default_is_none(self):
+        """Senza default ritorna None come safe_get"""
+        assert compile_path('a', 'b')({'a': {}}) is None
+
+    def test_parse_product_on_mock_item(self):
+        """parse_product con accessor compilati legge gli item mock"""
+        product = parse_product(make_item('B000000001'), 'tag-21')
+
+        assert product['asin'] == 'B000000001'
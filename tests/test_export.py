@@ -0,0 +1,164 @@
+"""
+Test per l'esportazione dei risultati (/api/export)
+"""
+import csv
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from amazon.export import CSV_COLUMNS, CSV_ERROR_MARKER, iter_csv
+from amazon.models import Price, Product, Rating
+from amazon.rate_limiter import PRIORITY_BULK
+from config import Config
+from tests.conftest import make_client, make_search
+
+
+class TestIterCsv:
+    """Test per export.iter_csv"""
+
+    def test_one_chunk_per_page(self):
+        """Intestazione, poi un blocco per pagina; virgolette e N/A"""
+        pages = [
+            [Product('B000000001', 'Cuffie "pro", nere', 'url', 'img', 'Marca', Price(9.99, '€ 9,99'), True,
+                     Rating(4.5, 10))],
+            [],
+            [Product('B000000002', 'Mouse', 'url', 'img', 'Marca')],
+        ]
+        chunks = list(iter_csv(iter(pages)))
+        rows = list(csv.reader(io.StringIO(''.join(chunks))))
+
+        assert len(chunks) == 3
+        assert tuple(rows[0]) == CSV_COLUMNS
+        assert rows[1][:4] == ['B000000001', 'Cuffie "pro", nere', 'Marca', '9.99']
+        assert rows[1][6:8] == ['Yes', '4.5']
+        assert rows[2][3:5] == ['N/A', 'N/A']
+
+    def test_error_rows(self):
+        """Gli errori letti dopo l'ultima pagina diventano righe '#error' in coda"""
+        errors = []
+
+        def pages():
+            yield [Product('B000000001', 'Cuffie', 'url', 'img', 'Marca')]
+            errors.append({'category': 'All', 'page': 2, 'error': 'TooManyRequests'})
+
+        rows = list(csv.reader(io.StringIO(''.join(iter_csv(pages(), errors)))))
+
+        assert len(rows) == 3
+        assert rows[-1] == [CSV_ERROR_MARKER, 'All', '2', 'TooManyRequests']
+
+
+class TestExportRoute:
+    """Test per /api/export"""
+
+    @pytest.fixture
+    def app(self, paapi):
+        from app import create_app
+
+        paapi.search_items.side_effect = make_search({
+            page: [f"B0000000{page:02d}{i}" for i in range(10)] for page in range(1, 11)
+        })
+        client = make_client()
+
+        app = create_app()
+        app.amazon_client = client
+        with patch('amazon.api_client.parse_product', side_effect=lambda item, tag: Product(
+            item.asin, f"Prodotto {item.asin}", 'url', 'img', 'Marca', Price(19.99, '€ 19,99')
+        )):
+            yield app, paapi
+
+    def test_csv_all_pages(self, app):
+        """Esporta fino a EXPORT_MAX_PAGES pagine, oltre SEARCH_MAX_PAGES"""
+        app, mock_api = app
+        with app.test_client() as http:
+            response = http.get('/api/export?keywords=cuffie&pages=10')
+            chunks = list(response.response)
+
+        rows = list(csv.reader(io.StringIO(''.join(c.decode() for c in chunks))))
+        assert response.mimetype == 'text/csv'
+        assert 'attachment; filename="amazon-products-' in response.headers['Content-Disposition']
+        assert len(rows) == 101
+        assert len(chunks) == 11
+        assert mock_api.search_items.call_count == 10
+
+    def test_bulk_priority_and_timeout(self, app):
+        """Le chiamate dell'export hanno priorità bulk e durata EXPORT_TIMEOUT"""
+        app, _ = app
+        client = app.amazon_client
+        with patch.object(client, 'stream_search', wraps=client.stream_search) as stream:
+            with app.test_client() as http:
+                assert http.get('/api/export?keywords=cuffie&categories=Electronics,Computers').status_code == 200
+
+        assert stream.call_args.kwargs['priority'] == PRIORITY_BULK
+        assert stream.call_args.kwargs['timeout'] == Config.EXPORT_TIMEOUT
+
+    def test_jsonl(self, app):
+        """JSON Lines: un prodotto per riga"""
+        app, _ = app
+        with app.test_client() as http:
+            body = http.get('/api/export?keywords=cuffie&pages=2&format=jsonl').get_data(as_text=True)
+
+        products = [json.loads(line) for line in body.splitlines()]
+        assert len(products) == 20
+        assert products[0]['asin'].startswith('B0000000')
+
+    def test_validation(self, app):
+        """Formato sconosciuto o keywords mancanti -> 400"""
+        app, _ = app
+        with app.test_client() as http:
+            assert http.get('/api/export?keywords=x&format=xlsx').status_code == 400
+            assert http.get('/api/export').status_code == 400
+
+    def test_first_page_failed(self, app):
+        """Nessuna pagina disponibile -> 502 in JSON, non un file vuoto"""
+        app, mock_api = app
+        mock_api.search_items.side_effect = make_search({1: ['B000000001']}, failing=(1, 2))
+        with app.test_client() as http:
+            response = http.get('/api/export?keywords=cuffie&pages=2')
+
+        assert response.status_code == 502
+        assert response.mimetype == 'application/json'
+        assert response.get_json()['success'] is False
+        assert len(response.get_json()['errors']) == 2
+
+    def test_later_page_failed(self, app):
+        """Pagina fallita dopo l'inizio dello stream -> riga/record di errore in coda"""
+        app, mock_api = app
+        mock_api.search_items.side_effect = make_search(
+            {1: ['B000000001', 'B000000002'], 2: ['B000000003']}, failing=(2,)
+        )
+        with app.test_client() as http:
+            csv_response = http.get('/api/export?keywords=cuffie&pages=2')
+            rows = list(csv.reader(io.StringIO(csv_response.get_data(as_text=True))))
+            jsonl = http.get('/api/export?keywords=mouse&pages=2&format=jsonl').get_data(as_text=True)
+
+        assert csv_response.status_code == 200
+        assert [row[0] for row in rows[1:]] == ['B000000001', 'B000000002', CSV_ERROR_MARKER]
+        assert rows[-1][1:] == ['All', '2', 'TooManyRequests']
+
+        records = [json.loads(line) for line in jsonl.splitlines()]
+        assert [r.get('asin') for r in records[:2]] == ['B000000001', 'B000000002']
+        assert records[-1] == {'category': 'All', 'page': 2, 'error': 'TooManyRequests'}
+
+    def test_unexpected_error_marked_and_raised(self, app):
+        """Un'eccezione a metà stream scrive il marcatore e non chiude il file come completo"""
+        app, _ = app
+
+        def broken_stream(*args, **kwargs):
+            yield {'event': 'page', 'products': [
+                Product('B000000001', 'Cuffie', 'url', 'img', 'Marca').to_dict()
+            ]}
+            raise ValueError("risposta non valida")
+
+        chunks = []
+        with patch.object(app.amazon_client, 'stream_search', side_effect=broken_stream):
+            with app.test_client() as http:
+                response = http.get('/api/export?keywords=cuffie&format=jsonl')
+                with pytest.raises(ValueError):
+                    for chunk in response.response:
+                        chunks.append(chunk.decode())
+
+        records = [json.loads(line) for line in ''.join(chunks).splitlines()]
+        assert records[0]['asin'] == 'B000000001'
+        assert records[-1] == {'error': 'risposta non valida'}
@@ -0,0 +1,165 @@
+"""
+Test per la ricerca su più categorie e il merge dei risultati
+"""
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from amazon.ranking import merge_ranked
+from tests.conftest import make_client, make_item, run_concurrently
+
+
+def product(asin, discount=None, stars=0.0, count=0):
+    return {
+        'asin': asin,
+        'price': {'discount_percent': discount},
+        'rating': {'stars': stars, 'count': count}
+    }
+
+
+def make_category_search(items_by_index, delays=None):
+    """side_effect per api.search_items con risultati per search_index"""
+    delays = delays or {}
+
+    def search_items(**params):
+        index = params['search_index']
+        time.sleep(delays.get(index, 0))
+        response = Mock()
+        response.search_result = Mock()
+        response.search_result.items = [make_item(asin) for asin in items_by_index.get(index, [])]
+        return response
+
+    return search_items
+
+
+class TestRanking:
+    """Test per ranking.py"""
+
+    def test_rank_fusion_boosts_shared_products(self):
+        """Un prodotto presente in più categorie sale nel ranking"""
+        merged = merge_ranked({
+            'Electronics': [product('A'), product('B')],
+            'Computers': [product('C'), product('B')],
+        })
+
+        assert [p['asin'] for p in merged] == ['B', 'A', 'C']
+
+    def test_discount_scoring(self):
+        """Con scoring 'discount' vince lo sconto maggiore"""
+        merged = merge_ranked({
+            'Electronics': [product('A', discount=10), product('B', discount=40)],
+        }, scoring='discount')
+
+        assert [p['asin'] for p in merged] == ['B', 'A']
+
+    def test_category_weights(self):
+        """I pesi per categoria spostano il ranking"""
+        merged = merge_ranked({
+            'Electronics': [product('A')],
+            'VideoGames': [product('B')],
+        }, weights={'VideoGames': 2.0})
+
+        assert [p['asin'] for p in merged] == ['B', 'A']
+
+    def test_custom_scorer_and_unknown_name(self):
+        """Accetta callable, rifiuta nomi sconosciuti"""
+        merged = merge_ranked(
+            {'Electronics': [product('A'), product('B')]},
+            scoring=lambda p, rank: rank
+        )
+        assert [p['asin'] for p in merged] == ['B', 'A']
+
+        with pytest.raises(ValueError):
+            merge_ranked({}, scoring='prezzo')
+
+
+class TestSearchCategories:
+    """Test per AmazonClient.search_categories"""
+
+    def test_merges_and_dedupes(self, paapi):
+        """Le categorie sono interrogate tutte e unite per ASIN"""
+        paapi.search_items.side_effect = make_category_search({
+            'Electronics': ['B000000001', 'B000000002'],
+            'Computers': ['B000000002', 'B000000003'],
+        })
+
+        client = make_client()
+        result = client.search_categories("mouse", ['Electronics', 'Computers'])
+
+        assert result['error'] is None
+        assert [p['asin'] for p in result['products']][0] == 'B000000002'
+        assert result['count'] == 3
+        assert result['categories']['Computers'] == {'count': 2, 'error': None}
+
+    def test_slow_category_dropped(self, paapi):
+        """Una categoria oltre il timeout non blocca la risposta"""
+        paapi.search_items.side_effect = make_category_search(
+            {'Electronics': ['B000000001'], 'VideoGames': ['B000000009']},
+            delays={'VideoGames': 1.0}
+        )
+
+        client = make_client()
+        start = time.monotonic()
+        result = client.search_categories(
+            "cuffie", ['Electronics', 'VideoGames'], timeout=0.2
+        )
+
+        assert time.monotonic() - start < 0.6
+        assert [p['asin'] for p in result['products']] == ['B000000001']
+        assert result['categories']['VideoGames']['error'] == 'Timeout'
+
+    def test_all_categories_failing(self, paapi):
+        """Se nessuna categoria risponde viene ritornato l'errore"""
+        paapi.search_items.side_effect = RuntimeError("InvalidSignature")
+
+        client = make_client()
+        result = client.search_categories("cuffie", ['Electronics', 'Computers'])
+
+        assert result['count'] == 0
+        assert 'InvalidSignature' in result['error']
+
+    def test_queued_categories_cancelled(self, paapi):
+        """Le categorie ancora in coda alla scadenza non chiamano PA-API"""
+        paapi.search_items.side_effect = make_category_search(
+            {'Electronics': ['B000000001']}, delays={'Electronics': 0.5}
+        )
+
+        client = make_client(max_workers=1)
+        result = client.search_categories(
+            "cuffie", ['Electronics', 'Computers', 'VideoGames'], timeout=0.1
+        )
+        time.sleep(0.6)
+
+        assert result['count'] == 0
+        assert paapi.search_items.call_count == 1
+        assert result['categories']['Computers']['error'] == 'Timeout'
+
+    def test_more_categories_than_workers(self, paapi):
+        """Più categorie che thread del pool, con più pagine, non bloccano il pool"""
+        paapi.search_items.side_effect = make_category_search({
+            'Electronics': ['B000000001'],
+            'Computers': ['B000000002'],
+            'VideoGames': ['B000000003'],
+        })
+
+        client = make_client(max_workers=2)
+        result = client.search_categories(
+            "cuffie", ['Electronics', 'Computers', 'VideoGames'], pages=2, timeout=5
+        )
+
+        assert result['count'] == 3
+        assert paapi.search_items.call_count == 6
+
+    def test_executor_created_once(self, paapi):
+        """Prime richieste concorrenti condividono un solo pool"""
+        client = make_client()
+
+        def slow_executor(**kwargs):
+            time.sleep(0.05)
+            return ThreadPoolExecutor(**kwargs)
+
+        with patch('amazon.api_client.ThreadPoolExecutor', side_effect=slow_executor) as executor_class:
+            _, executors = run_concurrently(8, lambda _: client._get_executor(), join=True)
+
+        assert executor_class.call_count == 1
+        assert all(executor is executors[0] for executor in executors)
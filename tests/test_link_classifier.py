@@ -0,0 +1,73 @@
+"""
+Test per il classificatore di URL e l'estrazione ASIN compilati (link_generator)
+"""
+import pytest
+
+from amazon.link_generator import classify_url, extract_asin_from_url, is_amazon_url, url_host
+from benchmarks.bench_link_classifier import make_corpus
+
+
+class TestExtractAsin:
+    """Test per link_generator.extract_asin_from_url"""
+
+    @pytest.mark.parametrize('url', [
+        'https://www.amazon.it/dp/B08N5WRWNW',
+        'https://www.amazon.de/Kopfhoerer/dp/B08N5WRWNW/ref=sr_1_3?keywords=x',
+        'https://www.amazon.co.uk/gp/product/B08N5WRWNW?psc=1',
+        'https://www.amazon.com/gp/aw/d/B08N5WRWNW',
+        'https://www.amazon.co.jp/exec/obidos/ASIN/B08N5WRWNW/',
+        'https://www.amazon.it/product/B08N5WRWNW',
+        'https://www.amazon.it/s?k=cuffie&asin=B08N5WRWNW',
+        'https://www.amazon.it/dp/b08n5wrwnw',
+    ])
+    def test_formats(self, url):
+        """Tutti i formati di link prodotto"""
+        assert extract_asin_from_url(url) == 'B08N5WRWNW'
+
+    @pytest.mark.parametrize('url', [
+        'https://www.amazon.it/dp/B08N5',
+        'https://www.amazon.it/dp/B08N5WRWNWXX',
+        'https://www.amazon.it/s?k=dp',
+        'https://amzn.to/3abcDEF',
+        None,
+    ])
+    def test_no_asin(self, url):
+        """ASIN troppo corti/lunghi o assenti -> None"""
+        assert extract_asin_from_url(url) is None
+
+
+class TestClassifyUrl:
+    """Test per link_generator.classify_url"""
+
+    @pytest.mark.parametrize('url, expected', [
+        ('https://www.amazon.it/dp/B08N5WRWNW', ('www.amazon.it', 'amazon')),
+        ('https://AMAZON.com.br:443/dp/B08N5WRWNW', ('amazon.com.br', 'amazon')),
+        ('https://smile.amazon.co.jp/', ('smile.amazon.co.jp', 'amazon')),
+        ('https://amzn.eu/d/abc', ('amzn.eu', 'short')),
+        ('https://www.google.com/', ('www.google.com', 'other')),
+        ('ftp://www.amazon.it/', ('', 'invalid')),
+        ('amazon.it/dp/B08N5WRWNW', ('', 'invalid')),
+    ])
+    def test_kinds(self, url, expected):
+        """Marketplace, link brevi, altri domini e URL non http(s)"""
+        assert classify_url(url) == expected
+
+    @pytest.mark.parametrize('url', [
+        'https://evil-amazon.it.example.com/dp/B08N5WRWNW',
+        'https://www.amazon.it.phishing.net/',
+        'https://notamazon.de/dp/B08N5WRWNW',
+        'https://amazon.com@evil.org/',
+        'https://evil.org/?u=https://www.amazon.it/',
+    ])
+    def test_lookalikes_rejected(self, url):
+        """Domini simili ad Amazon non sono Amazon"""
+        assert is_amazon_url(url) is False
+
+    def test_url_host(self):
+        """Host senza credenziali, porta e punto finale"""
+        assert url_host('https://user:pw@Www.Amazon.it.:8443/dp/x') == 'www.amazon.it'
+
+    def test_corpus_has_no_false_positives(self):
+        """Sul corpus del benchmark la classificazione coincide con l'atteso"""
+        for url, expected in make_corpus(5000):
+            assert is_amazon_url(url) is expected
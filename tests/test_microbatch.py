@@ -0,0 +1,63 @@
+"""
+Test per il micro-batching dei lookup singoli
+"""
+from unittest.mock import Mock
+from amazon.microbatch import MicroBatcher
+from tests.conftest import make_client, make_get_items, run_concurrently
+
+
+class TestMicroBatcher:
+    """Test per microbatch.py"""
+
+    def test_single_request_flushed_after_window(self):
+        """Una richiesta isolata viene inviata allo scadere della finestra"""
+        fetch = Mock(side_effect=lambda keys: {key: key.upper() for key in keys})
+        batcher = MicroBatcher(fetch, window=0.01, max_batch=10)
+
+        assert batcher.get('abc') == 'ABC'
+        fetch.assert_called_once_with(['abc'])
+
+    def test_concurrent_requests_merged(self):
+        """Richieste concorrenti nella stessa finestra condividono un batch"""
+        fetch = Mock(side_effect=lambda keys: {key: key * 2 for key in keys})
+        batcher = MicroBatcher(fetch, window=0.2, max_batch=10)
+
+        _, results = run_concurrently(10, lambda i: batcher.get(i), join=True)
+
+        assert results == [i * 2 for i in range(10)]
+        assert fetch.call_count == 1
+        stats = batcher.stats()
+        assert stats['batches'] == 1
+        assert stats['avg_batch_fill'] == 10
+
+    def test_max_batch_splits(self):
+        """Oltre max_batch le richieste vanno in batch successivi"""
+        fetch = Mock(side_effect=lambda keys: {key: True for key in keys})
+        batcher = MicroBatcher(fetch, window=0.05, max_batch=4)
+
+        _, results = run_concurrently(10, lambda i: batcher.get(i), join=True)
+
+        assert all(results)
+        assert all(len(call.args[0]) <= 4 for call in fetch.call_args_list)
+        assert batcher.stats()['requests'] == 10
+
+    def test_errors_reach_every_waiter(self):
+        """Un errore del batch viene propagato a tutti i chiamanti"""
+        batcher = MicroBatcher(Mock(side_effect=RuntimeError('boom')), window=0.01)
+
+        future = batcher.submit('x')
+        assert isinstance(future.exception(1), RuntimeError)
+
+    def test_client_merges_item_details(self, paapi):
+        """get_item_details concorrenti producono una sola GetItems"""
+        get_items, calls = make_get_items()
+        paapi.get_items.side_effect = get_items
+
+        client = make_client(batch_window=0.2)
+        asins = [f"B{i:09d}" for i in range(6)]
+        _, results = run_concurrently(6, lambda i: client.get_item_details(asins[i]), join=True)
+
+        assert [product['asin'] for product in results] == asins
+        assert len(calls) == 1
+        assert sorted(calls[0]) == asins
+        assert client.get_stats()['item_batching']['batches'] == 1
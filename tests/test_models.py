@@ -0,0 +1,73 @@
+"""
+Test per i modelli Product / Price / Rating
+"""
+import dataclasses
+
+import pytest
+
+from amazon.api_client import get_mock_products
+from amazon.models import NO_PRICE, Price, Product, Rating
+from amazon.product_parser import parse_product_raw
+from tests.conftest import full_item
+
+
+class TestProduct:
+    """Test per models.py"""
+
+    def test_dict_style_access(self):
+        """Il codice esistente può leggere i campi come in un dict"""
+        product = parse_product_raw(full_item(), 'tag-21')
+
+        assert product['asin'] == 'B000000001'
+        assert product['price']['discount_percent'] == 20
+        assert product.get('is_prime') is True
+        assert product.get('price', {}).get('current') == 79.99
+        assert product.get('sconosciuto', 'default') == 'default'
+        with pytest.raises(KeyError):
+            product['_dict']
+
+    def test_to_dict_cached(self):
+        """to_dict produce il formato storico ed è calcolato una sola volta"""
+        product = parse_product_raw(full_item(), 'tag-21')
+        data = product.to_dict()
+
+        assert product.to_dict() is data
+        assert data['price'] == {
+            'current': 79.99,
+            'current_formatted': '€ 79.99',
+            'original': 99.99,
+            'original_formatted': '€ 99,99',
+            'discount_percent': 20
+        }
+        assert data['features'] == [f"Feature {i}" for i in range(5)]
+        assert Product.from_dict(data) == product
+
+    def test_slotted_and_frozen(self):
+        """Niente __dict__ per istanza, campi immutabili"""
+        product = parse_product_raw({'ASIN': 'B000000001'}, 'tag')
+
+        assert not hasattr(product, '__dict__')
+        assert product.price is NO_PRICE
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            product.title = 'altro'
+
+    def test_mock_products(self):
+        """Anche la demo mode restituisce Product"""
+        result = get_mock_products('tag-21', 'cuffie', max_price=100)
+
+        assert all(isinstance(p, Product) for p in result['products'])
+        assert all(p.price.current <= 100 for p in result['products'])
+        assert isinstance(result['products'][0].rating, Rating)
+
+    def test_json_provider(self):
+        """jsonify serializza i Product con to_dict"""
+        from app import create_app
+
+        app = create_app()
+        product = Product('B000000001', 'Titolo', 'url', 'img', 'Marca', Price(9.99, '€ 9,99'))
+
+        with app.app_context():
+            data = app.json.loads(app.json.dumps({'products': [product]}))
+
+        assert data['products'][0]['price']['current'] == 9.99
+        assert data['products'][0]['rating'] == {'stars': 0.0, 'count': 0}
@@ -0,0 +1,112 @@
+"""
+Test per la ricerca multi-pagina (ItemPage fan-out)
+"""
+import time
+from unittest.mock import Mock
+from amazon.cache import SearchCache
+from amazon.rate_limiter import PRIORITY_INTERACTIVE, TokenBucket
+from tests.conftest import make_client, make_item, make_search
+
+
+def make_prime_item(asin, is_prime):
+    """Item mock con una offerta Prime / non Prime"""
+    item = make_item(asin)
+    listing = Mock()
+    listing.price = Mock()
+    listing.price.amount = 50.0
+    listing.price.display_amount = "€ 50,00"
+    listing.saving_basis = None
+    listing.program_eligibility = Mock()
+    listing.program_eligibility.is_prime_exclusive = is_prime
+    item.offers.listings = [listing]
+    return item
+
+
+class TestMultiPageSearch:
+    """Test per search_items(pages=N)"""
+
+    def test_pages_merged_in_rank_order(self, paapi):
+        """Le pagine sono unite in ordine, senza ASIN duplicati"""
+        paapi.search_items.side_effect = make_search({
+            1: ['B000000001', 'B000000002'],
+            2: ['B000000003', 'B000000001'],
+            3: ['B000000004'],
+        })
+
+        client = make_client()
+        result = client.search_items("cuffie", pages=3)
+
+        assert [p['asin'] for p in result['products']] == [
+            'B000000001', 'B000000002', 'B000000003', 'B000000004'
+        ]
+        requested = sorted(call.kwargs.get('item_page', 1) for call in paapi.search_items.call_args_list)
+        assert requested == [1, 2, 3]
+
+    def test_pages_fetched_concurrently(self, paapi):
+        """N pagine costano circa la latenza di una pagina"""
+        paapi.search_items.side_effect = make_search(
+            {page: [f"B00000000{page}"] for page in range(1, 5)},
+            delay=0.2
+        )
+
+        client = make_client(max_workers=4)
+        start = time.monotonic()
+        result = client.search_items("cuffie", pages=4)
+
+        assert result['count'] == 4
+        assert time.monotonic() - start < 0.6
+
+    def test_failed_page_returns_partial_results(self, paapi):
+        """Una pagina in errore non annulla le altre, ma il risultato è parziale e non in cache"""
+        paapi.search_items.side_effect = make_search(
+            {1: ['B000000001'], 2: ['B000000002']},
+            failing={2}
+        )
+
+        client = make_client(cache=SearchCache())
+        result = client.search_items("cuffie", pages=2)
+
+        assert result['error'] is None
+        assert result['partial'] is True
+        assert [p['asin'] for p in result['products']] == ['B000000001']
+
+        client.search_items("cuffie", pages=2)
+        assert paapi.search_items.call_count == 4
+
+    def test_pages_share_token_budget(self, paapi):
+        """L'attesa dei token copre la spaziatura di tutte le pagine"""
+        paapi.search_items.side_effect = make_search({
+            page: [f"B{page}{i:08d}" for i in range(10)] for page in range(1, 6)
+        })
+
+        # 10 TPS, burst 1: la quinta pagina attende ~0.4s, oltre l'attesa per token
+        client = make_client(
+            cache=SearchCache(),
+            limiter=TokenBucket(rate=10, burst=1, timeouts={PRIORITY_INTERACTIVE: 0.1})
+        )
+        result = client.search_items("cuffie", pages=5)
+
+        assert result['count'] == 50
+        assert 'partial' not in result
+        assert client.search_items("cuffie", pages=5) is result
+        assert paapi.search_items.call_count == 5
+
+    def test_filters_apply_across_pages(self, paapi):
+        """prime_only è applicato a tutte le pagine"""
+
+        def search_items(**params):
+            page = params.get('item_page', 1)
+            response = Mock()
+            response.search_result = Mock()
+            response.search_result.items = [
+                make_prime_item(f"B0000000{page}1", True),
+                make_prime_item(f"B0000000{page}2", False),
+            ]
+            return response
+
+        paapi.search_items.side_effect = search_items
+
+        client = make_client()
+        result = client.search_items("cuffie", prime_only=True, pages=2)
+
+        assert [p['asin'] for p in result['products']] == ['B000000011', 'B000000021']
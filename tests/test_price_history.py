@@ -0,0 +1,180 @@
+"""
+Test per lo storico prezzi (PriceHistory)
+"""
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from amazon.models import Price, Product
+from amazon.price_history import DAY, PriceHistory, to_cents
+from tests.conftest import make_client, make_get_items
+
+NOW = 1_000 * DAY
+
+
+@pytest.fixture
+def history():
+    return PriceHistory(capacity=8, initial_rows=2, clock=lambda: NOW)
+
+
+def product(asin, amount):
+    return Product(asin, 'Titolo', 'url', 'img', 'Marca', Price(amount, f"€ {amount}"))
+
+
+class TestPriceHistory:
+    """Test per price_history.py"""
+
+    def test_only_changes_are_stored(self, history):
+        """Prezzi uguali consecutivi non occupano spazio"""
+        assert history.record('A', 1000, NOW - 3 * DAY)
+        assert not history.record('A', 1000, NOW - 2 * DAY)
+        assert history.record('A', 900, NOW - DAY)
+
+        assert history.history('A') == [(NOW - 3 * DAY, 1000), (NOW - DAY, 900)]
+        assert history.stats()['observations'] == 3
+        assert history.stats()['changes'] == 2
+
+    def test_capacity_drops_oldest(self, history):
+        """Oltre la capacità si scartano i cambi più vecchi"""
+        for i in range(10):
+            history.record('A', 1000 + i, NOW - (10 - i) * DAY)
+
+        assert [cents for _, cents in history.history('A')] == list(range(1002, 1010))
+
+    def test_rows_grow(self, history):
+        """Gli array crescono oltre initial_rows senza perdere dati"""
+        for i in range(5):
+            history.record(f"B{i}", 100 * (i + 1), NOW)
+
+        assert history.lowest().tolist() == [100, 200, 300, 400, 500]
+
+    def test_lowest_in_window(self, history):
+        """Il minimo considera il prezzo in vigore all'inizio della finestra"""
+        history.record('A', 500, NOW - 60 * DAY)   # fuori finestra, sostituito
+        history.record('A', 1200, NOW - 40 * DAY)  # in vigore a inizio finestra
+        history.record('A', 1500, NOW - 10 * DAY)
+        history.record('B', 800, NOW - 90 * DAY)   # mai cambiato
+
+        lowest = history.lowest(['A', 'B', 'sconosciuto'])
+        assert lowest.tolist() == [1200, 800, -1]
+
+    def test_below_median(self, history):
+        """Percentuale sotto la mediana a 30 giorni"""
+        history.record('A', 1000, NOW - 20 * DAY)
+        history.record('A', 1200, NOW - 10 * DAY)
+        history.record('A', 800, NOW - DAY)
+        history.record('B', 1000, NOW - DAY)
+
+        assert history.median(['A']).tolist() == [1000.0]
+        below = history.below_median(['A', 'B', 'sconosciuto'])
+        assert below[:2].tolist() == [20.0, 0.0]
+        assert np.isnan(below[2])
+
+    def test_median_weighted_by_duration(self, history):
+        """Offerte di un'ora non spostano la mediana di un prezzo tenuto per settimane"""
+        history.record('A', 10000, NOW - 40 * DAY)
+        history.record('A', 5000, NOW - 3 * 3600)
+        history.record('A', 9000, NOW - 2 * 3600)
+        history.record('A', 5000, NOW - 3600)
+
+        assert history.median(['A']).tolist() == [10000.0]
+        assert history.below_median(['A']).tolist() == [50.0]
+
+    def test_price_drop(self, history):
+        """Ribasso rispetto al prezzo visto in precedenza"""
+        history.record('A', 1000, NOW - 5 * DAY)
+        history.record('A', 750, NOW - DAY)
+        history.record('B', 1000, NOW - 5 * DAY)
+        history.record('B', 1100, NOW - DAY)
+        history.record('C', 1000, NOW - DAY)
+
+        assert history.price_drop(['A', 'B', 'C']).tolist() == [250, 0, 0]
+        assert history.price_drop(['A'], since=NOW - DAY / 2).tolist() == [0]
+
+    def test_deals(self, history):
+        """Offerte ordinate per percentuale sotto la mediana"""
+        for asin, prices in {'A': [1000, 1000, 900], 'B': [1000, 1200, 600], 'C': [1000]}.items():
+            for i, cents in enumerate(prices):
+                history.record(asin, cents, NOW - (3 - i) * DAY)
+
+        deals = history.deals(limit=1)
+        assert [deal['asin'] for deal in deals] == ['B']
+        assert deals[0] == {
+            'asin': 'B',
+            'current': 600,
+            'lowest': 600,
+            'median': 1000.0,
+            'below_median_percent': 40.0,
+            'is_lowest': True,
+            'drop': 600
+        }
+        assert [deal['asin'] for deal in history.deals()] == ['B', 'A']
+
+    def test_record_products(self, history):
+        """I Product senza prezzo sono ignorati"""
+        changed = history.record_products([
+            product('A', 19.99),
+            Product('B', 'Titolo', 'url', 'img', 'Marca')
+        ])
+
+        assert changed == 1
+        assert history.history('A') == [(NOW, 1999)]
+        assert to_cents(0.29) == 29
+
+    def test_scoring_100k_asins(self):
+        """Le query vettoriali su 100k ASIN restano nell'ordine dei millisecondi"""
+        count, capacity = 100_000, 16
+        history = PriceHistory(capacity=capacity, initial_rows=count, clock=lambda: NOW)
+        rng = np.random.default_rng(0)
+        history._cents[:] = rng.integers(1000, 2000, (count, capacity), dtype=np.int32)
+        history._ts[:] = NOW - 45 * DAY + np.arange(capacity) * 3 * DAY
+        history._count[:] = capacity
+        history._asins = [f"B{i:09d}" for i in range(count)]
+        history._index = {asin: i for i, asin in enumerate(history._asins)}
+
+        start = time.perf_counter()
+        history.lowest()
+        history.below_median()
+        history.price_drop()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 1.0
+
+
+class TestClientPriceHistory:
+    """Test per AmazonClient(price_history=...)"""
+
+    def test_responses_record_prices(self, paapi, history):
+        """Ogni risposta con prezzi aggiorna lo storico"""
+        get_items, _ = make_get_items()
+        paapi.get_items.side_effect = get_items
+
+        client = make_client(price_history=history)
+        with patch('amazon.api_client.parse_product', side_effect=lambda item, tag: product(
+            item.asin, 9.99
+        )):
+            client.get_items_batch(['B000000001'], profile='price-refresh')
+
+        assert history.history('B000000001') == [(NOW, 999)]
+        assert client.get_stats()['price_history']['asins'] == 1
+
+    def test_deals_route(self, paapi, history):
+        """/api/deals espone le offerte dello storico del processo"""
+        from app import create_app
+
+        history.record('A', 1000, NOW - 20 * DAY)
+        history.record('A', 700, NOW - DAY)
+        app = create_app()
+        app.amazon_client = make_client(price_history=history)
+
+        with app.test_client() as http:
+            response = http.get('/api/deals?days=30&limit=10')
+            invalid = http.get('/api/deals?limit=0')
+
+        data = response.get_json()
+        assert data['success'] is True
+        assert [deal['asin'] for deal in data['deals']] == ['A']
+        assert data['deals'][0]['below_median_percent'] == 30.0
+        assert invalid.status_code == 400
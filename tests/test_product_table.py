@@ -0,0 +1,115 @@
+"""
+Test per i filtri vettoriali (ProductTable)
+"""
+import time
+
+import numpy as np
+import pytest
+
+from amazon.api_client import get_mock_products, merge_pages
+from amazon.models import Price, Product, Rating
+from amazon.product_table import ProductTable
+
+
+def product(asin, amount=None, discount=None, stars=None, reviews=None, is_prime=False):
+    return Product(
+        asin, 'Titolo', 'url', 'img', 'Marca',
+        Price(amount, None if amount is None else f"€ {amount}", discount_percent=discount),
+        is_prime,
+        Rating(stars, reviews)
+    )
+
+
+PRODUCTS = [
+    product('A', 49.99, discount=10, stars=4.5, reviews=120, is_prime=True),
+    product('B', 19.99, stars=3.9, reviews=15),
+    product('C', None, discount=30, stars=4.8, reviews=900, is_prime=True),
+    product('D', 99.0, discount=20, stars=4.0, reviews=40),
+    product('E', 19.99, discount=10, stars=4.5, reviews=3000, is_prime=True),
+]
+
+
+@pytest.fixture
+def table():
+    return ProductTable(PRODUCTS)
+
+
+def asins(products):
+    return [p['asin'] for p in products]
+
+
+class TestProductTable:
+    """Test per product_table.py"""
+
+    def test_no_filters_keeps_relevance(self, table):
+        """Senza filtri e ordinamento ritorna i prodotti in ordine di rilevanza"""
+        assert table.filter() == PRODUCTS
+        assert asins(table.filter(limit=2)) == ['A', 'B']
+
+    def test_combined_filters(self, table):
+        """I filtri si combinano in AND"""
+        assert asins(table.filter(max_price=50)) == ['A', 'B', 'E']
+        assert asins(table.filter(prime_only=True, discount_only=True)) == ['A', 'C', 'E']
+        assert asins(table.filter(min_rating=4.5, min_reviews=500)) == ['C', 'E']
+        assert asins(table.filter(max_price=50, min_discount=10, prime_only=True)) == ['A', 'E']
+
+    def test_sort_price(self, table):
+        """Ordinamento per prezzo: senza prezzo in fondo, a parità vale la rilevanza"""
+        assert asins(table.filter(sort='price-asc')) == ['B', 'E', 'A', 'D', 'C']
+        assert asins(table.filter(sort='price-desc')) == ['D', 'A', 'B', 'E', 'C']
+
+    def test_sort_discount_and_rating(self, table):
+        """Ordinamento per sconto e valutazione decrescenti"""
+        assert asins(table.filter(sort='discount')) == ['C', 'D', 'A', 'E', 'B']
+        assert asins(table.filter(sort='rating')) == ['C', 'A', 'E', 'D', 'B']
+
+    def test_sort_with_limit(self, table):
+        """Con limit si ritornano i primi risultati dell'ordinamento completo"""
+        for sort in ('price-asc', 'price-desc', 'discount', 'rating'):
+            assert table.filter(sort=sort, limit=3) == table.filter(sort=sort)[:3]
+        assert table.filter(sort='rating', limit=0) == []
+
+    def test_dicts(self):
+        """Accetta anche i dict di parse_product"""
+        table = ProductTable([p.to_dict() for p in PRODUCTS])
+        assert asins(table.filter(discount_only=True, sort='price-asc')) == ['E', 'A', 'D', 'C']
+
+    def test_invalid_sort(self, table):
+        """Ordinamento sconosciuto -> ValueError"""
+        with pytest.raises(ValueError):
+            table.select(sort='popolarità')
+
+    def test_merge_pages_filters(self):
+        """merge_pages deduplica e poi applica prime_only/discount_only"""
+        result = merge_pages([PRODUCTS[:3], PRODUCTS[2:]], prime_only=True, discount_only=True)
+        assert asins(result['products']) == ['A', 'C', 'E']
+        assert result['count'] == 3
+
+    def test_mock_products(self):
+        """I prodotti demo usano gli stessi filtri"""
+        result = get_mock_products('tag', 'test', max_price=100, prime_only=True, item_count=1)
+        assert result['count'] == 1
+        assert result['products'][0].is_prime
+        assert result['products'][0].price.current <= 100
+
+    def test_one_million_rows(self):
+        """Filtri e ordinamento su 1M prodotti in un passaggio vettoriale"""
+        count = 1_000_000
+        rng = np.random.default_rng(0)
+        table = ProductTable.from_columns(
+            range(count),
+            price_cents=rng.integers(-1, 50_000, count),
+            discount=rng.integers(0, 70, count),
+            stars=rng.integers(10, 51, count),
+            reviews=rng.integers(0, 10_000, count),
+            is_prime=rng.random(count) < 0.5
+        )
+
+        start = time.perf_counter()
+        rows = table.select(max_price=200, prime_only=True, min_rating=4, sort='discount', limit=50)
+        elapsed = time.perf_counter() - start
+
+        assert len(rows) == 50
+        assert np.all(np.diff(table.discount[rows]) <= 0)
+        assert np.all(table.is_prime[rows])
+        assert elapsed < 0.5
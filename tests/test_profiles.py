@@ -0,0 +1,155 @@
+"""
+Test per i profili di resources PA-API (card, detail, price-refresh)
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from amazon.api_client import ITEM_RESOURCES, RESOURCE_PROFILES, get_resources
+from amazon.cache import SearchCache
+from amazon.models import NO_RATING
+from amazon.product_parser import parse_product_raw
+from tests.conftest import (
+    make_async_client,
+    make_client,
+    make_get_items,
+    make_handler,
+    make_item,
+)
+
+
+def price_only_item(asin='B000000001'):
+    """Item come restituito con il profilo 'price-refresh'"""
+    return {
+        'ASIN': asin,
+        'DetailPageURL': f"https://www.amazon.it/dp/{asin}?tag=tag-21",
+        'Offers': {'Listings': [{
+            'Price': {'Amount': 79.99, 'DisplayAmount': '€ 79,99'},
+            'SavingBasis': {'Amount': 99.99, 'DisplayAmount': '€ 99,99'}
+        }]}
+    }
+
+
+class TestResourceProfiles:
+    """Test per RESOURCE_PROFILES / get_resources"""
+
+    def test_profiles(self):
+        """price-refresh chiede solo i prezzi, card tutto tranne le features"""
+        assert get_resources('price-refresh') == [
+            'Offers.Listings.Price',
+            'Offers.Listings.SavingBasis'
+        ]
+        assert 'ItemInfo.Features' not in get_resources('card')
+        assert get_resources('detail') == ITEM_RESOURCES
+        assert get_resources(None) == ITEM_RESOURCES
+
+    def test_unknown_profile(self):
+        """Un profilo sconosciuto è un errore"""
+        with pytest.raises(ValueError):
+            get_resources('tutto')
+
+    def test_parse_price_only_item(self):
+        """parse_product_raw gestisce i campi non richiesti"""
+        product = parse_product_raw(price_only_item(), 'tag-21')
+
+        assert product['price']['current'] == 79.99
+        assert product['price']['discount_percent'] == 20
+        assert product.rating is NO_RATING
+        assert product.features == ()
+
+
+class TestClientProfiles:
+    """Test per il parametro profile di AmazonClient"""
+
+    def test_search_sends_profile_resources(self, paapi):
+        """search_items passa all'SDK le resources del profilo"""
+        paapi.search_items.return_value.search_result.items = [make_item('B000000001')]
+
+        client = make_client()
+        client.search_items("cuffie", profile='card')
+
+        resources = paapi.search_items.call_args.kwargs['resources']
+        assert resources == RESOURCE_PROFILES['card']
+
+    def test_price_refresh_batch(self, paapi):
+        """get_items_batch con 'price-refresh' chiede solo i prezzi"""
+        get_items, calls = make_get_items()
+        paapi.get_items.side_effect = get_items
+
+        client = make_client()
+        result = client.get_items_batch(['B000000001'], profile='price-refresh')
+
+        assert result['B000000001']['asin'] == 'B000000001'
+        resources = paapi.get_items.call_args.kwargs['resources']
+        assert resources == ['Offers.Listings.Price', 'Offers.Listings.SavingBasis']
+
+    def test_raw_payload_resources(self, paapi):
+        """Nel percorso raw JSON il payload contiene solo le resources del profilo"""
+        transport = Mock()
+        transport.request.return_value = SimpleNamespace(
+            status=200,
+            data=json.dumps({'ItemsResult': {'Items': [price_only_item()]}}).encode()
+        )
+
+        client = make_client(
+            region="eu-west-1", marketplace="www.amazon.it", transport=transport, raw_json=True
+        )
+        product = client.get_item_details('B000000001', profile='price-refresh')
+
+        body = json.loads(transport.request.call_args.kwargs['body'])
+        assert body['Resources'] == ['Offers.Listings.Price', 'Offers.Listings.SavingBasis']
+        assert product['price']['current'] == 79.99
+
+    def test_cache_key_per_profile(self, paapi):
+        """Profili diversi non condividono la cache"""
+        paapi.search_items.return_value.search_result.items = [make_item('B000000001')]
+
+        client = make_client(cache=SearchCache())
+        client.search_items("cuffie", profile='card')
+        client.search_items("cuffie", profile='card')
+        client.search_items("cuffie", profile='detail')
+
+        assert paapi.search_items.call_count == 2
+
+    def test_invalid_profile(self, paapi):
+        """Un profilo sconosciuto è rifiutato prima di chiamare PA-API"""
+        client = make_client()
+        with pytest.raises(ValueError):
+            client.get_items_batch(['B000000001'], profile='tutto')
+
+        paapi.get_items.assert_not_called()
+
+    def test_async_client_profile(self):
+        """Anche il client asincrono invia le resources del profilo"""
+        calls = []
+        client = make_async_client(make_handler({1: ['B000000001']}, calls=calls))
+
+        async def run():
+            try:
+                await client.search_items("cuffie", profile='card')
+                await client.get_items_batch(['B000000001'], profile='price-refresh')
+            finally:
+                await client.aclose()
+
+        asyncio.run(run())
+
+        assert calls[0]['Resources'] == RESOURCE_PROFILES['card']
+        assert calls[1]['Resources'] == RESOURCE_PROFILES['price-refresh']
+
+
+class TestApiProfile:
+    """Test per il parametro profile di /api/search"""
+
+    def test_invalid_profile_rejected(self):
+        """Un profilo sconosciuto risponde 400"""
+        from app import create_app
+
+        app = create_app()
+        app.config['TESTING'] = True
+        response = app.test_client().get('/api/search?keywords=cuffie&profile=tutto')
+
+        assert response.status_code == 400
+        assert 'Profilo non supportato' in response.get_json()['error']
@@ -0,0 +1,305 @@
+"""
+Test per il rate limiter PA-API
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from amazon.cache import SearchCache
+from amazon.rate_limiter import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    RateLimitExceeded,
+    SQLiteQuotaBackend,
+    TokenBucket,
+)
+from tests.conftest import make_client
+
+
+def acquire_until(path, rate, duration, barrier, results):
+    """Processo worker: preleva token dal bucket condiviso per duration secondi"""
+    bucket = TokenBucket(rate=rate, burst=1, backend=SQLiteQuotaBackend(path))
+    granted = []
+    # La finestra parte quando tutti i worker sono avviati
+    barrier.wait()
+    stop_at = time.time() + duration
+    while time.time() < stop_at:
+        try:
+            bucket.acquire(timeout=max(0.0, stop_at - time.time()))
+        except RateLimitExceeded:
+            break
+        granted.append(time.time())
+    results.put(granted)
+
+
+class TestTokenBucket:
+    """Test per rate_limiter.py"""
+
+    def test_burst_then_fail_fast(self):
+        """Esauriti i token del burst, timeout=0 fallisce subito"""
+        bucket = TokenBucket(rate=1, burst=2)
+        bucket.acquire(timeout=0)
+        bucket.acquire(timeout=0)
+
+        with pytest.raises(RateLimitExceeded):
+            bucket.acquire(timeout=0)
+
+        assert bucket.stats()['rejected']['interactive'] == 1
+
+    def test_queue_with_deadline(self):
+        """Con una scadenza il chiamante attende il token successivo"""
+        bucket = TokenBucket(rate=20, burst=1)
+        bucket.acquire()
+
+        start = time.monotonic()
+        bucket.acquire(timeout=1)
+        assert 0.02 < time.monotonic() - start < 0.5
+
+    def test_deadline_expires(self):
+        """Se il token non arriva entro la scadenza viene sollevato l'errore"""
+        bucket = TokenBucket(rate=0.5, burst=1)
+        bucket.acquire()
+
+        with pytest.raises(RateLimitExceeded):
+            bucket.acquire(timeout=0.05)
+
+    def test_default_timeout_per_priority(self):
+        """Il timeout di default dipende dalla priorità"""
+        bucket = TokenBucket(rate=0.5, burst=1, timeouts={PRIORITY_BULK: 0})
+        bucket.acquire()
+
+        with pytest.raises(RateLimitExceeded):
+            bucket.acquire(PRIORITY_BULK)
+
+    def test_wait_budget(self):
+        """L'attesa per più token include la spaziatura oltre il burst"""
+        bucket = TokenBucket(rate=2, burst=1, timeouts={PRIORITY_INTERACTIVE: 1.0})
+
+        assert bucket.wait_budget(1) == 1.0
+        assert bucket.wait_budget(5) == 3.0
+        assert bucket.wait_budget(5, timeout=0) == 2.0
+        assert bucket.wait_budget(5, PRIORITY_BULK) is None
+
+    def test_interactive_served_before_bulk(self):
+        """Il traffico interattivo passa davanti ai job bulk in coda"""
+        bucket = TokenBucket(rate=10, burst=1)
+        bucket.acquire()
+        order = []
+
+        def worker(priority, name):
+            bucket.acquire(priority, timeout=2)
+            order.append(name)
+
+        bulk = threading.Thread(target=worker, args=(PRIORITY_BULK, 'bulk'))
+        bulk.start()
+        while bucket.stats()['waiting'] < 1:
+            time.sleep(0.001)
+
+        interactive = threading.Thread(target=worker, args=(PRIORITY_INTERACTIVE, 'interactive'))
+        interactive.start()
+        bulk.join()
+        interactive.join()
+
+        assert order == ['interactive', 'bulk']
+
+    def test_daily_quota(self):
+        """Oltre la quota giornaliera le chiamate sono rifiutate"""
+        bucket = TokenBucket(rate=100, burst=10, daily_quota=2)
+        bucket.acquire()
+        bucket.acquire()
+
+        with pytest.raises(RateLimitExceeded):
+            bucket.acquire(timeout=1)
+
+        assert bucket.stats()['daily_used'] == 2
+
+    def test_daily_quota_resets(self):
+        """La quota giornaliera si azzera al cambio di giorno UTC"""
+        now = [1_700_000_000.0]
+        bucket = TokenBucket(rate=100, burst=10, daily_quota=1, wall_clock=lambda: now[0])
+        bucket.acquire()
+
+        now[0] += 86400
+        bucket.acquire(timeout=0)
+        assert bucket.stats()['daily_used'] == 1
+
+
+class TestAsyncAcquire:
+    """Test per TokenBucket.acquire_async"""
+
+    def test_many_waiters_without_threads(self):
+        """Centinaia di attese concorrenti non occupano thread del pool di default"""
+        bucket = TokenBucket(rate=500, burst=1)
+
+        async def run():
+            await asyncio.gather(*(bucket.acquire_async(timeout=5) for _ in range(300)))
+
+        start = time.monotonic()
+        asyncio.run(run())
+
+        assert time.monotonic() - start < 2.0
+        assert bucket.stats()['granted']['interactive'] == 300
+        assert bucket.stats()['waiting'] == 0
+
+    def test_cancelled_wait_takes_no_token(self):
+        """Un'attesa cancellata non preleva token né quota giornaliera"""
+        bucket = TokenBucket(rate=5, burst=1, daily_quota=10)
+        bucket.acquire()
+
+        async def run():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(bucket.acquire_async(), 0.05)
+
+        asyncio.run(run())
+        time.sleep(0.3)
+
+        stats = bucket.stats()
+        assert stats['daily_used'] == 1
+        assert stats['waiting'] == 0
+        assert stats['tokens'] >= 1
+
+    def test_shares_queue_with_threads(self):
+        """Chiamanti asyncio e thread condividono la coda a priorità"""
+        bucket = TokenBucket(rate=10, burst=1)
+        bucket.acquire()
+        order = []
+
+        def bulk():
+            bucket.acquire(PRIORITY_BULK, timeout=2)
+            order.append('bulk')
+
+        thread = threading.Thread(target=bulk)
+        thread.start()
+        while bucket.stats()['waiting'] < 1:
+            time.sleep(0.001)
+
+        async def interactive():
+            await bucket.acquire_async(PRIORITY_INTERACTIVE, timeout=2)
+            order.append('interactive')
+
+        asyncio.run(interactive())
+        thread.join()
+
+        assert order == ['interactive', 'bulk']
+
+    def test_deadline_expires(self):
+        """Se il token non arriva entro la scadenza viene sollevato l'errore"""
+        bucket = TokenBucket(rate=0.5, burst=1)
+        bucket.acquire()
+
+        with pytest.raises(RateLimitExceeded):
+            asyncio.run(bucket.acquire_async(timeout=0.05))
+        assert bucket.stats()['rejected']['interactive'] == 1
+
+
+class TestSharedQuota:
+    """Test per la quota condivisa tra processi (SQLiteQuotaBackend)"""
+
+    def test_buckets_share_tokens(self, tmp_path):
+        """Due limiter sullo stesso file condividono i token"""
+        path = str(tmp_path / 'quota.sqlite3')
+        first = TokenBucket(rate=0.01, burst=1, backend=SQLiteQuotaBackend(path))
+        second = TokenBucket(rate=0.01, burst=1, backend=SQLiteQuotaBackend(path))
+
+        first.acquire(timeout=0)
+        with pytest.raises(RateLimitExceeded):
+            second.acquire(timeout=0)
+
+    def test_daily_quota_shared(self, tmp_path):
+        """La quota giornaliera è contata su tutti i limiter"""
+        path = str(tmp_path / 'quota.sqlite3')
+        first = TokenBucket(rate=100, burst=10, daily_quota=3, backend=SQLiteQuotaBackend(path))
+        second = TokenBucket(rate=100, burst=10, daily_quota=3, backend=SQLiteQuotaBackend(path))
+
+        first.acquire()
+        second.acquire()
+        first.acquire()
+        with pytest.raises(RateLimitExceeded):
+            second.acquire()
+        assert second.stats()['daily_used'] == 3
+
+    def test_combined_tps_under_cap(self, tmp_path):
+        """Più processi insieme restano sotto il TPS configurato"""
+        path = str(tmp_path / 'quota.sqlite3')
+        rate = 20
+        workers = 4
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        barrier = context.Barrier(workers)
+
+        processes = [
+            context.Process(target=acquire_until, args=(path, rate, 3.0, barrier, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        per_process = [results.get(timeout=30) for _ in processes]
+        for process in processes:
+            process.join()
+
+        granted = sorted(t for times in per_process for t in times)
+        assert all(per_process), "ogni worker deve ottenere token"
+
+        # In ogni finestra di 1 secondo al massimo rate + burst token
+        for i, start in enumerate(granted):
+            in_window = sum(1 for t in granted[i:] if t - start < 1.0)
+            assert in_window <= rate + 1
+
+        elapsed = granted[-1] - granted[0]
+        assert len(granted) <= rate * elapsed + 2
+        assert len(granted) >= rate * elapsed * 0.5
+
+
+class TestClientRateLimit:
+    """Test integrazione limiter in AmazonClient"""
+
+    def test_rate_limited_search_serves_cache(self, paapi):
+        """Con limite raggiunto e fail fast viene servito il risultato in cache"""
+        mock_response = Mock()
+        mock_response.search_result = Mock()
+        mock_response.search_result.items = []
+        paapi.search_items.return_value = mock_response
+
+        client = make_client(
+            marketplace="www.amazon.it",
+            cache=SearchCache(ttl=0, stale_ttl=0),
+            limiter=TokenBucket(rate=0.01, burst=1)
+        )
+        first = client.search_items("tastiera")
+        second = client.search_items("tastiera", max_wait=0)
+
+        assert second is first
+        assert paapi.search_items.call_count == 1
+
+    def test_rate_limited_without_cache(self, paapi):
+        """Senza cache il limite produce un errore leggibile"""
+        client = make_client(marketplace="www.amazon.it", limiter=TokenBucket(rate=0.01, burst=0))
+        result = client.search_items("tastiera", max_wait=0)
+
+        assert result['count'] == 0
+        assert 'Troppe richieste' in result['error']
+
+    def test_rate_limited_items_raise(self, paapi):
+        """GetItems limitata solleva RateLimitExceeded invece di ASIN mancanti"""
+        client = make_client(
+            marketplace="www.amazon.it",
+            limiter=TokenBucket(rate=0.01, burst=0, timeouts={PRIORITY_INTERACTIVE: 0})
+        )
+        with pytest.raises(RateLimitExceeded):
+            client.get_items_batch(['B000000001', 'B000000002'])
+        # Anche attraverso il micro-batcher
+        with pytest.raises(RateLimitExceeded):
+            client.get_item_details('B000000001')
+
+        assert paapi.get_items.call_count == 0
+
+    @patch('amazon_paapi.AmazonApi')
+    def test_sdk_throttling_disabled(self, mock_api_class):
+        """Il client passa paese e throttling=0 all'SDK"""
+        make_client(region="eu-west-1", marketplace="www.amazon.de")
+
+        args, kwargs = mock_api_class.call_args
+        assert args[3] == 'DE'
+        assert kwargs['throttling'] == 0
@@ -0,0 +1,133 @@
+"""
+Test per il parsing del JSON grezzo PA-API (parse_product_raw)
+"""
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from amazon_paapi.sdk.api_client import ApiClient
+
+from amazon.product_parser import parse_product, parse_product_raw, raw_path
+from tests.conftest import full_item, make_client, snake_case_keys
+
+
+def variants():
+    """Item rappresentativi, inclusi campi mancanti"""
+    no_offers = full_item('B000000002')
+    del no_offers['Offers']
+
+    empty_listings = full_item('B000000003')
+    empty_listings['Offers']['Listings'] = []
+
+    no_price = full_item('B000000004')
+    del no_price['Offers']['Listings'][0]['Price']
+
+    bare = {'ASIN': 'B000000005'}
+
+    no_tag_url = full_item('B000000006')
+    no_tag_url['DetailPageURL'] = 'https://www.amazon.it/dp/B000000006'
+
+    return [full_item(), no_offers, empty_listings, no_price, bare, no_tag_url]
+
+
+@pytest.fixture(scope='module')
+def sdk_items():
+    """Deserializza gli item con l'SDK, come nel percorso standard"""
+    sdk_client = ApiClient('key', 'secret', 'webservices.amazon.it', 'eu-west-1')
+
+    def deserialize(items):
+        response = SimpleNamespace(data=json.dumps({'SearchResult': {'Items': items}}))
+        return sdk_client.deserialize(response, 'SearchItemsResponse').search_result.items
+
+    yield deserialize
+    sdk_client.pool.close()
+    sdk_client.pool.join()
+
+
+class TestRawParser:
+    """Test per product_parser.parse_product_raw"""
+
+    @pytest.mark.parametrize('item', variants(), ids=lambda item: item['ASIN'])
+    def test_same_output_as_parse_product(self, item, sdk_items):
+        """Stesso dict di parse_product su modelli SDK e su dict snake_case"""
+        raw = parse_product_raw(item, 'tag-21')
+
+        assert raw == parse_product(sdk_items([item])[0], 'tag-21')
+        assert raw == parse_product(snake_case_keys(item), 'tag-21')
+
+    def test_missing_asin(self):
+        """Item senza ASIN scartato"""
+        assert parse_product_raw({'ItemInfo': {}}, 'tag') is None
+
+    def test_raw_path_defaults(self):
+        """Gli accessor tollerano chiavi mancanti, None e tipi inattesi"""
+        title = raw_path('ItemInfo', 'Title', 'DisplayValue')
+
+        assert title({'ItemInfo': {'Title': {'DisplayValue': 'X'}}}) == 'X'
+        assert title({'ItemInfo': {'Title': None}}, 'default') == 'default'
+        assert title({'ItemInfo': []}, 'default') == 'default'
+        assert title(None, 'default') == 'default'
+
+
+class TestClientRawJson:
+    """Test per AmazonClient(raw_json=True)"""
+
+    def make_transport(self, payloads):
+        """Transport finto che risponde con i payload JSON in ordine"""
+        transport = Mock()
+        transport.request.side_effect = [
+            SimpleNamespace(status=status, data=json.dumps(body).encode())
+            for status, body in payloads
+        ]
+        return transport
+
+    def test_search_uses_signed_raw_request(self, paapi):
+        """La ricerca firma la richiesta e non usa l'SDK"""
+        transport = self.make_transport([
+            (200, {'SearchResult': {'Items': [full_item('B000000001'), full_item('B000000002')]}})
+        ])
+
+        client = make_client(
+            region="eu-west-1", marketplace="www.amazon.it", transport=transport, raw_json=True
+        )
+        result = client.search_items("cuffie", max_price=100)
+
+        assert [p['asin'] for p in result['products']] == ['B000000001', 'B000000002']
+        assert result['products'][0]['price']['discount_percent'] == 20
+        paapi.search_items.assert_not_called()
+
+        method, url = transport.request.call_args.args
+        headers = transport.request.call_args.kwargs['headers']
+        body = json.loads(transport.request.call_args.kwargs['body'])
+        assert (method, url) == ('POST', 'https://webservices.amazon.it/paapi5/searchitems')
+        assert headers['Authorization'].startswith('AWS4-HMAC-SHA256 Credential=key/')
+        assert body['MaxPrice'] == 10000
+
+    def test_no_results_and_errors(self, paapi):
+        """NoResults e errori PA-API seguono il contratto di search_items"""
+        transport = self.make_transport([
+            (404, {'Errors': [{'Code': 'NoResults', 'Message': 'No results'}]}),
+            (401, {'Errors': [{'Code': 'InvalidSignature', 'Message': 'Firma non valida'}]}),
+        ])
+
+        client = make_client(
+            region="eu-west-1", marketplace="www.amazon.it", transport=transport, raw_json=True
+        )
+
+        assert client.search_items("introvabile")['error'] == 'Nessun risultato trovato'
+        assert 'InvalidSignature' in client.search_items("cuffie")['error']
+
+    def test_get_items_raw(self, paapi):
+        """GetItems sul percorso raw, None per gli ASIN mancanti"""
+        transport = self.make_transport([
+            (200, {'ItemsResult': {'Items': [full_item('B000000001')]}})
+        ])
+
+        client = make_client(
+            region="eu-west-1", marketplace="www.amazon.it", transport=transport, raw_json=True
+        )
+        results = client.get_items_batch(['B000000001', 'B000000002'])
+
+        assert results['B000000001']['rating'].to_dict() == {'stars': 4.5, 'count': 1234}
+        assert results['B000000002'] is None
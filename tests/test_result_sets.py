@@ -0,0 +1,133 @@
+"""
+Test per la paginazione di /api/search (ResultSetCache e cursori)
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from amazon.models import Price, Product, Rating
+from amazon.result_sets import ResultSetCache, decode_cursor, encode_cursor
+from tests.conftest import FakeClock, make_client
+
+
+def product(i):
+    amount = 10.0 + (i * 7) % 50
+    return Product(
+        f"B{i:09d}", f"Prodotto {i}", 'url', 'img', 'Marca',
+        Price(amount, f"€ {amount}", discount_percent=i % 5 * 10 or None),
+        i % 2 == 0,
+        Rating(3.0 + (i % 3) * 0.5, 10 * i)
+    )
+
+
+PRODUCTS = [product(i) for i in range(25)]
+
+
+def asins(products):
+    return [p['asin'] for p in products]
+
+
+class TestCursor:
+    """Test per encode_cursor/decode_cursor"""
+
+    def test_round_trip(self):
+        """Il cursore conserva parametri, offset e ultimo ASIN"""
+        cursor = encode_cursor({'keywords': 'cuffie', 'sort': 'rating'}, 20, 'B000000001')
+        assert decode_cursor(cursor) == ({'keywords': 'cuffie', 'sort': 'rating'}, 20, 'B000000001')
+
+    @pytest.mark.parametrize('cursor', ['xyz', encode_cursor({'keywords': 1}, 0), encode_cursor({}, -1)])
+    def test_invalid(self, cursor):
+        """Cursori malformati o manomessi -> ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestResultSetCache:
+    """Test per result_sets.py"""
+
+    def test_sorted_pages(self):
+        """Le pagine sono fette consecutive del risultato ordinato"""
+        cache = ResultSetCache()
+        result_set = cache.put('k', {'products': PRODUCTS}, sort='price-asc', min_rating=3.5)
+
+        first, next_offset = result_set.page(0, 10)
+        second, last_offset = result_set.page(next_offset, 10)
+        prices = [p.price.current for p in first + second]
+
+        assert prices == sorted(prices)
+        assert all(p.rating.stars >= 3.5 for p in result_set.products)
+        assert len(result_set.products) == 16
+        assert last_offset is None
+
+    def test_rebuilt_set_resumes_after_last_asin(self):
+        """Se il risultato cambia, la pagina riprende dopo l'ultimo ASIN visto"""
+        cache = ResultSetCache()
+        result_set = cache.put('k', {'products': PRODUCTS[1:]})
+
+        products, _ = result_set.page(10, 5, after=PRODUCTS[9].asin)
+        assert asins(products) == asins(PRODUCTS[10:15])
+
+    def test_ttl_and_lru(self):
+        """I risultati scadono dopo ttl e oltre max_entries (LRU)"""
+        clock = FakeClock()
+        cache = ResultSetCache(ttl=60, max_entries=1, clock=clock)
+        cache.put('a', {'products': PRODUCTS})
+        assert cache.get('a') is not None
+
+        cache.put('b', {'products': PRODUCTS})
+        assert cache.get('a') is None
+
+        clock.now += 61
+        assert cache.get('b') is None
+        assert cache.stats()['hits'] == 1
+
+
+class TestApiSearchPagination:
+    """Test per sort, min_rating, limit e cursor di /api/search"""
+
+    @pytest.fixture
+    def http(self, paapi):
+        from app import create_app
+
+        client = make_client()
+        client.search_items = Mock(return_value={
+            'products': PRODUCTS, 'count': len(PRODUCTS), 'error': None
+        })
+
+        app = create_app()
+        app.amazon_client = client
+        with app.test_client() as http:
+            yield http, client
+
+    def test_cursor_pages(self, http):
+        """Le pagine successive non richiamano il client"""
+        http, client = http
+        first = http.get('/api/search?keywords=cuffie&sort=discount&limit=10').get_json()
+        second = http.get(f"/api/search?cursor={first['next_cursor']}").get_json()
+        third = http.get(f"/api/search?cursor={second['next_cursor']}").get_json()
+
+        assert client.search_items.call_count == 1
+        assert (first['count'], second['count'], third['count']) == (10, 10, 5)
+        assert first['total'] == 25 and third['next_cursor'] is None
+
+        products = first['products'] + second['products'] + third['products']
+        discounts = [p['price']['discount_percent'] or 0 for p in products]
+        assert discounts == sorted(discounts, reverse=True)
+        assert len({p['asin'] for p in products}) == 25
+
+    def test_min_rating(self, http):
+        """min_rating filtra lato server"""
+        http, _ = http
+        response = http.get('/api/search?keywords=cuffie&min_rating=4&sort=rating').get_json()
+
+        assert response['total'] == 8
+        assert all(p['rating']['stars'] >= 4 for p in response['products'])
+
+    def test_validation(self, http):
+        """Ordinamento, limit e cursore non validi -> 400"""
+        http, _ = http
+        assert http.get('/api/search?keywords=x&sort=popolarita').status_code == 400
+        assert http.get('/api/search?keywords=x&limit=0').status_code == 400
+        response = http.get('/api/search?cursor=non-valido')
+        assert response.status_code == 400
+        assert 'Cursore non valido' in response.get_json()['error']
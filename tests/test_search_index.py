@@ -0,0 +1,175 @@
+"""
+Test per l'indice di ricerca locale (SearchIndex)
+"""
+from unittest.mock import patch
+
+import pytest
+
+from amazon.models import Price, Product
+from amazon.search_index import SearchIndex, tokenize
+from tests.conftest import FakeClock, make_client
+
+
+def product(asin, title, brand='Marca', features=(), amount=49.99, discount=None, is_prime=False):
+    return Product(
+        asin, title, f"https://www.amazon.it/dp/{asin}", 'img', brand,
+        Price(amount, f"€ {amount}", discount_percent=discount),
+        is_prime=is_prime,
+        features=tuple(features)
+    )
+
+
+HEADPHONES = [
+    product('B000000001', 'Cuffie Bluetooth Over-Ear', features=['Cancellazione del rumore']),
+    product('B000000002', 'Cuffie Bluetooth economiche', amount=19.99, discount=30, is_prime=True),
+    product('B000000003', 'Auricolari Bluetooth', brand='Sony', amount=89.99),
+    product('B000000004', 'Cuffie con filo', features=['Jack da 3,5 mm']),
+]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex(max_age=60, clock=FakeClock())
+    index.add(HEADPHONES, 'Electronics')
+    index.mark_covered('cuffie', 'Electronics')
+    return index
+
+
+def asins(result):
+    return [p.asin for p in result['products']]
+
+
+class TestTokenize:
+    """Test per search_index.tokenize"""
+
+    def test_accents_elisions_stopwords(self):
+        """Accenti, articoli elisi e parole vuote non producono token"""
+        assert tokenize("Qualità dell'Audio per la TV") == ['qualit', 'audi', 'tv']
+
+    def test_singular_plural(self):
+        """Singolare e plurale producono lo stesso token"""
+        assert tokenize('cuffia economica') == tokenize('Cuffie Economiche')
+        assert tokenize('auricolare') == tokenize('auricolari')
+
+
+class TestSearchIndex:
+    """Test per search_index.py"""
+
+    def test_covered_query(self, index):
+        """Una query più specifica di una ricerca fatta è servita localmente"""
+        result = index.search('cuffie bluetooth', 'Electronics')
+
+        assert set(asins(result)) == {'B000000001', 'B000000002'}
+        assert result['error'] is None
+
+    def test_extra_tokens_restrict_candidates(self, index):
+        """I token oltre la ricerca coperta escludono i prodotti che non li contengono"""
+        assert asins(index.search('cuffie bluetooth economiche', 'Electronics')) == ['B000000002']
+
+        # Nessun prodotto coperto contiene tutti i token: risponde PA-API
+        assert index.search('cuffie sony', 'Electronics') is None
+        assert index.search('cuffie wireless', 'Electronics') is None
+        assert index.stats()['fallbacks'] == 2
+
+    def test_not_covered(self, index):
+        """Query non coperte, di altre categorie o scadute ritornano None"""
+        assert index.search('auricolari', 'Electronics') is None
+        assert index.search('cuffie', 'Computers') is None
+
+        index._clock.now += 61
+        assert index.search('cuffie', 'Electronics') is None
+        assert index.stats()['fallbacks'] == 3
+
+    def test_filters(self, index):
+        """max_price, prime_only e discount_only applicati localmente"""
+        assert asins(index.search('cuffie', 'Electronics', max_price=20)) == ['B000000002']
+        assert asins(index.search('cuffie', 'Electronics', prime_only=True)) == ['B000000002']
+        assert asins(index.search('cuffie', 'Electronics', discount_only=True)) == ['B000000002']
+
+    def test_max_price_coverage(self, index):
+        """Una ricerca PA-API con prezzo massimo copre solo prezzi inferiori"""
+        index.add([HEADPHONES[2]], 'Electronics')
+        index.mark_covered('auricolari', 'Electronics', max_price=100)
+
+        assert asins(index.search('auricolari', 'Electronics', max_price=90)) == ['B000000003']
+        assert index.search('auricolari', 'Electronics', max_price=150) is None
+        assert index.search('auricolari', 'Electronics') is None
+
+    def test_title_ranks_above_features(self, index):
+        """Un termine nel titolo pesa più dello stesso termine nelle features"""
+        index.add([product('B000000005', 'Cuffie da gaming', features=['Audio filo'])], 'Electronics')
+
+        result = index.search('cuffie filo', 'Electronics')
+        assert asins(result)[:2] == ['B000000004', 'B000000005']
+
+    def test_incremental_reindex(self, index):
+        """Reindicizzare un prodotto sostituisce i suoi token"""
+        index.add([product('B000000004', 'Altoparlante portatile')], 'Electronics')
+
+        assert 'B000000004' not in asins(index.search('cuffie', 'Electronics'))
+        index.mark_covered('altoparlante', 'Electronics')
+        assert asins(index.search('altoparlante', 'Electronics')) == ['B000000004']
+
+    def test_max_documents(self):
+        """Oltre max_documents si rimuovono i prodotti meno recenti"""
+        index = SearchIndex(max_documents=2, clock=FakeClock())
+        index.add(HEADPHONES[:3])
+        index.mark_covered('bluetooth')
+
+        assert asins(index.search('bluetooth')) == ['B000000002', 'B000000003']
+        assert index.stats()['documents'] == 2
+
+
+class TestClientSearchIndex:
+    """Test per AmazonClient(search_index=...)"""
+
+    @pytest.fixture
+    def search_api(self, paapi):
+        """PA-API simulata: ogni ricerca restituisce due item"""
+        paapi.search_items.return_value.search_result.items = ['item-1', 'item-2']
+        return paapi
+
+    @patch('amazon.api_client.parse_product')
+    def test_search_updates_index(self, mock_parse, search_api):
+        """Le risposte di search_items indicizzano i prodotti e coprono la query"""
+        index = SearchIndex(clock=FakeClock())
+        client = make_client(search_index=index)
+        mock_parse.side_effect = [HEADPHONES[0], HEADPHONES[1]]
+
+        client.search_items('cuffie bluetooth', category='Electronics')
+
+        result = index.search('cuffie bluetooth over ear', 'Electronics')
+        assert asins(result) == ['B000000001']
+
+    @patch('amazon.api_client.parse_product')
+    def test_price_refresh_not_indexed(self, mock_parse, search_api):
+        """Risposte senza titolo non aggiornano l'indice"""
+        index = SearchIndex(clock=FakeClock())
+        client = make_client(search_index=index)
+        mock_parse.side_effect = [HEADPHONES[0], HEADPHONES[1]]
+
+        client.search_items('cuffie', profile='price-refresh')
+
+        assert index.stats()['documents'] == 0
+        assert index.search('cuffie') is None
+
+    @patch('amazon.api_client.parse_product')
+    def test_search_route_uses_index(self, mock_parse, search_api):
+        """/search risponde dall'indice senza chiamare PA-API"""
+        from app import create_app
+
+        index = SearchIndex(clock=FakeClock())
+        client = make_client(search_index=index)
+        mock_parse.side_effect = [HEADPHONES[0], HEADPHONES[1]]
+
+        app = create_app()
+        app.amazon_client = client
+        with app.test_client() as http:
+            first = http.get('/search?keywords=cuffie')
+            second = http.get('/search?keywords=cuffie+economiche&prime_only=true')
+
+        assert first.status_code == second.status_code == 200
+        assert search_api.search_items.call_count == 1
+        assert 'Cuffie Bluetooth economiche' in second.get_data(as_text=True)
+        assert 'Cuffie Bluetooth Over-Ear' not in second.get_data(as_text=True)
+        assert index.stats()['local_hits'] == 1
@@ -0,0 +1,184 @@
+"""
+Test per la risoluzione dei link brevi (ShortLinkResolver)
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from amazon.bulk_links import rewrite_links
+from amazon.short_links import ShortLinkResolver
+from tests.conftest import FakeClock
+
+
+class StubTransport:
+    """Transport locale: {url: (status, Location)} con latenza opzionale"""
+
+    def __init__(self, routes, delay=0.0):
+        self.routes = routes
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, redirect=True, timeout=None):
+        assert method == 'HEAD' and redirect is False
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        status, location = self.routes.get(url, (404, None))
+        if isinstance(status, Exception):
+            raise status
+        return SimpleNamespace(status=status, headers={'Location': location} if location else {})
+
+
+ROUTES = {
+    'https://amzn.to/abc': (301, 'https://www.amazon.it/dp/B08N5WRWNW?ref=short'),
+    'https://amzn.eu/d/xyz': (302, 'https://amzn.to/abc'),
+    'https://amzn.to/fuori': (301, 'https://www.example.com/'),
+    'https://amzn.to/giu': (ConnectionError('rete non raggiungibile'), None),
+    'https://amzn.to/limite': (429, None),
+    'https://amzn.to/lento': (408, None),
+}
+
+
+@pytest.fixture
+def transport():
+    return StubTransport(ROUTES)
+
+
+class TestShortLinkResolver:
+    """Test per short_links.py"""
+
+    def test_follows_redirects(self, transport):
+        """I redirect sono seguiti fino al primo URL Amazon"""
+        resolver = ShortLinkResolver(transport)
+
+        assert resolver.resolve('https://amzn.to/abc') == 'https://www.amazon.it/dp/B08N5WRWNW?ref=short'
+        assert resolver.resolve('https://amzn.eu/d/xyz') == 'https://www.amazon.it/dp/B08N5WRWNW?ref=short'
+        assert resolver.resolve('https://www.amazon.it/dp/B08N5WRWNW') == 'https://www.amazon.it/dp/B08N5WRWNW'
+        assert 'https://www.amazon.it/dp/B08N5WRWNW?ref=short' not in transport.calls
+
+    def test_dead_links_cached(self, transport):
+        """404 e redirect fuori da Amazon sono ricordati per negative_ttl"""
+        clock = FakeClock()
+        resolver = ShortLinkResolver(transport, negative_ttl=60, clock=clock)
+
+        assert resolver.resolve('https://amzn.to/morto') is None
+        assert resolver.resolve('https://amzn.to/fuori') is None
+        assert resolver.resolve('https://amzn.to/morto') is None
+        assert transport.calls.count('https://amzn.to/morto') == 1
+
+        clock.now += 61
+        resolver.resolve('https://amzn.to/morto')
+        assert transport.calls.count('https://amzn.to/morto') == 2
+        assert resolver.stats()['dead'] == 3
+
+    def test_network_errors_not_cached(self, transport):
+        """Gli errori di rete non sono salvati: il link è ritentato"""
+        resolver = ShortLinkResolver(transport)
+
+        assert resolver.resolve('https://amzn.to/giu') is None
+        assert resolver.resolve('https://amzn.to/giu') is None
+        assert transport.calls.count('https://amzn.to/giu') == 2
+        assert resolver.stats()['errors'] == 2
+
+    def test_transient_statuses_not_cached(self, transport):
+        """429 e 408 non segnano il link come morto: è ritentato"""
+        resolver = ShortLinkResolver(transport, negative_ttl=86400)
+
+        for url in ('https://amzn.to/limite', 'https://amzn.to/lento'):
+            assert resolver.resolve(url) is None
+            assert resolver.resolve(url) is None
+            assert transport.calls.count(url) == 2
+        assert resolver.stats()['errors'] == 4
+        assert resolver.stats()['dead'] == 0
+
+    def test_persistent_cache(self, transport, tmp_path):
+        """Un nuovo resolver sullo stesso file non ripete i redirect"""
+        path = str(tmp_path / 'short_links.sqlite3')
+        first = ShortLinkResolver(transport, cache_path=path)
+        first.resolve('https://amzn.to/abc')
+        first.resolve('https://amzn.to/morto')
+        first.close()
+
+        second = ShortLinkResolver(StubTransport({}), cache_path=path)
+        assert second.resolve('https://amzn.to/abc') == 'https://www.amazon.it/dp/B08N5WRWNW?ref=short'
+        assert second.resolve('https://amzn.to/morto') is None
+        assert second.stats()['disk_hits'] == 2
+        assert second.stats()['requests'] == 0
+
+    def test_memory_lru(self, transport):
+        """Oltre max_entries si scartano i link meno recenti"""
+        resolver = ShortLinkResolver(transport, max_entries=1)
+        resolver.resolve('https://amzn.to/abc')
+        resolver.resolve('https://amzn.to/morto')
+        resolver.resolve('https://amzn.to/abc')
+
+        assert transport.calls.count('https://amzn.to/abc') == 2
+
+    def test_resolve_many_concurrent(self):
+        """Link diversi in parallelo, duplicati risolti una volta"""
+        routes = {
+            f"https://amzn.to/{i}": (301, f"https://www.amazon.it/dp/B00000000{i}")
+            for i in range(8)
+        }
+        transport = StubTransport(routes, delay=0.1)
+        resolver = ShortLinkResolver(transport, max_workers=8)
+
+        start = time.monotonic()
+        results = resolver.resolve_many(list(routes) * 2)
+
+        assert time.monotonic() - start < 0.5
+        assert results['https://amzn.to/3'] == 'https://www.amazon.it/dp/B000000003'
+        assert len(transport.calls) == 8
+
+    def test_windows_reuse_threads_and_connections(self, tmp_path):
+        """Molte chiamate a resolve_many non accumulano thread né connessioni SQLite"""
+        routes = {
+            f"https://amzn.to/{i}": (301, f"https://www.amazon.it/dp/B{i:09d}")
+            for i in range(400)
+        }
+        resolver = ShortLinkResolver(
+            StubTransport(routes), cache_path=str(tmp_path / 'short_links.sqlite3'), max_workers=4
+        )
+        threads_before = threading.active_count()
+
+        urls = list(routes)
+        for i in range(0, len(urls), 8):
+            resolver.resolve_many(urls[i:i + 8])
+
+        assert threading.active_count() - threads_before <= 4
+        connections = resolver.stats()['connections']
+        assert connections['open'] <= connections['size'] == 2
+        resolver.close()
+        assert resolver.stats()['connections']['open'] == 0
+
+
+class TestBulkResolve:
+    """Test per rewrite_links(resolver=...)"""
+
+    def test_short_links_replaced(self, transport):
+        """I link brevi diventano link prodotto con tag e ASIN"""
+        resolver = ShortLinkResolver(transport)
+        urls = enumerate(['https://amzn.to/abc', 'https://amzn.to/morto', 'https://amzn.to/abc'], 1)
+        results = list(rewrite_links(urls, 'nuovo-21', resolver=resolver, window=2))
+
+        assert results[0]['asin'] == results[2]['asin'] == 'B08N5WRWNW'
+        assert results[0]['url'].startswith('https://www.amazon.it/dp/B08N5WRWNW?')
+        assert 'tag=nuovo-21' in results[0]['url']
+        assert results[1]['resolved'] is None and results[1]['asin'] is None
+        assert results[1]['url'] == 'https://amzn.to/morto'
+        assert transport.calls.count('https://amzn.to/abc') == 1
+
+    def test_route(self, transport):
+        """/api/links/bulk?resolve=true usa il resolver dell'app"""
+        from app import create_app
+
+        app = create_app()
+        app.short_link_resolver = ShortLinkResolver(transport)
+        with app.test_client() as http:
+            response = http.post('/api/links/bulk?tag=t-21&resolve=true', data='https://amzn.to/abc\n')
+            body = response.get_data(as_text=True)
+
+        assert '"asin":"B08N5WRWNW"' in body
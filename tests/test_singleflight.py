@@ -0,0 +1,80 @@
+"""
+Test per il coalescing delle ricerche concorrenti
+"""
+import threading
+from unittest.mock import Mock
+from amazon.singleflight import SingleFlight
+from tests.conftest import make_client, run_concurrently, wait_until
+
+
+class TestSingleFlight:
+    """Test per singleflight.py"""
+
+    def test_concurrent_calls_share_result(self):
+        """Chiamate concorrenti con la stessa chiave eseguono fn una volta"""
+        flight = SingleFlight()
+        release = threading.Event()
+        fn = Mock(side_effect=lambda: release.wait(2) and {'value': 42})
+
+        threads, results = run_concurrently(8, lambda _: flight.do('k', fn))
+        wait_until(lambda: flight.stats()['coalesced'] >= 7)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert fn.call_count == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats() == {'executions': 1, 'coalesced': 7, 'in_flight': 0}
+
+    def test_error_propagates_to_waiters(self):
+        """L'eccezione del leader arriva anche ai chiamanti in attesa"""
+        flight = SingleFlight()
+        release = threading.Event()
+        error = ValueError('boom')
+
+        def fail():
+            release.wait(2)
+            raise error
+
+        def call(_):
+            try:
+                return flight.do('k', fail)
+            except ValueError as e:
+                return e
+
+        threads, results = run_concurrently(6, call)
+        wait_until(lambda: flight.stats()['coalesced'] >= 5)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        assert all(result is error for result in results)
+        assert flight.stats() == {'executions': 1, 'coalesced': 5, 'in_flight': 0}
+
+        # La chiave è libera per una nuova esecuzione
+        assert flight.do('k', lambda: 'ok') == 'ok'
+        assert flight.stats()['executions'] == 2
+
+    def test_client_coalesces_identical_searches(self, paapi):
+        """search_items concorrenti identiche fanno una sola chiamata PA-API"""
+        release = threading.Event()
+
+        mock_response = Mock()
+        mock_response.search_result = Mock()
+        mock_response.search_result.items = []
+
+        def slow_search(**kwargs):
+            release.wait(2)
+            return mock_response
+
+        paapi.search_items.side_effect = slow_search
+
+        client = make_client()
+        threads, results = run_concurrently(5, lambda _: client.search_items("cuffie"))
+        wait_until(lambda: client.get_stats()['search_coalescing']['coalesced'] >= 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert paapi.search_items.call_count == 1
+        assert all(result['error'] is None for result in results)
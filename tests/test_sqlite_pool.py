@@ -0,0 +1,91 @@
+"""
+Test per il pool di connessioni SQLite
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from amazon.sqlite_pool import SQLitePool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLitePool(
+        str(tmp_path / 'pool.sqlite3'),
+        size=2,
+        busy_timeout=0.1,
+        schema=('CREATE TABLE IF NOT EXISTS t (x INTEGER)',)
+    )
+    yield pool
+    pool.close()
+
+
+class TestSQLitePool:
+    """Test per sqlite_pool.py"""
+
+    def test_connections_reused(self, pool):
+        """Una connessione restituita viene riusata"""
+        with pool.connection() as first:
+            first.execute('INSERT INTO t VALUES (1)')
+        with pool.connection() as second:
+            assert second is first
+            assert second.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+
+        assert pool.stats() == {'size': 2, 'open': 1, 'idle': 1}
+
+    def test_exhausted_pool_times_out(self, pool):
+        """Oltre size connessioni in uso si attende fino a busy_timeout"""
+        with pool.connection(), pool.connection():
+            with pytest.raises(sqlite3.OperationalError):
+                with pool.connection():
+                    pass
+
+        assert pool.stats()['open'] == 2
+
+    def test_waiter_gets_returned_connection(self, pool):
+        """Chi attende riceve la prima connessione restituita"""
+        pool.busy_timeout = 2
+        release = threading.Event()
+        got = []
+
+        def hold():
+            with pool.connection():
+                release.wait(2)
+
+        holders = [threading.Thread(target=hold) for _ in range(2)]
+        for thread in holders:
+            thread.start()
+
+        def wait_for_connection():
+            with pool.connection() as conn:
+                got.append(conn)
+
+        waiter = threading.Thread(target=wait_for_connection)
+        waiter.start()
+        release.set()
+        for thread in holders + [waiter]:
+            thread.join(2)
+
+        assert len(got) == 1
+        assert pool.stats()['open'] == 2
+
+    def test_open_transaction_rolled_back(self, pool):
+        """Una transazione lasciata aperta è annullata alla restituzione"""
+        with pool.connection() as conn:
+            conn.execute('BEGIN')
+            conn.execute('INSERT INTO t VALUES (1)')
+
+        with pool.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+    def test_close(self, pool):
+        """close chiude le connessioni libere; il pool resta utilizzabile"""
+        with pool.connection():
+            pass
+        pool.close()
+        assert pool.stats()['open'] == 0
+
+        with pool.connection() as conn:
+            assert conn.execute('SELECT 1').fetchone()[0] == 1
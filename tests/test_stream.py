@@ -0,0 +1,140 @@
+"""
+Test per la ricerca in streaming (stream_search e /api/search/stream)
+"""
+import json
+import time
+from unittest.mock import patch
+
+from amazon.cache import SearchCache
+from tests.conftest import make_client, make_search
+
+
+def make_slow_search(pages, delays, failing=()):
+    """Come make_search, con una latenza diversa per pagina"""
+    search = make_search(pages, failing=failing)
+
+    def search_items(**params):
+        time.sleep(delays.get(params.get('item_page', 1), 0.0))
+        return search(**params)
+
+    return search_items
+
+
+class TestStreamSearch:
+    """Test per AmazonClient.stream_search"""
+
+    def test_pages_emitted_as_they_arrive(self, paapi):
+        """La pagina veloce arriva prima della lenta, senza ASIN duplicati"""
+        paapi.search_items.side_effect = make_slow_search(
+            {1: ['B000000001', 'B000000002'], 2: ['B000000003', 'B000000001']},
+            delays={1: 0.3, 2: 0.0}
+        )
+        client = make_client(max_workers=4)
+
+        start = time.monotonic()
+        events = client.stream_search("cuffie", pages=2)
+        first = next(events)
+        first_at = time.monotonic() - start
+        rest = list(events)
+
+        assert first['page'] == 2 and first_at < 0.25
+        assert [p['asin'] for p in rest[0]['products']] == ['B000000002']
+        summary = rest[-1]
+        assert summary['event'] == 'summary'
+        assert summary['count'] == 3
+        assert summary['errors'] == []
+        assert summary['timings']['first_result_ms'] < summary['timings']['total_ms']
+
+    def test_errors_in_summary(self, paapi):
+        """Le pagine fallite finiscono nel riepilogo, le altre sono emesse"""
+        paapi.search_items.side_effect = make_search(
+            {1: ['B000000001'], 2: ['B000000002']}, failing=(2,)
+        )
+        client = make_client(max_workers=4)
+
+        events = list(client.stream_search("cuffie", pages=2))
+
+        assert [e['event'] for e in events] == ['page', 'summary']
+        assert events[-1]['errors'][0]['page'] == 2
+
+    def test_complete_result_cached(self, paapi):
+        """A ricerca completa il risultato è in cache per search_items"""
+        paapi.search_items.side_effect = make_search({1: ['B000000001', 'B000000002']})
+        client = make_client(max_workers=4, cache=SearchCache())
+
+        list(client.stream_search("cuffie", category='Electronics'))
+        result = client.search_items("cuffie", category='Electronics')
+        cached = list(client.stream_search("cuffie", category='Electronics'))
+
+        assert paapi.search_items.call_count == 1
+        assert result['count'] == 2
+        assert cached[0]['cached'] is True
+
+    def test_pages_not_kept_without_cache(self, paapi):
+        """Senza cache né indice le pagine emesse non sono conservate né unite"""
+        paapi.search_items.side_effect = make_search({1: ['B000000001'], 2: ['B000000002']})
+        client = make_client(max_workers=4)
+
+        with patch('amazon.api_client.merge_pages') as merge:
+            events = list(client.stream_search("cuffie", pages=2))
+
+        assert events[-1]['count'] == 2
+        merge.assert_not_called()
+
+    def test_timeout(self, paapi):
+        """Le pagine oltre il timeout sono segnalate come errore"""
+        paapi.search_items.side_effect = make_slow_search(
+            {1: ['B000000001'], 2: ['B000000002']}, delays={2: 0.5}
+        )
+        client = make_client(max_workers=4)
+
+        events = list(client.stream_search("cuffie", pages=2, timeout=0.2))
+
+        assert events[-1]['errors'] == [{'category': 'All', 'page': 2, 'error': 'Timeout'}]
+        assert events[-1]['count'] == 1
+
+
+class TestStreamRoute:
+    """Test per /api/search/stream"""
+
+    def test_ndjson_and_sse(self, monkeypatch):
+        """NDJSON di default, SSE con ?format=sse"""
+        monkeypatch.setenv('DEMO_MODE', 'true')
+        from app import create_app
+
+        app = create_app()
+        with app.test_client() as http:
+            ndjson = http.get('/api/search/stream?keywords=cuffie&prime_only=true')
+            lines = ndjson.get_data(as_text=True).splitlines()
+            sse = http.get('/api/search/stream?keywords=cuffie&format=sse')
+            sse_body = sse.get_data(as_text=True)
+
+        assert ndjson.mimetype == 'application/x-ndjson'
+        events = [json.loads(line) for line in lines]
+        assert [e['event'] for e in events] == ['page', 'summary']
+        assert all(p['is_prime'] for p in events[0]['products'])
+        assert events[1]['count'] == len(events[0]['products'])
+
+        assert sse.mimetype == 'text/event-stream'
+        assert sse_body.startswith('event: page\ndata: {')
+
+    def test_validation(self):
+        """Parametri non validi -> 400 prima dello stream"""
+        from app import create_app
+
+        app = create_app()
+        with app.test_client() as http:
+            assert http.get('/api/search/stream').status_code == 400
+
+    def test_results_page_streams_multiple_pages(self, paapi):
+        """/search con più pagine rende la griglia per /api/search/stream senza chiamare PA-API"""
+        from app import create_app
+
+        app = create_app()
+        app.amazon_client = make_client()
+        with app.test_client() as http:
+            html = http.get('/search?keywords=cuffie&pages=3&prime_only=true').get_data(as_text=True)
+
+        assert 'data-stream-search="keywords=cuffie&amp;category=All&amp;pages=3&amp;prime_only=true"' in html
+        assert 'Nessun prodotto trovato' not in html
+        paapi.search_items.assert_not_called()
@@ -0,0 +1,107 @@
+"""
+Test per il transport keep-alive PA-API
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import amazon_paapi
+import pytest
+
+from amazon.transport import PooledTransport
+from tests.conftest import make_client
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Risponde {} in HTTP/1.1 keep-alive dopo un breve ritardo"""
+
+    protocol_version = 'HTTP/1.1'
+    delay = 0.05
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.delay)
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/paapi5/searchitems"
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledTransport:
+    """Test per transport.py"""
+
+    def test_connection_reused(self, server_url):
+        """Richieste successive riusano la stessa connessione"""
+        transport = PooledTransport(pool_size=2)
+
+        for _ in range(5):
+            response = transport.request('POST', server_url, body=b'{}', timeout=None)
+            assert response.status == 200
+
+        stats = transport.stats()
+        assert stats['opened'] == 1
+        assert stats['reused'] == 4
+
+    def test_full_pool_waits(self, server_url):
+        """Oltre pool_size le richieste attendono una connessione libera"""
+        transport = PooledTransport(pool_size=1)
+        threads = [
+            threading.Thread(target=transport.request, args=('POST', server_url), kwargs={'body': b'{}'})
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = transport.stats()
+        assert stats['requests'] == 3
+        assert stats['opened'] == 1
+        assert stats['waited'] >= 1
+
+    def test_read_timeout_applied(self, server_url):
+        """Il timeout del pool vale anche quando l'SDK passa timeout=None"""
+        transport = PooledTransport(read_timeout=0.01)
+        transport.connection_pool_kw['retries'] = False
+
+        with pytest.raises(Exception):
+            transport.request('POST', server_url, body=b'{}', timeout=None)
+
+
+class TestClientTransport:
+    """Test integrazione transport in AmazonClient"""
+
+    def test_installed_in_sdk(self):
+        """Il transport sostituisce il pool urllib3 dell'SDK"""
+        transport = PooledTransport()
+        client = make_client(region="eu-west-1", marketplace="www.amazon.it", transport=transport)
+
+        assert isinstance(client.api, amazon_paapi.AmazonApi)
+        assert client.api.api.api_client.rest_client.pool_manager is transport
+        assert client.get_stats()['transport']['requests'] == 0
+
+    @patch('amazon_paapi.AmazonApi')
+    def test_missing_rest_client(self, mock_api_class):
+        """Se l'SDK non espone il client REST il client funziona col pool di default"""
+        mock_api_class.return_value = Mock(spec=['search_items', 'get_items'])
+
+        transport = PooledTransport()
+        client = make_client(region="eu-west-1", marketplace="www.amazon.it", transport=transport)
+
+        assert client.transport is transport
+        assert transport.install(client.api) is False